@@ -0,0 +1,60 @@
+"""Benchmark the memory held by formatted items in a list and in an AnnotationStore.
+
+Builds `--items` formatted `ZoteroItem`s (20 annotations per document, every
+item with its own strings as when decoded from API responses) and measures the
+memory still allocated once they are all held in a list, as `format_items`
+returns them by default, or in a columnar `AnnotationStore`. Also times filling
+the container and reading all items back, as the Readwise upload does.
+
+Usage:
+    $ python -m benchmarks.bench_annotation_store --items 200000
+"""
+
+import tracemalloc
+from argparse import ArgumentParser
+from time import perf_counter
+
+from benchmarks.bench_item_memory import zotero_item_kwargs
+from zotero2readwise.columnar import AnnotationStore
+from zotero2readwise.zotero import ZoteroItem
+
+
+def fill(container: list | AnnotationStore, n_items: int) -> tuple[int, float]:
+    """Append `n_items` items to `container`, returning the memory retained and seconds taken."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = perf_counter()
+    for i in range(n_items):
+        container.append(ZoteroItem(**zotero_item_kwargs(i)))
+    seconds = perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained, seconds
+
+
+def read(container: list | AnnotationStore) -> float:
+    """Return the seconds taken to read every item and field of `container`."""
+    start = perf_counter()
+    for item in container:
+        item.get_nonempty_params()
+    return perf_counter() - start
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200_000, help="Number of formatted items")
+    args = parser.parse_args()
+
+    print(f"{args.items} formatted items")
+    print(f"{'container':>16} {'MB':>8} {'B/item':>8} {'fill s':>8} {'read s':>8}")
+    for name, container in (("list", []), ("AnnotationStore", AnnotationStore())):
+        retained, fill_seconds = fill(container, args.items)
+        read_seconds = read(container)
+        print(
+            f"{name:>16} {retained / 1e6:>8.1f} {retained / args.items:>8.0f} "
+            f"{fill_seconds:>8.2f} {read_seconds:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Benchmark formatting a note-heavy library in a pool of 1, 2, 4 and 8 processes.
+
+Builds a synthetic library of `--documents` documents with `--notes` notes each
+(HTML bodies of about `--note_kb` KB) and `--annotations` highlights each, and
+times `ZoteroAnnotationsNotes.format_items` in this process against formatting
+in a process pool: items are filtered and their document metadata resolved in
+this process, grouped by parent document into one balanced partition per
+worker, formatted in the workers with the metadata of their documents, and
+merged back (with failed items) in input order. The merged result is checked
+against `format_items`. Document metadata is served from memory, as when it is
+cached, so the timings are those of formatting.
+
+`format_item` does not process note bodies, so a formatted item costs a few
+microseconds, less than sending the raw item to a worker and the formatted item
+back; this benchmark shows what a process pool would cost on a given machine.
+
+Usage:
+    $ python -m benchmarks.bench_format_workers --documents 200 --notes 20 --note_kb 20
+"""
+
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+from multiprocessing import get_context
+from time import perf_counter
+
+from tests.stand_in import make_annotation, make_document
+from zotero2readwise.zotero import ZoteroAnnotationsNotes, ZoteroItem
+
+
+class InMemoryZotero:
+    """Zotero client stand-in serving documents from a dictionary."""
+
+    def __init__(self, documents: dict[str, dict]):
+        self.documents = documents
+
+    def item(self, key: str) -> dict:
+        return self.documents[key]
+
+
+class PartitionFormatter(ZoteroAnnotationsNotes):
+    """Formatter of a worker process, reading document metadata from a given map."""
+
+    def __init__(self, metadata: dict[str, dict]):
+        super().__init__(None, filter_colors=(), filter_tags=())
+        self.metadata = metadata
+
+    def get_item_metadata(self, annot: dict) -> dict:
+        return self.metadata[annot["data"]["parentItem"]]
+
+
+def format_partition(
+    items: list[tuple[int, dict]], metadata: dict[str, dict]
+) -> tuple[list[tuple[int, ZoteroItem]], list[tuple[int, dict]]]:
+    """Format a partition in a worker, returning formatted and failed items by input index."""
+    formatter = PartitionFormatter(metadata)
+    formatted, failed = [], []
+    for index, annot in items:
+        try:
+            formatted.append((index, formatter.format_item(annot)))
+        except Exception as e:
+            failed.append((index, {"item": annot, "error_type": type(e).__name__}))
+    return formatted, failed
+
+
+def partition_documents(
+    documents: dict[str, list[tuple[int, dict]]], n_partitions: int
+) -> list[list[tuple[int, dict]]]:
+    """Assign whole documents, largest first, to the least loaded of `n_partitions`."""
+
+    def size(items: list[tuple[int, dict]]) -> int:
+        return sum(100 + len(annot["data"].get("note", "")) for _, annot in items)
+
+    partitions: list[list] = [[] for _ in range(min(n_partitions, len(documents)))]
+    loads = [0] * len(partitions)
+    for items in sorted(documents.values(), key=size, reverse=True):
+        least_loaded = loads.index(min(loads))
+        partitions[least_loaded].extend(items)
+        loads[least_loaded] += size(items)
+    return partitions
+
+
+def format_in_processes(
+    zan: ZoteroAnnotationsNotes, items: list[dict], workers: int
+) -> tuple[list[ZoteroItem], list[dict]]:
+    """Format items in a pool of `workers` processes, partitioned by parent document."""
+    documents: dict[str, list[tuple[int, dict]]] = {}
+    metadata: dict[str, dict] = {}
+    for index, annot in enumerate(items):
+        parent_key = annot["data"]["parentItem"]
+        metadata[parent_key] = zan.get_item_metadata(annot)
+        documents.setdefault(parent_key, []).append((index, annot))
+
+    formatted: dict[int, ZoteroItem] = {}
+    failed: dict[int, dict] = {}
+    partitions = partition_documents(documents, workers)
+    with ProcessPoolExecutor(len(partitions), mp_context=get_context("spawn")) as pool:
+        results = [
+            pool.submit(
+                format_partition,
+                partition,
+                {key: metadata[key] for key in {a["data"]["parentItem"] for _, a in partition}},
+            )
+            for partition in partitions
+        ]
+        for result in results:
+            partition_formatted, partition_failed = result.result()
+            formatted.update(partition_formatted)
+            failed.update(partition_failed)
+
+    merged = [formatted[index] for index in sorted(formatted)]
+    merged.sort(key=lambda x: (x.title or "", x.sort_index or ""))
+    return merged, [failed[index] for index in sorted(failed)]
+
+
+def make_note(key: str, parent_key: str, size: int) -> dict:
+    paragraph = f"<p>Paragraph of note {key} with <strong>some</strong> markup.</p>\n"
+    body = "<div>\n" + paragraph * max(1, size // len(paragraph)) + "</div>"
+    note = make_annotation(key, parent_key, note=body, tags=[{"tag": "reading notes"}])
+    note["data"]["itemType"] = "note"
+    return note
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200, help="Number of documents")
+    parser.add_argument("--notes", type=int, default=20, help="Notes per document")
+    parser.add_argument("--note_kb", type=float, default=20, help="Size of a note body in KB")
+    parser.add_argument("--annotations", type=int, default=50, help="Highlights per document")
+    args = parser.parse_args()
+
+    documents = {f"DOC{d}": make_document(f"DOC{d}") for d in range(args.documents)}
+    items = []
+    for d in range(args.documents):
+        items += [
+            make_note(f"D{d}N{n}", f"DOC{d}", int(args.note_kb * 1000)) for n in range(args.notes)
+        ]
+        items += [make_annotation(f"D{d}A{a}", f"DOC{d}") for a in range(args.annotations)]
+    zan = ZoteroAnnotationsNotes(InMemoryZotero(documents), filter_colors=(), filter_tags=())
+    # Resolve metadata once, so all runs format with cached metadata
+    for item in items:
+        zan.get_item_metadata(item)
+
+    print(
+        f"{len(items)} items in {args.documents} documents ({args.notes} notes of "
+        f"{args.note_kb:g} KB and {args.annotations} highlights each), {os.cpu_count()} CPUs"
+    )
+    print(f"{'workers':>12} {'seconds':>9} {'speedup':>8}")
+    start = perf_counter()
+    with redirect_stdout(StringIO()):
+        expected = zan.format_items(items)
+    baseline = perf_counter() - start
+    print(f"{'in process':>12} {baseline:>9.2f} {1:>7.2f}x")
+    for workers in (1, 2, 4, 8):
+        start = perf_counter()
+        formatted, failed = format_in_processes(zan, items, workers)
+        seconds = perf_counter() - start
+        assert formatted == expected and not failed
+        print(f"{workers:>12} {seconds:>9.2f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
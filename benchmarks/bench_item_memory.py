@@ -0,0 +1,97 @@
+"""Benchmark the memory used per formatted item by ZoteroItem and ReadwiseHighlight.
+
+Builds `--items` instances of each class with realistic field values and
+measures the memory allocated for them with `tracemalloc`, once with the
+slotted classes and once with equivalent dataclasses keeping a per-instance
+`__dict__` (the previous layout). Field values are created before measuring,
+so the numbers are the overhead of the objects themselves (plus the tag lists
+`ZoteroItem` builds from its raw tags).
+
+Usage:
+    $ python -m benchmarks.bench_item_memory --items 100000
+"""
+
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import MISSING, field, fields, make_dataclass
+
+from zotero2readwise.readwise import ReadwiseHighlight
+from zotero2readwise.zotero import ZoteroItem
+
+
+def with_dict(cls: type) -> type:
+    """Return a copy of a slotted dataclass that stores its fields in `__dict__`."""
+    return make_dataclass(
+        f"{cls.__name__}WithDict",
+        [
+            (f.name, f.type) if f.default is MISSING else (f.name, f.type, field(default=f.default))
+            for f in fields(cls)
+        ],
+        namespace={"__post_init__": cls.__post_init__},
+    )
+
+
+def zotero_item_kwargs(i: int) -> dict:
+    return {
+        "key": f"KEY{i:08d}",
+        "version": i,
+        "item_type": "annotation",
+        "text": f"Highlighted passage number {i} of the document",
+        "annotated_at": "2024-01-01T12:00:00Z",
+        "annotation_url": f"https://www.zotero.org/users/1/items/KEY{i:08d}",
+        "comment": f"Comment {i}" if i % 3 == 0 else None,
+        "title": f"Document {i // 20}",
+        "tags": [{"tag": "important"}, {"tag": f"topic{i % 50}"}],
+        "document_type": "journalArticle",
+        "annotation_type": "highlight",
+        "source_url": f"https://www.zotero.org/users/1/items/DOC{i // 20}",
+        "page_label": str(i % 300),
+        "color": "#ffd400",
+        "sort_index": f"00001|{i:06d}|00100",
+    }
+
+
+def highlight_kwargs(i: int) -> dict:
+    return {
+        "text": f"Highlighted passage number {i} of the document",
+        "title": f"Document {i // 20}",
+        "author": "Jane Doe, John Smith",
+        "source_type": "zotero",
+        "category": "articles",
+        "note": f"Comment {i}\n.important .topic{i % 50}",
+        "location": i % 300 + 1,
+        "highlighted_at": "2024-01-01T12:00:00Z",
+        "highlight_url": f"zotero://open-pdf/library/items/KEY{i:08d}",
+    }
+
+
+def bytes_per_item(cls: type, all_kwargs: list[dict]) -> float:
+    """Return the memory allocated per instance when building `cls` from `all_kwargs`."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [cls(**kwargs) for kwargs in all_kwargs]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del items
+    return allocated / len(all_kwargs)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000, help="Number of instances")
+    args = parser.parse_args()
+
+    print(f"{args.items} instances per class")
+    print(f"{'class':>18} {'dict B/item':>12} {'slots B/item':>13} {'saved':>7}")
+    for cls, make_kwargs in (
+        (ZoteroItem, zotero_item_kwargs),
+        (ReadwiseHighlight, highlight_kwargs),
+    ):
+        all_kwargs = [make_kwargs(i) for i in range(args.items)]
+        before = bytes_per_item(with_dict(cls), all_kwargs)
+        after = bytes_per_item(cls, all_kwargs)
+        print(f"{cls.__name__:>18} {before:>12.0f} {after:>13.0f} {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
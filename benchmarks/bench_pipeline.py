@@ -0,0 +1,67 @@
+"""Benchmark the pipelined sync against the sequential sync using local stand-ins.
+
+Serves a synthetic library from `tests.stand_in.ZoteroStandIn` and uploads to
+`tests.stand_in.ReadwiseStandIn`, both with a fixed latency per request, and
+times `Zotero2Readwise.run` with and without `pipeline=True`.
+
+Usage:
+    $ python -m benchmarks.bench_pipeline --documents 50 --annotations 20 --latency 0.05
+"""
+
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=50, help="Number of documents")
+    parser.add_argument("--annotations", type=int, default=20, help="Annotations per document")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--batch_size", type=int, default=100, help="Highlights per upload")
+    args = parser.parse_args()
+
+    library = []
+    for d in range(args.documents):
+        library.append(make_document(f"DOC{d}"))
+        library.append(make_document(f"PDF{d}", parent_key=f"DOC{d}"))
+        library.extend(make_annotation(f"D{d}A{a}", f"PDF{d}") for a in range(args.annotations))
+
+    n_annotations = args.documents * args.annotations
+    print(
+        f"{n_annotations} annotations in {args.documents} documents, "
+        f"{args.latency * 1000:.0f} ms latency per request"
+    )
+    print(f"{'mode':>10} {'seconds':>9} {'speedup':>8}")
+    baseline = None
+    with ZoteroStandIn(library, latency=args.latency) as zotero_server:
+        for mode in ("sequential", "pipeline"):
+            with ReadwiseStandIn(latency=args.latency) as readwise_server:
+                zt_rw = Zotero2Readwise(
+                    readwise_token="stand-in",
+                    zotero_key="stand-in",
+                    zotero_library_id="1",
+                    write_failures=False,
+                    readwise_batch_size=args.batch_size,
+                    pipeline=mode == "pipeline",
+                )
+                zt_rw.zotero_client.endpoint = zotero_server.url
+                zt_rw.readwise.endpoints = ReadwiseAPI(
+                    highlights=f"{readwise_server.url}/highlights/"
+                )
+                start = perf_counter()
+                with redirect_stdout(StringIO()):
+                    zt_rw.run()
+                elapsed = perf_counter() - start
+                assert len(readwise_server.highlights) == n_annotations
+            baseline = baseline or elapsed
+            print(f"{mode:>10} {elapsed:>9.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark concurrent Readwise uploads against a local stand-in server.
+
+Uploads synthetic highlights to `tests.stand_in.ReadwiseStandIn`, which injects
+a fixed latency per request, and times `Readwise.upload_highlights` with
+increasing numbers of in-flight requests.
+
+Usage:
+    $ python -m benchmarks.bench_readwise_upload --highlights 5000 --latency 0.1
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from tests.stand_in import ReadwiseStandIn
+from zotero2readwise.readwise import Readwise, ReadwiseAPI
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--highlights", type=int, default=5000, help="Number of highlights")
+    parser.add_argument("--batch_size", type=int, default=100, help="Highlights per request")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    highlights = [
+        {"text": f"Highlight {i} " * 20, "title": f"Document {i // 50}", "location": i % 300}
+        for i in range(args.highlights)
+    ]
+    with ReadwiseStandIn(latency=args.latency) as server:
+        print(
+            f"{args.highlights} highlights in chunks of {args.batch_size}, "
+            f"{args.latency * 1000:.0f} ms latency per request"
+        )
+        print(f"{'workers':>8} {'seconds':>9} {'highlights/s':>13} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            rw = Readwise("stand-in", batch_size=args.batch_size, upload_workers=workers)
+            rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+            start = perf_counter()
+            failed = rw.upload_highlights(highlights)
+            elapsed = perf_counter() - start
+            assert not failed
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>8} {elapsed:>9.3f} {args.highlights / elapsed:>13.0f} "
+                f"{baseline / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
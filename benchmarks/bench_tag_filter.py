@@ -0,0 +1,70 @@
+"""Benchmark the bytes downloaded from Zotero when syncing with a tag filter.
+
+Serves a synthetic library from `tests.stand_in.ZoteroStandIn` in which a small
+fraction of the annotations carry the filtered tag, and compares the response
+bytes sent by the stand-in when the filter is applied client-side only (the
+previous behaviour) and when it is also pushed down into the Zotero query.
+
+Usage:
+    $ python -m benchmarks.bench_tag_filter --annotations 20000 --tagged 0.01
+"""
+
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+from unittest.mock import patch
+
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100, help="Number of documents")
+    parser.add_argument("--annotations", type=int, default=20_000, help="Number of annotations")
+    parser.add_argument("--tagged", type=float, default=0.01, help="Fraction of tagged annotations")
+    args = parser.parse_args()
+
+    every = max(1, round(1 / args.tagged))
+    library = []
+    for d in range(args.documents):
+        library.append(make_document(f"DOC{d}"))
+        library.append(make_document(f"PDF{d}", parent_key=f"DOC{d}"))
+    for a in range(args.annotations):
+        tags = [{"tag": "important" if a % every == 0 else "other"}]
+        library.append(make_annotation(f"A{a}", f"PDF{a % args.documents}", tags=tags))
+    n_tagged = len(range(0, args.annotations, every))
+
+    print(f"{args.annotations} annotations, {n_tagged} tagged 'important'")
+    print(f"{'mode':>12} {'requests':>9} {'MB sent':>9} {'seconds':>9}")
+    for mode in ("client-side", "pushdown"):
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = Zotero2Readwise(
+                readwise_token="stand-in",
+                zotero_key="stand-in",
+                zotero_library_id="1",
+                filter_tags=("important",),
+                include_filter_tags=True,
+                write_failures=False,
+            )
+            zt_rw.zotero_client.endpoint = zotero_server.url
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+            start = perf_counter()
+            with redirect_stdout(StringIO()):
+                if mode == "client-side":
+                    with patch.object(zt_rw, "filter_tags", ()):
+                        zt_rw.run()
+                else:
+                    zt_rw.run()
+            elapsed = perf_counter() - start
+            assert len(readwise_server.highlights) == n_tagged
+            print(
+                f"{mode:>12} {len(zotero_server.requests):>9} "
+                f"{zotero_server.bytes_sent / 1e6:>9.2f} {elapsed:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Benchmark concurrent Zotero page fetching against a local stand-in server.
+
+Serves a synthetic library from `tests.stand_in.ZoteroStandIn` with an injected
+per-request latency and times `ZoteroPageFetcher` with increasing worker counts.
+
+Usage:
+    $ python -m benchmarks.bench_zotero_pagination --items 5000 --latency 0.05
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from tests.stand_in import ZoteroStandIn, make_annotation
+from zotero2readwise.zotero import ZoteroPageFetcher, get_zotero_client
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000, help="Number of annotations")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    items = [make_annotation(f"A{i:07d}", "PARENT", version=i + 1) for i in range(args.items)]
+    with ZoteroStandIn(items, latency=args.latency) as server:
+        zot = get_zotero_client(library_id="1", api_key="stand-in")
+        zot.endpoint = server.url
+        print(f"{args.items} items, {args.latency * 1000:.0f} ms latency per request")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            fetcher = ZoteroPageFetcher(zot, max_workers=workers)
+            start = perf_counter()
+            n_items = sum(len(page) for page in fetcher.iter_pages(itemType="annotation"))
+            elapsed = perf_counter() - start
+            assert n_items == args.items
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
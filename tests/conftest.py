@@ -1,9 +1,13 @@
 """Pytest configuration and shared fixtures."""
 
+import itertools
 from unittest.mock import Mock
 
 import pytest
 
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded
+
 
 @pytest.fixture
 def mock_zotero_client():
@@ -99,3 +103,22 @@ def zotero_credentials():
         "library_id": "123456",
         "library_type": "user",
     }
+
+
+@pytest.fixture
+def expiring_deadline():
+    """Create deadlines that pass after a given number of `check()` calls."""
+
+    def make(n_checks: int) -> Deadline:
+        checks = itertools.count()
+
+        def check(action: str = "sending a request") -> None:
+            if next(checks) >= n_checks:
+                raise DeadlineExceeded(f"The run deadline was reached before {action}.")
+
+        deadline = Mock(spec=Deadline)
+        deadline.check.side_effect = check
+        deadline.remaining.return_value = 0.0
+        return deadline
+
+    return make
@@ -0,0 +1,333 @@
+"""Local stand-in servers for the Zotero and Readwise HTTP APIs.
+
+These servers implement just enough of each API for tests and benchmarks to
+exercise the real HTTP code paths (pyzotero and requests) without network
+access. Each server runs on a background thread bound to an ephemeral port.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from zotero2readwise.zotero import ZoteroItem
+
+
+def make_annotation(key: str, parent_key: str, version: int = 1, **data) -> dict:
+    """Build a raw Zotero annotation shaped like a Zotero Web API response."""
+    return {
+        "key": key,
+        "version": version,
+        "data": {
+            "key": key,
+            "version": version,
+            "itemType": "annotation",
+            "annotationType": "highlight",
+            "annotationText": f"Highlight {key}",
+            "annotationComment": "",
+            "annotationColor": "#ffd400",
+            "annotationPageLabel": "1",
+            "annotationSortIndex": "00000|000000|00000",
+            "parentItem": parent_key,
+            "dateModified": "2023-01-01T12:00:00Z",
+            "tags": [],
+            "relations": {},
+            **data,
+        },
+        "links": {"alternate": {"href": f"https://www.zotero.org/users/1/items/{key}"}},
+    }
+
+
+def make_document(key: str, version: int = 1, parent_key: str | None = None, **data) -> dict:
+    """Build a raw Zotero top-level item (or attachment, if `parent_key` is given)."""
+    item_data = {
+        "key": key,
+        "version": version,
+        "itemType": "attachment" if parent_key else "journalArticle",
+        "title": f"Document {key}",
+        "creators": [{"firstName": "Jane", "lastName": "Doe"}],
+        "tags": [],
+        **data,
+    }
+    if parent_key:
+        item_data["parentItem"] = parent_key
+    return {
+        "key": key,
+        "version": version,
+        "data": item_data,
+        "links": {"alternate": {"href": f"https://www.zotero.org/users/1/items/{key}"}},
+    }
+
+
+def make_zotero_item(i: int, text: str | None = None) -> ZoteroItem:
+    """Create a minimal ZoteroItem for upload tests."""
+    return ZoteroItem(
+        key=f"KEY{i}",
+        version=100,
+        item_type="annotation",
+        text=text or f"Highlight {i}",
+        annotated_at="2023-01-01T12:00:00Z",
+        annotation_url=f"https://www.zotero.org/users/123/items/KEY{i}",
+        title="Sample Paper",
+        tags=[],
+        document_type="journalArticle",
+        source_url="https://example.com",
+    )
+
+
+class _StandInServer:
+    """Base class running a `ThreadingHTTPServer` on a background thread.
+
+    Statuses queued in `fail_next` are returned (with `failure_headers`, e.g.
+    `Retry-After`) by the next requests instead of a regular response. Accepted
+    TCP connections are counted in `connections`.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: list[str] = []
+        self.request_headers: list[dict] = []
+        self.timestamps: list[float] = []
+        self.bytes_sent = 0
+        self.connections = 0
+        self.fail_next: list[int] = []
+        self.failure_headers: dict = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _pop_failure(self) -> int | None:
+        with self._lock:
+            return self.fail_next.pop(0) if self.fail_next else None
+
+    def _record(self, path: str, n_bytes: int, headers: dict) -> None:
+        with self._lock:
+            self.requests.append(path)
+            self.request_headers.append(headers)
+            self.timestamps.append(time.monotonic())
+            self.bytes_sent += n_bytes
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):  # noqa: A002
+                pass
+
+            def setup(self):
+                super().setup()
+                with stand_in._lock:
+                    stand_in.connections += 1
+
+            def _reply(self, status: int, body=None, headers: dict | None = None):
+                payload = b"" if body is None else json.dumps(body).encode("utf-8")
+                stand_in._record(self.path, len(payload), dict(self.headers))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length)) if length else None
+
+            def _fail(self) -> bool:
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                status = stand_in._pop_failure()
+                if status is None:
+                    return False
+                self._reply(status, {"detail": "stand-in failure"}, stand_in.failure_headers)
+                return True
+
+            def do_GET(self):
+                if not self._fail():
+                    stand_in.handle_get(self)
+
+            def do_POST(self):
+                body = self._body()
+                if not self._fail():
+                    stand_in.handle_post(self, body)
+
+            def do_DELETE(self):
+                if not self._fail():
+                    stand_in.handle_delete(self)
+
+        return Handler
+
+    def handle_get(self, handler) -> None:
+        handler._reply(404, {"error": "Not found"})
+
+    def handle_post(self, handler, body) -> None:
+        handler._reply(404, {"error": "Not found"})
+
+    def handle_delete(self, handler) -> None:
+        handler._reply(404, {"error": "Not found"})
+
+
+class ZoteroStandIn(_StandInServer):
+    """A minimal Zotero Web API (v3) stand-in serving an in-memory library.
+
+    Supports listing `/items` with `itemType`, `since`, `itemKey`, `tag`, `start`
+    and `limit` parameters (and `If-Modified-Since-Version`), fetching single items,
+    and `/deleted`. Responses carry the `Total-Results`, `Last-Modified-Version`
+    and `Link` (`rel="next"`) headers like the real API. `items` are served for
+    any user library; group libraries given in `groups` are served under
+    `/groups/<id>` and listed by `/users/<id>/groups`.
+
+    Example:
+        >>> with ZoteroStandIn(items, latency=0.05) as server:
+        ...     zot = Zotero("1", "user", "key")
+        ...     zot.endpoint = server.url
+    """
+
+    def __init__(
+        self,
+        items: list[dict],
+        latency: float = 0.0,
+        deleted: dict | None = None,
+        groups: dict[str, list[dict]] | None = None,
+    ):
+        super().__init__(latency=latency)
+        self.items = {item["key"]: item for item in items}
+        self.deleted = deleted or {}
+        self.groups = {
+            str(group_id): {item["key"]: item for item in group_items}
+            for group_id, group_items in (groups or {}).items()
+        }
+
+    @property
+    def library_version(self) -> int:
+        return self._version(self.items)
+
+    @staticmethod
+    def _version(library: dict) -> int:
+        return max((item["version"] for item in library.values()), default=0)
+
+    def _filter(self, library: dict, params: dict) -> list[dict]:
+        items = list(library.values())
+        if "itemType" in params:
+            items = [i for i in items if i["data"]["itemType"] == params["itemType"]]
+        if "since" in params:
+            since = int(params["since"])
+            items = [i for i in items if i["version"] > since]
+        if "itemKey" in params:
+            keys = params["itemKey"].split(",")
+            items = [library[k] for k in keys if k in library]
+        if "tag" in params:
+            wanted = set(params["tag"].split(" || "))
+            items = [i for i in items if wanted & {t["tag"] for t in i["data"].get("tags", [])}]
+        return items
+
+    def handle_get(self, handler) -> None:
+        url = urlparse(handler.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        library = self.groups.get(parts[1], {}) if parts[0] == "groups" else self.items
+        headers = {"Last-Modified-Version": self._version(library)}
+
+        if parts[0] == "users" and parts[-1] == "groups":
+            groups = [
+                {"id": int(g), "data": {"id": int(g), "name": f"Group {g}"}} for g in self.groups
+            ]
+            handler._reply(200, groups, {**headers, "Total-Results": len(groups)})
+            return
+
+        if parts[-1] == "deleted":
+            handler._reply(200, self.deleted, headers)
+            return
+
+        if len(parts) >= 4 and parts[-2] == "items":
+            item = library.get(parts[-1])
+            if item is None:
+                handler._reply(404, None, headers)
+            else:
+                handler._reply(200, item, headers)
+            return
+
+        if parts[-1] == "items":
+            if_modified = handler.headers.get("If-Modified-Since-Version")
+            if if_modified is not None and self._version(library) <= int(if_modified):
+                handler._reply(304, None, headers)
+                return
+            items = self._filter(library, params)
+            if params.get("format") == "versions":
+                handler._reply(200, {i["key"]: i["version"] for i in items}, headers)
+                return
+            start = int(params.get("start", 0))
+            limit = int(params.get("limit", 100))
+            headers["Total-Results"] = len(items)
+            if start + limit < len(items):
+                next_query = urlencode({**params, "start": start + limit, "limit": limit})
+                headers["Link"] = f'<{self.url}{url.path}?{next_query}>; rel="next"'
+            handler._reply(200, items[start : start + limit], headers)
+            return
+
+        handler._reply(404, None, headers)
+
+
+class ReadwiseStandIn(_StandInServer):
+    """A minimal Readwise API v2 stand-in recording uploaded highlights.
+
+    Like Readwise, highlights are deduplicated by book title and text, and the
+    response lists the IDs of each book's highlights (`modified_highlights`).
+    `DELETE /highlights/<id>/` removes a highlight from `stored`.
+
+    Example:
+        >>> with ReadwiseStandIn(latency=0.05) as server:
+        ...     rw = Readwise("token")
+        ...     rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency=latency)
+        self.highlights: list[dict] = []
+        self.stored: dict[int, dict] = {}
+        self.deleted_ids: list[int] = []
+        self._ids: dict[tuple, int] = {}
+
+    def handle_post(self, handler, body) -> None:
+        highlights = body.get("highlights", [])
+        books: dict[str | None, dict] = {}
+        with self._lock:
+            self.highlights.extend(highlights)
+            for highlight in highlights:
+                title = highlight.get("title")
+                highlight_id = self._ids.setdefault((title, highlight["text"]), len(self._ids) + 1)
+                self.stored[highlight_id] = highlight
+                book = books.setdefault(title, {"id": len(books) + 1, "title": title})
+                book.setdefault("modified_highlights", []).append(highlight_id)
+        handler._reply(200, list(books.values()))
+
+    def handle_delete(self, handler) -> None:
+        parts = [p for p in urlparse(handler.path).path.split("/") if p]
+        highlight_id = int(parts[-1])
+        with self._lock:
+            found = self.stored.pop(highlight_id, None) is not None
+            if found:
+                self.deleted_ids.append(highlight_id)
+        handler._reply(204 if found else 404)
@@ -0,0 +1,179 @@
+"""Tests for the persistent metadata cache module."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from tests.stand_in import make_annotation, make_document
+from zotero2readwise.cache import MetadataCache
+from zotero2readwise.retry import RetryPolicy
+from zotero2readwise.zotero import ZoteroAnnotationsNotes
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a metadata cache in a temporary directory."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite", max_entries=3)
+    yield cache
+    cache.close()
+
+
+def make_client(library_version, changed=None):
+    """Create a mock Zotero client reporting a library version and changed items."""
+    client = Mock()
+    client.last_modified_version.return_value = library_version
+    client.item_versions.return_value = changed or {}
+    return client
+
+
+class TestMetadataCache:
+    """Tests for MetadataCache."""
+
+    def test_put_and_get(self, cache):
+        """Test storing and retrieving metadata."""
+        cache.put("DOC1", 5, {"title": "Sample", "creators": ["Jane Doe"]})
+
+        assert cache.get("DOC1") == {"title": "Sample", "creators": ["Jane Doe"]}
+        assert cache.get("MISSING") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that entries survive reopening the database file."""
+        path = tmp_path / "metadata.sqlite"
+        first = MetadataCache(path)
+        first.put("DOC1", 5, {"title": "Sample"})
+        first.put_parent_mapping([("ATT1", "DOC1")])
+        first.close()
+
+        second = MetadataCache(path)
+
+        assert second.get("DOC1") == {"title": "Sample"}
+        assert second.get_parent_mapping() == {"ATT1": "DOC1"}
+        second.close()
+
+    def test_validate_first_run_records_version(self, cache):
+        """Test that an unvalidated cache is cleared and stamped with the library version."""
+        cache.put("DOC1", 5, {"title": "Stale"})
+        client = make_client(100)
+
+        cache.validate(client)
+
+        assert cache.get("DOC1") is None
+        assert cache.library_version == 100
+        client.item_versions.assert_not_called()
+
+    def test_validate_invalidates_changed_items_only(self, cache):
+        """Test that only items with a new version are dropped."""
+        cache.validate(make_client(100))
+        cache.put("DOC1", 90, {"title": "Changed"})
+        cache.put("DOC2", 95, {"title": "Unchanged"})
+        cache.put_parent_mapping([("ATT1", "DOC1"), ("ATT2", "DOC2")])
+        client = make_client(120, changed={"DOC1": 110, "ATT1": 111})
+
+        cache.validate(client)
+
+        client.item_versions.assert_called_once_with(since=100)
+        assert cache.get("DOC1") is None
+        assert cache.get("DOC2") == {"title": "Unchanged"}
+        assert cache.get_parent_mapping() == {"ATT2": "DOC2"}
+        assert cache.library_version == 120
+
+    def test_validate_unchanged_library_skips_versions_request(self, cache):
+        """Test that no item versions are requested when the library is unchanged."""
+        cache.validate(make_client(100))
+        client = make_client(100)
+
+        cache.validate(client)
+
+        client.item_versions.assert_not_called()
+
+    def test_validate_retries_transient_failures(self, cache):
+        """Test that the version requests go through the retry policy."""
+        cache.validate(make_client(100))
+        cache.put("DOC1", 90, {"title": "Changed"})
+        client = make_client(120, changed={"DOC1": 110})
+        client.last_modified_version.side_effect = [ConnectionError("reset"), 120]
+        client.item_versions.side_effect = [ConnectionError("reset"), {"DOC1": 110}]
+        policy = RetryPolicy(base_delay=0)
+
+        cache.validate(client, policy)
+
+        assert policy.retries == 2
+        assert cache.get("DOC1") is None
+        assert cache.library_version == 120
+
+    def test_flush_evicts_least_recently_used(self, cache):
+        """Test size-bounded eviction of the least recently used entries."""
+        for i in range(4):
+            cache.put(f"DOC{i}", 1, {"title": str(i)})
+        cache.put_parent_mapping([("ATT0", "DOC0"), ("ATT3", "DOC3")])
+        cache.get("DOC0")
+
+        cache.flush()
+
+        assert len(cache) == 3
+        assert cache.get("DOC1") is None
+        assert cache.get("DOC0") is not None
+        assert cache.get_parent_mapping() == {"ATT0": "DOC0", "ATT3": "DOC3"}
+
+
+class TestMetadataCacheWithAnnotationsNotes:
+    """Tests for the persistent cache used by ZoteroAnnotationsNotes."""
+
+    def test_second_run_is_served_from_disk(self, tmp_path):
+        """Test that a later run does not re-download unchanged document metadata."""
+        path = tmp_path / "metadata.sqlite"
+        library = {
+            "ATT1": make_document("ATT1", parent_key="DOC1"),
+            "DOC1": make_document("DOC1", version=7, title="Cached"),
+        }
+        annots = [make_annotation("A1", "ATT1")]
+
+        first_client = make_client(10)
+        first_client.items.side_effect = lambda itemKey, limit: [
+            library[key] for key in itemKey.split(",")
+        ]
+        first_cache = MetadataCache(path)
+        zan = ZoteroAnnotationsNotes(first_client, (), (), metadata_cache=first_cache)
+        zan.prefetch_metadata(annots)
+        zan.format_items(annots)
+        first_cache.close()
+
+        second_client = make_client(10)
+        second_cache = MetadataCache(path)
+        zan = ZoteroAnnotationsNotes(second_client, (), (), metadata_cache=second_cache)
+        zan.prefetch_metadata(annots)
+        formatted = zan.format_items(annots)
+        second_cache.close()
+
+        assert formatted[0].title == "Cached"
+        second_client.items.assert_not_called()
+        second_client.item.assert_not_called()
+
+    def test_failed_validation_is_retried_before_serving_from_disk(self, tmp_path):
+        """Test that a failed validation does not leave stale entries in use."""
+        path = tmp_path / "metadata.sqlite"
+        first_cache = MetadataCache(path)
+        first_cache.validate(make_client(10))
+        first_cache.put("DOC1", 7, {"title": "Stale"})
+        first_cache.put_parent_mapping([("ATT1", "DOC1")])
+        first_cache.close()
+
+        client = make_client(12, changed={"DOC1": 11})
+        client.last_modified_version.side_effect = [ConnectionError("reset"), 12]
+        client.item.side_effect = lambda key: {
+            "ATT1": make_document("ATT1", parent_key="DOC1"),
+            "DOC1": make_document("DOC1", version=11, title="Fresh"),
+        }[key]
+        cache = MetadataCache(path)
+        zan = ZoteroAnnotationsNotes(
+            client, (), (), metadata_cache=cache, retry_policy=RetryPolicy(max_retries=0)
+        )
+        annot = make_annotation("A1", "ATT1")
+
+        with pytest.raises(ConnectionError):
+            zan.get_item_metadata(annot)
+        metadata = zan.get_item_metadata(annot)
+        cache.close()
+
+        assert metadata["title"] == "Fresh"
+        client.item_versions.assert_called_once_with(since=10)
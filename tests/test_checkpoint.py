@@ -0,0 +1,276 @@
+"""Tests for checkpoint module and resumed syncs."""
+
+import pytest
+
+from tests.stand_in import (
+    ReadwiseStandIn,
+    ZoteroStandIn,
+    make_annotation,
+    make_document,
+    make_zotero_item,
+)
+from zotero2readwise.checkpoint import FETCHING, UPLOADING, SyncCheckpoint, sync_signature
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    """Create a sync checkpoint in a temporary directory."""
+    checkpoint = SyncCheckpoint(tmp_path / "checkpoint.sqlite")
+    yield checkpoint
+    checkpoint.close()
+
+
+@pytest.fixture
+def library():
+    items = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+    items += [make_annotation(f"A{i:03d}", "PDF1") for i in range(120)]
+    return items
+
+
+class TestSyncCheckpoint:
+    """Tests for SyncCheckpoint."""
+
+    def test_begin_new_sync(self, checkpoint):
+        """Test that a new sync starts in the fetching stage."""
+        assert checkpoint.stage is None
+        assert checkpoint.begin("sync", 10) is False
+        assert checkpoint.stage == FETCHING
+        assert checkpoint.library_version == 10
+
+    def test_fetch_progress(self, checkpoint):
+        """Test that recorded pages are returned with the offset to continue from."""
+        checkpoint.begin("sync", 10)
+        assert checkpoint.fetch_progress("annotation") == ([], 0)
+
+        checkpoint.save_page("annotation", 0, [{"key": "A1"}, {"key": "A2"}])
+        checkpoint.save_page("annotation", 2, [{"key": "A3"}])
+        assert checkpoint.fetch_progress("annotation") == (
+            [{"key": "A1"}, {"key": "A2"}, {"key": "A3"}],
+            3,
+        )
+
+        checkpoint.finish_fetch("annotation")
+        assert checkpoint.fetch_progress("annotation")[1] is None
+        assert checkpoint.fetch_progress("note") == ([], 0)
+
+    def test_resume_same_sync(self, tmp_path):
+        """Test that progress survives reopening the database."""
+        checkpoint = SyncCheckpoint(tmp_path / "checkpoint.sqlite")
+        checkpoint.begin("sync", 10)
+        checkpoint.save_page("annotation", 0, [{"key": "A1"}])
+        checkpoint.close()
+
+        reopened = SyncCheckpoint(tmp_path / "checkpoint.sqlite")
+        assert reopened.begin("sync", 10) is True
+        assert reopened.fetch_progress("annotation") == ([{"key": "A1"}], 1)
+        reopened.close()
+
+    def test_other_sync_discards_progress(self, checkpoint):
+        """Test that the checkpoint of a differently configured sync is discarded."""
+        checkpoint.begin("sync", 10)
+        checkpoint.save_formatted([make_zotero_item(1)])
+
+        assert checkpoint.begin("other sync", 10) is False
+        assert checkpoint.stage == FETCHING
+        assert len(checkpoint) == 0
+
+    def test_library_change_discards_fetched_pages(self, checkpoint):
+        """Test that fetched pages are discarded once the library changed."""
+        checkpoint.begin("sync", 10)
+        checkpoint.save_page("annotation", 0, [{"key": "A1"}])
+
+        assert checkpoint.begin("sync", 11) is False
+        assert checkpoint.fetch_progress("annotation") == ([], 0)
+        assert checkpoint.library_version == 11
+
+    def test_library_change_keeps_pending_upload(self, checkpoint):
+        """Test that formatted items are still uploaded after the library changed."""
+        checkpoint.begin("sync", 10)
+        checkpoint.save_formatted([make_zotero_item(1)])
+
+        assert checkpoint.begin("sync", 11) is True
+        assert checkpoint.library_version == 10
+        assert len(checkpoint) == 1
+
+    def test_save_formatted_round_trip(self, checkpoint):
+        """Test that formatted items are restored unchanged and in order."""
+        item = make_zotero_item(1)
+        item.tags = ["a", "b"]
+        item.document_tags = ["doc"]
+        item.creators = "Jane Doe, John Smith"
+        item.relations = ["http://zotero.org/users/1/items/X"]
+        checkpoint.begin("sync", 10)
+        checkpoint.save_page("annotation", 0, [{"key": "KEY1"}])
+
+        checkpoint.save_formatted([item, make_zotero_item(2)])
+
+        assert checkpoint.stage == UPLOADING
+        assert checkpoint.pending_items() == [item, make_zotero_item(2)]
+        assert checkpoint.fetch_progress("annotation") == ([], 0)
+
+    def test_acknowledge(self, checkpoint):
+        """Test that acknowledged items are no longer pending."""
+        checkpoint.begin("sync", 10)
+        checkpoint.save_formatted([make_zotero_item(i) for i in range(3)])
+
+        checkpoint.acknowledge(["KEY0", "KEY2"])
+
+        assert [item.key for item in checkpoint.pending_items()] == ["KEY1"]
+
+    def test_clear(self, checkpoint):
+        """Test that clear() forgets the sync."""
+        checkpoint.begin("sync", 10)
+        checkpoint.save_formatted([make_zotero_item(1)])
+
+        checkpoint.clear()
+
+        assert checkpoint.stage is None
+        assert len(checkpoint) == 0
+
+    def test_failed_save_leaves_checkpoint_unchanged(self, checkpoint):
+        """Test that a page is recorded atomically with its offset."""
+        checkpoint.begin("sync", 10)
+        checkpoint.save_page("annotation", 0, [{"key": "A1"}])
+
+        with pytest.raises(TypeError):
+            checkpoint.save_page("annotation", 1, [{"key": "A2"}, {"key": object()}])
+
+        assert checkpoint.fetch_progress("annotation") == ([{"key": "A1"}], 1)
+
+    def test_sync_signature(self):
+        """Test that signatures do not depend on argument order or sequence type."""
+        assert sync_signature(since=0, filter_tags=("a",)) == sync_signature(
+            filter_tags=["a"], since=0
+        )
+        assert sync_signature(since=0) != sync_signature(since=5)
+
+
+class TestResumedSync:
+    """Tests for resuming an interrupted sync from its checkpoint."""
+
+    def make_zt_rw(self, tmp_path, zotero_server, readwise_server, **kwargs):
+        zt_rw = Zotero2Readwise(
+            readwise_token="token",
+            zotero_key="key",
+            zotero_library_id="1",
+            write_failures=False,
+            checkpoint_path=str(tmp_path / "checkpoint.sqlite"),
+            **kwargs,
+        )
+        zt_rw.zotero_client.endpoint = zotero_server.url
+        zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+        return zt_rw
+
+    @staticmethod
+    def listing_requests(zotero_server) -> list[str]:
+        return [path for path in zotero_server.requests if "itemType=annotation" in path]
+
+    @pytest.mark.parametrize("fetch_workers", [1, 3])
+    def test_resume_fetch(self, tmp_path, library, expiring_deadline, fetch_workers):
+        """Test that pages fetched before an interruption are not requested again."""
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = self.make_zt_rw(
+                tmp_path, zotero_server, readwise_server, page_size=20, fetch_workers=fetch_workers
+            )
+            # Library version and the first three pages
+            with pytest.raises(DeadlineExceeded):
+                zt_rw.run(deadline=expiring_deadline(4))
+            first_run = self.listing_requests(zotero_server)
+            assert readwise_server.highlights == []
+            zotero_server.requests.clear()
+
+            self.make_zt_rw(
+                tmp_path, zotero_server, readwise_server, page_size=20, fetch_workers=fetch_workers
+            ).run()
+            second_run = self.listing_requests(zotero_server)
+
+        assert len(first_run) >= 3
+        assert not any("start=0&" in path for path in second_run)
+        assert len(first_run) + len(second_run) <= 120 // 20 + 2 * fetch_workers
+        assert sorted(h["text"] for h in readwise_server.highlights) == [
+            f"Highlight A{i:03d}" for i in range(120)
+        ]
+
+    @pytest.mark.parametrize("upload_workers", [1, 3])
+    def test_resume_upload(self, tmp_path, library, expiring_deadline, upload_workers):
+        """Test that a resumed upload skips Zotero and acknowledged chunks."""
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = self.make_zt_rw(
+                tmp_path,
+                zotero_server,
+                readwise_server,
+                readwise_batch_size=10,
+                readwise_upload_workers=upload_workers,
+            )
+            # Library version, two listing pages, one metadata lookup, then chunks
+            with pytest.raises(DeadlineExceeded):
+                zt_rw.run(deadline=expiring_deadline(10))
+            n_first_run = len(readwise_server.highlights)
+            zotero_server.requests.clear()
+
+            zt_rw = self.make_zt_rw(
+                tmp_path,
+                zotero_server,
+                readwise_server,
+                readwise_batch_size=10,
+                readwise_upload_workers=upload_workers,
+            )
+            zt_rw.run()
+
+        assert 0 < n_first_run < 120
+        assert self.listing_requests(zotero_server) == []
+        texts = [h["text"] for h in readwise_server.highlights]
+        assert sorted(texts) == [f"Highlight A{i:03d}" for i in range(120)]
+        assert zt_rw.checkpoint.stage is None
+
+    def test_failed_chunk_is_retried_once(self, tmp_path, library, monkeypatch):
+        """Test that only the items of a failed chunk are uploaded by the next run."""
+        monkeypatch.chdir(tmp_path)  # The failed request is logged to the working directory
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            readwise_server.fail_next = [400]
+            zt_rw = self.make_zt_rw(tmp_path, zotero_server, readwise_server, max_retries=0)
+            zt_rw.readwise.batch_size = 50
+            with pytest.raises(Zotero2ReadwiseError):
+                zt_rw.run()
+            assert len(zt_rw.checkpoint) == 50
+            readwise_server.highlights.clear()
+
+            zt_rw = self.make_zt_rw(tmp_path, zotero_server, readwise_server)
+            zt_rw.run()
+
+        assert len(readwise_server.highlights) == 50
+        assert zt_rw.checkpoint.stage is None
+
+    def test_library_version_is_start_version(self, tmp_path, library, expiring_deadline):
+        """Test that a resumed sync reports the library version it started at."""
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = self.make_zt_rw(
+                tmp_path, zotero_server, readwise_server, readwise_batch_size=10
+            )
+            with pytest.raises(DeadlineExceeded):
+                zt_rw.run(deadline=expiring_deadline(8))
+            start_version = zotero_server.library_version
+            zotero_server.items["NEW"] = make_annotation("NEW", "PDF1", version=start_version + 1)
+
+            zt_rw = self.make_zt_rw(
+                tmp_path, zotero_server, readwise_server, readwise_batch_size=10
+            )
+            zt_rw.run()
+
+        assert zt_rw.library_version == start_version
+        assert "Highlight NEW" not in {h["text"] for h in readwise_server.highlights}
+
+    def test_checkpoint_requires_default_mode(self, tmp_path):
+        """Test that checkpoints are rejected for streaming and pipelined runs."""
+        for mode in ({"stream": True}, {"pipeline": True}):
+            with pytest.raises(ValueError):
+                Zotero2Readwise(
+                    readwise_token="token",
+                    zotero_key="key",
+                    zotero_library_id="1",
+                    checkpoint_path=str(tmp_path / "checkpoint.sqlite"),
+                    **mode,
+                )
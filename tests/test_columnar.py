@@ -0,0 +1,156 @@
+"""Tests for columnar module."""
+
+import json
+import tracemalloc
+from dataclasses import asdict
+from unittest.mock import Mock
+
+import pytest
+
+from tests.stand_in import make_annotation, make_document
+from zotero2readwise.columnar import AnnotationStore
+from zotero2readwise.readwise import Readwise
+from zotero2readwise.zotero import ZoteroAnnotationsNotes, ZoteroItem
+
+
+def make_item(i: int, **fields) -> ZoteroItem:
+    """Create a ZoteroItem with most fields set."""
+    item = ZoteroItem(
+        key=f"KEY{i:05d}",
+        version=i,
+        item_type="annotation",
+        text=f"Highlight {i}",
+        annotated_at="2024-01-01T12:00:00Z",
+        annotation_url=f"https://www.zotero.org/users/1/items/KEY{i:05d}",
+        comment=f"Comment {i}" if i % 2 else None,
+        title=f"Document {i // 10}",
+        tags=[{"tag": "important"}, {"tag": f"topic {i % 3}"}],
+        document_tags=[{"tag": "book"}],
+        document_type="book",
+        annotation_type="highlight",
+        creators=["Jane Doe", "John Smith"],
+        source_url=f"https://www.zotero.org/users/1/items/DOC{i // 10}",
+        attachment_url=f"https://www.zotero.org/users/1/items/PDF{i // 10}",
+        page_label=str(i % 7),
+        color="#ffd400",
+        sort_index=f"00001|{i:06d}|00100",
+    )
+    for name, value in fields.items():
+        setattr(item, name, value)
+    return item
+
+
+@pytest.fixture
+def library():
+    """Raw documents and annotations, decoded like API responses."""
+    documents = {
+        f"DOC{d}": make_document(
+            f"DOC{d}",
+            title=f"Document Title {d}",
+            creators=[{"firstName": "Jane", "lastName": f"Doe{d}", "creatorType": "author"}],
+            tags=[{"tag": "book"}, {"tag": f"shelf {d}"}],
+        )
+        for d in range(3)
+    }
+    annotations = [
+        make_annotation(
+            f"A{i:04d}",
+            f"DOC{i % 3}",
+            annotationColor=("#ffd400", "#ff6666")[i % 2],
+            annotationPageLabel=str(i % 40),
+            annotationSortIndex=f"00001|{i:06d}|00100",
+            tags=[{"tag": "important"}],
+        )
+        for i in range(300)
+    ]
+    return documents, json.loads(json.dumps(annotations))
+
+
+def format_library(library, into=None):
+    documents, annotations = library
+    zan = ZoteroAnnotationsNotes(Mock(item=documents.get), filter_colors=[], filter_tags=[])
+    return zan.format_items(annotations, into=into)
+
+
+class TestAnnotationStore:
+    """Tests for AnnotationStore."""
+
+    def test_round_trip(self):
+        """Test that stored items are read back equal, including empty and unicode fields."""
+        items = [
+            make_item(0),
+            make_item(1, text="", comment="", tags=[], page_label=None),
+            make_item(
+                2,
+                text="Zitat „über“ 漢字 😀",
+                title="Ünïcödé",
+                relations=["http://zotero.org/users/1/items/KEY00001"],
+            ),
+            make_item(3, document_tags=None, creators=None, source_url=None, color=None),
+        ]
+
+        store = AnnotationStore(items)
+
+        assert len(store) == 4
+        assert list(store) == items
+        assert store[-2] == items[2]
+        assert store[1:3] == items[1:3]
+        with pytest.raises(IndexError):
+            store[4]
+
+    def test_sort(self):
+        """Test that the store is sorted like a list, stably, and can be appended to."""
+        items = [make_item(i, title=f"Document {i % 3}") for i in range(12)]
+        store = AnnotationStore(items)
+
+        store.sort(key=lambda x: (x.title or "", x.sort_index or ""))
+        store.append(make_item(12))
+
+        expected = sorted(items, key=lambda x: (x.title or "", x.sort_index or ""))
+        assert list(store) == [*expected, make_item(12)]
+
+    def test_documents_are_stored_once(self):
+        """Test that the items of a document share its field values."""
+        store = AnnotationStore(make_item(i) for i in range(30))
+
+        assert len(store._documents._values) == 3
+        assert store[0].creators is store[1].creators
+        assert store[0].document_tags is store[1].document_tags
+        assert store[0].document_tags == ["book"]
+
+    def test_format_items_into_store(self, library):
+        """Test that formatting into a store gives the same items, in the same order."""
+        assert list(format_library(library, into=AnnotationStore())) == format_library(library)
+
+    def test_readwise_highlights_from_store(self, library):
+        """Test that the Readwise payload built from a store matches the one from a list."""
+        readwise = Readwise("token")
+
+        def payload(items):
+            return [
+                asdict(readwise.convert_zotero_annotation_to_readwise_highlight(item))
+                for item in items
+            ]
+
+        assert payload(format_library(library, into=AnnotationStore())) == payload(
+            format_library(library)
+        )
+
+    def test_uses_less_memory_than_items(self, library):
+        """Test that a store takes a fraction of the memory of the ZoteroItems it holds."""
+        serialized = [json.dumps(asdict(item)) for item in format_library(library)]
+
+        def retained(into):
+            tracemalloc.start()
+            start = tracemalloc.get_traced_memory()[0]
+            for fields in serialized:
+                # Every item gets its own strings, as when decoded from a response
+                item = ZoteroItem.__new__(ZoteroItem)
+                for name, value in json.loads(fields).items():
+                    setattr(item, name, value)
+                into.append(item)
+            size = tracemalloc.get_traced_memory()[0] - start
+            tracemalloc.stop()
+            return size
+
+        assert retained(AnnotationStore()) < 0.5 * retained([])
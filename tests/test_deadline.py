@@ -0,0 +1,37 @@
+"""Tests for deadline module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
+
+
+class TestDeadline:
+    """Tests for Deadline class."""
+
+    @patch("zotero2readwise.deadline.time.monotonic", return_value=100.0)
+    def test_after(self, mock_monotonic):
+        """Test that after() counts from the current monotonic time."""
+        deadline = Deadline.after(30)
+
+        assert deadline.expires_at == 130.0
+        assert deadline.remaining() == 30.0
+        assert not deadline.expired
+
+    @patch("zotero2readwise.deadline.time.monotonic", return_value=200.0)
+    def test_expired(self, mock_monotonic):
+        """Test a deadline in the past."""
+        deadline = Deadline(expires_at=150.0)
+
+        assert deadline.expired
+        assert deadline.remaining() == 0.0
+
+    def test_check_raises_once_expired(self):
+        """Test that check() raises DeadlineExceeded, a Zotero2ReadwiseError."""
+        Deadline.after(60).check()
+
+        with pytest.raises(DeadlineExceeded, match="before uploading chunk 3") as exc_info:
+            Deadline(expires_at=0.0).check("uploading chunk 3")
+        assert isinstance(exc_info.value, Zotero2ReadwiseError)
@@ -0,0 +1,141 @@
+"""Tests for filters module."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from zotero2readwise.filters import compile_filter
+
+
+def make_item(
+    item_type: str = "annotation",
+    color: str | None = "#ffd400",
+    tags: tuple[str, ...] = (),
+    date_modified: str = "2024-06-15T12:00:00Z",
+    parent: str = "DOC1",
+) -> dict:
+    """Create a raw Zotero item with the fields filters look at."""
+    data = {
+        "itemType": item_type,
+        "tags": [{"tag": tag} for tag in tags],
+        "dateModified": date_modified,
+        "parentItem": parent,
+    }
+    if color is not None:
+        data["annotationColor"] = color
+    return {"data": data}
+
+
+class TestCompileFilter:
+    """Tests for compile_filter."""
+
+    def test_no_criteria(self):
+        """Test that no criteria compile to no predicate."""
+        assert compile_filter() is None
+        assert compile_filter("  ") is None
+
+    def test_colors_and_tags(self):
+        """Test that simple color and tag filters must both match."""
+        matches = compile_filter(colors=["#ffd400", "#ff6666"], tags=["important"])
+
+        assert matches(make_item(tags=("important", "other")))
+        assert not matches(make_item(color="#5fb236", tags=("important",)))
+        assert not matches(make_item(tags=("other",)))
+        assert not matches(make_item(item_type="note", color=None, tags=("important",)))
+
+    @pytest.mark.parametrize(
+        ("expression", "item", "expected"),
+        [
+            ("color:yellow", make_item(), True),
+            ("color:#FFD400,red", make_item(color="#ff6666"), True),
+            ("color:blue", make_item(), False),
+            ('tag:"to read"', make_item(tags=("to read",)), True),
+            ('tag:x,"to read"', make_item(tags=("to",)), False),
+            ("type:note", make_item(item_type="note", color=None), True),
+            ("type:note", make_item(), False),
+            ("after:2024-06-15", make_item(), True),
+            ("after:2024-06-15T12:00:01Z", make_item(), False),
+            ("before:2024-06-15T12:00:00Z", make_item(), False),
+            ("before:2024-06-16", make_item(), True),
+            ("before:2024-06-16T00:00:00+00:00", make_item(), True),
+        ],
+    )
+    def test_criteria(self, expression, item, expected):
+        """Test each criterion on its own."""
+        assert compile_filter(expression)(item) is expected
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ("after:2024-06-15T12:00:00", True),
+            ("after:2024-06-15T12:00:00.5", False),
+            ("after:2024-06-15T11:59:59.5Z", True),
+            ("before:2024-06-15T12:00:00", False),
+            ("before:2024-06-15T12:00:00.5", True),
+        ],
+    )
+    def test_date_bounds_with_fractional_seconds(self, expression, expected):
+        """Test that bounds between whole seconds compare correctly with Zotero dates."""
+        item = make_item(date_modified="2024-06-15T12:00:00Z")
+
+        assert compile_filter(expression)(item) is expected
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ("tag:a and tag:b", [True, False, False, False]),
+            ("tag:a or tag:b", [True, True, True, False]),
+            ("not tag:a", [False, False, True, True]),
+            ("NOT NOT tag:a", [True, True, False, False]),
+            ("tag:a or tag:b and not tag:a", [True, True, True, False]),
+            ("(tag:a or tag:b) and not tag:a", [False, False, True, False]),
+            ("not (tag:a or tag:b)", [False, False, False, True]),
+        ],
+    )
+    def test_composition(self, expression, expected):
+        """Test and, or, not and parentheses, with not binding tightest and or loosest."""
+        items = [make_item(tags=tags) for tags in (("a", "b"), ("a",), ("b",), ())]
+
+        assert [compile_filter(expression)(item) for item in items] == expected
+
+    def test_document_type(self):
+        """Test that the parent metadata is only looked up when the criterion is reached."""
+        document_metadata = Mock(return_value={"document_type": "book"})
+        matches = compile_filter(
+            "type:note or doctype:book,thesis", document_metadata=document_metadata
+        )
+
+        assert matches(make_item(item_type="note", color=None))
+        document_metadata.assert_not_called()
+        assert matches(make_item())
+        document_metadata.assert_called_once()
+        document_metadata.return_value = {"document_type": "journalArticle"}
+        assert not matches(make_item())
+
+    def test_combined_with_simple_filters(self):
+        """Test that an expression must match in addition to colors and tags."""
+        matches = compile_filter("not tag:skip", colors=["#ffd400"], tags=["important"])
+
+        assert matches(make_item(tags=("important",)))
+        assert not matches(make_item(tags=("important", "skip")))
+        assert not matches(make_item(color="#ff6666", tags=("important",)))
+
+    @pytest.mark.parametrize(
+        ("expression", "message"),
+        [
+            ("tag:a and", "at the end: unexpected end"),
+            ("tag:a tag:b", "at 'tag:b': expected 'and', 'or'"),
+            ("(tag:a or tag:b", "at the end: expected '\\)'"),
+            ("tag:a)", "at '\\)'"),
+            ("important", "at 'important': expected a criterion"),
+            ("size:big", "unknown criterion 'size:'"),
+            ("after:yesterday", "not an ISO date"),
+            ("after:2024-01-01,2024-02-01", "single date"),
+            ("before:2024-01-01T00:00:00+02:00", "not in UTC"),
+            ("doctype:book", "needs the metadata"),
+        ],
+    )
+    def test_invalid_expressions(self, expression, message):
+        """Test that malformed expressions are rejected when compiled."""
+        with pytest.raises(ValueError, match=message):
+            compile_filter(expression)
@@ -0,0 +1,218 @@
+"""Tests for the Readwise upload ledger module."""
+
+import sqlite3
+
+import pytest
+
+from tests.stand_in import ReadwiseStandIn, make_zotero_item
+from zotero2readwise.exception import Zotero2ReadwiseError
+from zotero2readwise.ledger import UploadLedger
+from zotero2readwise.readwise import Readwise, ReadwiseAPI
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """Create an upload ledger in a temporary directory."""
+    ledger = UploadLedger(tmp_path / "uploads.sqlite")
+    yield ledger
+    ledger.close()
+
+
+def make_readwise(server, ledger, **kwargs):
+    """Create a Readwise client posting to a stand-in server."""
+    rw = Readwise("token", ledger=ledger, **kwargs)
+    rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+    return rw
+
+
+class TestUploadLedger:
+    """Tests for UploadLedger."""
+
+    def test_fingerprint_ignores_key_order(self):
+        """Test that fingerprints depend on content, not dictionary order."""
+        assert UploadLedger.fingerprint({"text": "a", "title": "b"}) == UploadLedger.fingerprint(
+            {"title": "b", "text": "a"}
+        )
+        assert UploadLedger.fingerprint({"text": "a"}) != UploadLedger.fingerprint({"text": "b"})
+
+    def test_record_and_lookup(self, ledger):
+        """Test recording uploaded fingerprints."""
+        ledger.record([("A1", "fp1"), ("A2", "fp2")])
+
+        assert ledger.is_uploaded("A1", "fp1")
+        assert not ledger.is_uploaded("A1", "other")
+        assert ledger.get("MISSING") is None
+        assert len(ledger) == 2
+
+    def test_record_replaces_fingerprint(self, ledger):
+        """Test that re-uploading a key replaces its fingerprint."""
+        ledger.record([("A1", "fp1")])
+        ledger.record([("A1", "fp2")])
+
+        assert ledger.get("A1") == "fp2"
+        assert len(ledger) == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that entries survive reopening the database file."""
+        path = tmp_path / "uploads.sqlite"
+        first = UploadLedger(path)
+        first.record([("A1", "fp1")])
+        first.close()
+
+        second = UploadLedger(path)
+        assert second.is_uploaded("A1", "fp1")
+        second.close()
+
+    def test_highlight_ids(self, ledger):
+        """Test recording and looking up Readwise highlight IDs."""
+        ledger.record([("A1", "fp1"), ("A2", "fp2"), ("A3", "fp3")], [11, None, 13])
+
+        assert ledger.highlight_ids(["A1", "A2", "A3", "MISSING"]) == {"A1": 11, "A3": 13}
+
+    def test_unknown_highlight_id_keeps_previous_id(self, ledger):
+        """Test that re-recording a key without an ID keeps its known ID."""
+        ledger.record([("A1", "fp1")], [11])
+        ledger.record([("A1", "fp2")])
+
+        assert ledger.get("A1") == "fp2"
+        assert ledger.highlight_ids(["A1"]) == {"A1": 11}
+
+    def test_remove(self, ledger):
+        """Test forgetting keys."""
+        ledger.record([("A1", "fp1"), ("A2", "fp2")], [11, 12])
+        ledger.remove(["A1"])
+
+        assert ledger.get("A1") is None
+        assert ledger.highlight_ids(["A1", "A2"]) == {"A2": 12}
+
+    def test_upgrades_ledger_without_highlight_ids(self, tmp_path):
+        """Test that a ledger created before highlight IDs were stored is upgraded."""
+        path = tmp_path / "uploads.sqlite"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE uploads (key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+            "uploaded_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO uploads VALUES ('A1', 'fp1', 0)")
+        conn.commit()
+        conn.close()
+
+        ledger = UploadLedger(path)
+        ledger.record([("A2", "fp2")], [12])
+
+        assert ledger.is_uploaded("A1", "fp1")
+        assert ledger.highlight_ids(["A1", "A2"]) == {"A2": 12}
+        ledger.close()
+
+
+class TestReadwiseWithLedger:
+    """Tests for skipping already uploaded highlights."""
+
+    def test_second_run_skips_unchanged_highlights(self, ledger):
+        """Test that unchanged highlights are not uploaded again."""
+        items = [make_zotero_item(i) for i in range(4)]
+        with ReadwiseStandIn() as server:
+            make_readwise(server, ledger).post_zotero_annotations_to_readwise(items)
+            make_readwise(server, ledger).post_zotero_annotations_to_readwise(items)
+
+        assert len(server.highlights) == 4
+        assert len(server.requests) == 1
+        assert len(ledger) == 4
+
+    def test_changed_highlight_is_uploaded_again(self, ledger):
+        """Test that a highlight whose payload changed is re-uploaded."""
+        with ReadwiseStandIn() as server:
+            make_readwise(server, ledger).post_zotero_annotations_to_readwise(
+                [make_zotero_item(0), make_zotero_item(1)]
+            )
+            make_readwise(server, ledger).post_zotero_annotations_to_readwise(
+                [make_zotero_item(0), make_zotero_item(1, text="Edited highlight")]
+            )
+
+        assert [h["text"] for h in server.highlights] == [
+            "Highlight 0",
+            "Highlight 1",
+            "Edited highlight",
+        ]
+
+    def test_custom_tag_change_invalidates_fingerprint(self, ledger):
+        """Test that a different custom tag changes the uploaded payload."""
+        items = [make_zotero_item(0)]
+        with ReadwiseStandIn() as server:
+            make_readwise(server, ledger).post_zotero_annotations_to_readwise(items)
+            make_readwise(server, ledger, custom_tag="zotero").post_zotero_annotations_to_readwise(
+                items
+            )
+
+        assert len(server.highlights) == 2
+
+    def test_failed_chunk_is_not_recorded(self, ledger, tmp_path, monkeypatch):
+        """Test that only highlights of successful chunks are recorded."""
+        monkeypatch.chdir(tmp_path)
+        items = [make_zotero_item(i) for i in range(4)]
+        with ReadwiseStandIn() as server:
+            server.fail_next = [400]
+            rw = make_readwise(server, ledger, batch_size=2)
+            with pytest.raises(Zotero2ReadwiseError):
+                rw.post_zotero_annotations_to_readwise(items)
+
+        assert len(ledger) == 2
+        assert [h["text"] for h in server.highlights] == ["Highlight 2", "Highlight 3"]
+        assert ledger.get(items[0].key) is None
+        assert ledger.get(items[2].key) is not None
+
+    def test_concurrent_upload_records_entries_per_chunk(self, ledger):
+        """Test that ledger entries stay aligned with chunks when uploading concurrently."""
+        items = [make_zotero_item(i) for i in range(7)]
+        with ReadwiseStandIn(latency=0.01) as server:
+            rw = make_readwise(server, ledger, batch_size=2, upload_workers=3)
+            rw.post_zotero_annotations_to_readwise(items)
+
+        rw_check = Readwise("token")
+        for item in items:
+            highlight = rw_check.convert_zotero_annotation_to_readwise_highlight(item)
+            fingerprint = UploadLedger.fingerprint(highlight.get_nonempty_params())
+            assert ledger.is_uploaded(item.key, fingerprint)
+
+    def test_upload_records_highlight_ids(self, ledger):
+        """Test that the IDs from Readwise's response are stored per Zotero key."""
+        items = [make_zotero_item(i) for i in range(3)]
+        with ReadwiseStandIn() as server:
+            make_readwise(server, ledger).post_zotero_annotations_to_readwise(items)
+
+        ids = ledger.highlight_ids(item.key for item in items)
+        assert {server.stored[ids[item.key]]["text"] for item in items} == {
+            item.text for item in items
+        }
+
+    def test_delete_highlights(self, ledger):
+        """Test that highlights of deleted Zotero items are deleted from Readwise."""
+        items = [make_zotero_item(i) for i in range(3)]
+        with ReadwiseStandIn() as server:
+            rw = make_readwise(server, ledger)
+            rw.post_zotero_annotations_to_readwise(items)
+            gone_id = ledger.highlight_ids(["KEY1"])["KEY1"]
+
+            n_deleted = rw.delete_highlights(["KEY1", "NEVER_UPLOADED"])
+
+        assert n_deleted == 1
+        assert server.deleted_ids == [gone_id]
+        assert sorted(h["text"] for h in server.stored.values()) == ["Highlight 0", "Highlight 2"]
+        assert ledger.get("KEY1") is None
+
+    def test_delete_highlight_already_gone(self, ledger):
+        """Test that a highlight already deleted in Readwise counts as deleted."""
+        ledger.record([("KEY1", "fp1")], [999])
+        with ReadwiseStandIn() as server:
+            assert make_readwise(server, ledger).delete_highlights(["KEY1"]) == 1
+
+        assert ledger.get("KEY1") is None
+
+    def test_failed_delete_keeps_ledger_entry(self, ledger):
+        """Test that a failed deletion is kept for a later attempt."""
+        ledger.record([("KEY1", "fp1")], [1])
+        with ReadwiseStandIn() as server:
+            server.fail_next = [400]
+            assert make_readwise(server, ledger).delete_highlights(["KEY1"]) == 0
+
+        assert ledger.highlight_ids(["KEY1"]) == {"KEY1": 1}
@@ -0,0 +1,188 @@
+"""Tests for multi module."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
+from zotero2readwise.multi import Library, MultiLibrarySync, discover_group_libraries
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.state import COMPLETED, FAILED, SyncState
+from zotero2readwise.zotero import get_zotero_client
+
+
+def make_library(prefix: str, n_annotations: int) -> list[dict]:
+    items = [
+        make_document(f"{prefix}DOC"),
+        make_document(f"{prefix}PDF", parent_key=f"{prefix}DOC"),
+    ]
+    items += [make_annotation(f"{prefix}{i:03d}", f"{prefix}PDF") for i in range(n_annotations)]
+    return items
+
+
+@pytest.fixture
+def state(tmp_path):
+    """Create a state store in a temporary directory."""
+    state = SyncState(tmp_path / "state.sqlite")
+    yield state
+    state.close()
+
+
+@pytest.fixture
+def servers():
+    """Serve a user library with 30 annotations and group 7 with 5."""
+    zotero_server = ZoteroStandIn(make_library("U", 30), groups={"7": make_library("G", 5)})
+    with zotero_server, ReadwiseStandIn() as readwise_server:
+        yield zotero_server, readwise_server
+
+
+LIBRARIES = [Library("user", "1"), Library("group", "7")]
+
+
+def make_multi(servers, libraries=LIBRARIES, **kwargs) -> MultiLibrarySync:
+    zotero_server, readwise_server = servers
+    multi = MultiLibrarySync(
+        libraries, readwise_token="token", zotero_key="key", write_failures=False, **kwargs
+    )
+    for zt_rw in multi.syncs.values():
+        zt_rw.zotero_client.endpoint = zotero_server.url
+        zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+    return multi
+
+
+def highlight_texts(readwise_server) -> list[str]:
+    return sorted(h["text"] for h in readwise_server.highlights)
+
+
+class TestLibrary:
+    """Tests for Library."""
+
+    def test_key(self):
+        """Test that libraries are identified by their API path."""
+        assert Library("user", "1").key == "users/1"
+        assert str(Library("group", "7", "Lab")) == "groups/7 (Lab)"
+
+    def test_name_is_not_compared(self):
+        """Test that a discovered library equals the same library given by ID."""
+        assert Library("group", "7", "Lab") == Library("group", "7")
+
+
+def test_discover_group_libraries(servers):
+    """Test that the groups of the API key's user are listed with their names."""
+    zotero_server, _ = servers
+    zot = get_zotero_client(library_id="1", api_key="key")
+    zot.endpoint = zotero_server.url
+
+    groups = discover_group_libraries(zot)
+
+    assert groups == [Library("group", "7")]
+    assert groups[0].name == "Group 7"
+    assert [path.split("?")[0] for path in zotero_server.requests] == ["/users/1/groups"]
+
+
+class TestMultiLibrarySync:
+    """Tests for MultiLibrarySync."""
+
+    def test_syncs_all_libraries(self, servers, state):
+        """Test that all libraries are synced and recorded separately."""
+        _, readwise_server = servers
+        multi = make_multi(servers, state=state)
+
+        results = multi.run()
+
+        assert [(r.library, r.library_version, r.skipped) for r in results] == [
+            (Library("user", "1"), 1, False),
+            (Library("group", "7"), 1, False),
+        ]
+        assert highlight_texts(readwise_server) == sorted(
+            [f"Highlight U{i:03d}" for i in range(30)] + [f"Highlight G{i:03d}" for i in range(5)]
+        )
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 1}
+        assert state.versions("groups/7", ["annotation"]) == {"annotation": 1}
+        assert state.last_run("groups/7")["status"] == COMPLETED
+
+    def test_unchanged_libraries_are_skipped(self, servers, state):
+        """Test that each library is checked for changes since its own version."""
+        zotero_server, readwise_server = servers
+        make_multi(servers, state=state).run()
+        readwise_server.highlights.clear()
+        zotero_server.groups["7"]["G999"] = make_annotation("G999", "GPDF", version=2)
+
+        results = make_multi(servers, state=state).run()
+
+        assert [r.skipped for r in results] == [True, False]
+        assert highlight_texts(readwise_server) == ["Highlight G999"]
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 1}
+        assert state.versions("groups/7", ["annotation"]) == {"annotation": 2}
+
+    def test_failed_library_does_not_stop_others(self, servers, state):
+        """Test that a failing library is reported after the others were synced."""
+        _, readwise_server = servers
+        multi = make_multi(servers, state=state)
+        multi.syncs["groups/7"].get_all_zotero_items = Mock(side_effect=RuntimeError("boom"))
+
+        with pytest.raises(Zotero2ReadwiseError, match="1 of 2 .* groups/7: RuntimeError: boom"):
+            multi.run()
+
+        assert len(readwise_server.highlights) == 30
+        assert state.last_run("users/1")["status"] == COMPLETED
+        assert state.last_run("groups/7")["status"] == FAILED
+        assert state.versions("groups/7", ["annotation"]) == {"annotation": 0}
+
+    def test_deadline(self, servers, expiring_deadline):
+        """Test that a run stopped by the deadline raises DeadlineExceeded."""
+        with pytest.raises(DeadlineExceeded):
+            make_multi(servers).run(deadline=expiring_deadline(0))
+
+    def test_per_library_files(self, servers, tmp_path):
+        """Test that every library gets its own ledger and checkpoint file."""
+        make_multi(
+            servers,
+            upload_ledger_path=str(tmp_path / "uploads.sqlite"),
+            checkpoint_path=str(tmp_path / "checkpoint.sqlite"),
+        ).run()
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "checkpoint.groups-7.sqlite",
+            "checkpoint.users-1.sqlite",
+            "uploads.groups-7.sqlite",
+            "uploads.users-1.sqlite",
+        ]
+
+    def test_shared_pool_and_scheduler(self, servers):
+        """Test that all libraries share one connection pool and one scheduler."""
+        multi = make_multi(servers, fetch_workers=3, max_concurrent_libraries=2)
+
+        syncs = list(multi.syncs.values())
+        assert syncs[0].sessions is syncs[1].sessions is multi.sessions
+        assert multi.sessions.pool_size == 10
+        assert {zt_rw.retry_policy.scheduler for zt_rw in syncs} == {multi.scheduler}
+        assert [zt_rw.retry_policy.tenant for zt_rw in syncs] == ["users/1", "groups/7"]
+
+    def test_small_library_is_not_starved(self):
+        """Test that a small library is synced while a large one is still fetching."""
+        zotero_server = ZoteroStandIn(
+            make_library("U", 800), latency=0.005, groups={"7": make_library("G", 60)}
+        )
+        with zotero_server, ReadwiseStandIn() as readwise_server:
+            multi = make_multi(
+                (zotero_server, readwise_server), page_size=20, fetch_workers=8, http_pool_size=2
+            )
+            multi.run()
+
+        listing = [path for path in zotero_server.requests if "itemType=annotation" in path]
+        group_listing = [i for i, path in enumerate(listing) if path.startswith("/groups/7")]
+        assert len(listing) == 43
+        # First come, first served, the group's pages would wait behind 8 queued user pages
+        assert len(group_listing) == 3
+        assert group_listing[-1] < 12
+        assert len(readwise_server.highlights) == 860
+
+    def test_rejects_single_library_options(self):
+        """Test that per-library and local-only options are rejected."""
+        for options in ({"since": 5}, {"zotero_sqlite_path": "zotero.sqlite"}):
+            with pytest.raises(ValueError, match="not supported"):
+                MultiLibrarySync(LIBRARIES, readwise_token="token", zotero_key="key", **options)
+        with pytest.raises(ValueError):
+            MultiLibrarySync([], readwise_token="token", zotero_key="key")
@@ -0,0 +1,175 @@
+"""Tests for pipeline module and the pipelined sync."""
+
+import threading
+import time
+
+import pytest
+
+from tests.stand_in import (
+    ReadwiseStandIn,
+    ZoteroStandIn,
+    make_annotation,
+    make_document,
+)
+from zotero2readwise.pipeline import Pipeline
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+class TestPipeline:
+    """Tests for Pipeline class."""
+
+    def test_stages_preserve_order(self):
+        """Test that chained stages yield all items in order."""
+        with Pipeline(queue_size=2) as pipeline:
+            numbers = pipeline.stage(iter(range(100)))
+            squares = pipeline.stage(n * n for n in numbers)
+            assert list(squares) == [n * n for n in range(100)]
+
+    def test_queue_bounds_producer(self):
+        """Test that a producer runs at most queue_size items ahead of its consumer."""
+        produced = []
+
+        def produce():
+            for i in range(50):
+                produced.append(i)
+                yield i
+
+        with Pipeline(queue_size=3) as pipeline:
+            items = pipeline.stage(produce())
+            assert next(items) == 0
+            time.sleep(0.2)
+            # One item consumed, three queued, one blocked on a full queue
+            assert len(produced) <= 5
+            assert list(items) == list(range(1, 50))
+
+    def test_ready_returns_queued_items(self):
+        """Test that ready() drains the items already queued without blocking."""
+        with Pipeline(queue_size=5) as pipeline:
+            items = pipeline.stage(iter(range(3)))
+            assert next(items) == 0
+            time.sleep(0.1)
+            assert items.ready() == [1, 2]
+            assert items.ready() == []
+            assert list(items) == []
+
+    def test_stage_error_is_raised_by_consumer(self):
+        """Test that an exception in a stage propagates downstream."""
+
+        def failing():
+            yield 1
+            raise ValueError("fetch failed")
+
+        with Pipeline() as pipeline:
+            items = pipeline.stage(failing())
+            doubled = pipeline.stage(n * 2 for n in items)
+            with pytest.raises(ValueError, match="fetch failed"):
+                list(doubled)
+
+    def test_exit_stops_blocked_stages(self):
+        """Test that leaving the pipeline early stops running stages."""
+
+        def endless():
+            while True:
+                yield 1
+
+        with Pipeline(queue_size=1) as pipeline:
+            items = pipeline.stage(endless(), name="endless")
+            assert next(items) == 1
+
+        assert not any(t.name == "endless" for t in threading.enumerate())
+
+    def test_stages_overlap(self):
+        """Test that total time approaches the slowest stage, not the sum of stages."""
+
+        def slow_source():
+            for i in range(5):
+                time.sleep(0.05)
+                yield i
+
+        def slow_transform(items):
+            for item in items:
+                time.sleep(0.05)
+                yield item
+
+        start = time.perf_counter()
+        with Pipeline() as pipeline:
+            source = pipeline.stage(slow_source())
+            transformed = pipeline.stage(slow_transform(source))
+            for _ in transformed:
+                time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        # Sequentially this takes 0.75s; overlapped about 0.35s
+        assert elapsed < 0.6
+
+
+def make_library(n_documents=4, n_annotations=5):
+    """Create raw Zotero items for documents with PDF attachments and annotations."""
+    items = []
+    for d in range(n_documents):
+        items.append(make_document(f"DOC{d}", title=f"Document {d}"))
+        items.append(make_document(f"PDF{d}", parent_key=f"DOC{d}"))
+        items.extend(
+            make_annotation(f"D{d}A{a}", f"PDF{d}", annotationSortIndex=f"00000|{a:06d}|00000")
+            for a in range(n_annotations)
+        )
+    return items
+
+
+def make_zt2rw(zotero_server, readwise_server, **kwargs):
+    """Create a Zotero2Readwise instance talking to stand-in servers."""
+    zt_rw = Zotero2Readwise(
+        readwise_token="token",
+        zotero_key="key",
+        zotero_library_id="1",
+        write_failures=False,
+        **kwargs,
+    )
+    zt_rw.zotero_client.endpoint = zotero_server.url
+    zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+    return zt_rw
+
+
+class TestPipelinedSync:
+    """Tests for Zotero2Readwise.run_pipeline against stand-in servers."""
+
+    def test_pipeline_uploads_same_highlights_as_sequential_run(self):
+        """Test that the pipelined run uploads the same highlights as a regular run."""
+        library = make_library()
+        with ZoteroStandIn(library) as zotero_server:
+            with ReadwiseStandIn() as sequential:
+                make_zt2rw(zotero_server, sequential).run()
+            with ReadwiseStandIn() as pipelined:
+                make_zt2rw(
+                    zotero_server,
+                    pipelined,
+                    pipeline=True,
+                    page_size=3,
+                    pipeline_queue_size=2,
+                    readwise_batch_size=4,
+                ).run()
+
+        def key(h):
+            return h["highlight_url"]
+
+        assert len(pipelined.highlights) == 20
+        assert sorted(pipelined.highlights, key=key) == sorted(sequential.highlights, key=key)
+        assert {h["title"] for h in pipelined.highlights} == {f"Document {d}" for d in range(4)}
+
+    def test_pipeline_uploads_chunks_while_fetching(self):
+        """Test that uploads start before all Zotero pages are fetched."""
+        library = make_library(n_documents=6)
+        with ZoteroStandIn(library, latency=0.02) as zotero_server:
+            with ReadwiseStandIn() as readwise_server:
+                make_zt2rw(
+                    zotero_server,
+                    readwise_server,
+                    pipeline=True,
+                    page_size=5,
+                    readwise_batch_size=5,
+                ).run()
+
+        assert len(readwise_server.highlights) == 30
+        # The first chunk was uploaded before the last Zotero request was answered
+        assert readwise_server.timestamps[0] < zotero_server.timestamps[-1]
@@ -1,16 +1,22 @@
 """Tests for Readwise module."""
 
+import threading
+import time
 from unittest.mock import Mock, mock_open, patch
 
 import pytest
+import requests
 
-from zotero2readwise.exception import Zotero2ReadwiseError
+from tests.stand_in import ReadwiseStandIn, make_zotero_item
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
+from zotero2readwise.ledger import UploadLedger
 from zotero2readwise.readwise import (
     Category,
     Readwise,
     ReadwiseAPI,
     ReadwiseHighlight,
 )
+from zotero2readwise.retry import RetryPolicy
 from zotero2readwise.zotero import ZoteroItem
 
 
@@ -87,6 +93,17 @@ class TestReadwiseHighlight:
         assert "note" in params
         assert "author" not in params or params.get("author") is None
 
+    def test_readwise_highlight_is_slotted(self):
+        """Test that highlights carry no per-instance dictionary."""
+        highlight = ReadwiseHighlight(text="Sample text", location=3)
+
+        assert not hasattr(highlight, "__dict__")
+        assert highlight.get_nonempty_params() == {
+            "text": "Sample text",
+            "location": 3,
+            "location_type": "page",
+        }
+
     def test_readwise_highlight_with_unicode(self):
         """Test ReadwiseHighlight with Unicode text."""
         highlight = ReadwiseHighlight(
@@ -113,7 +130,7 @@ class TestReadwise:
         assert rw._header == {"Authorization": f"Token {readwise_token}"}
         assert rw.failed_highlights == []
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_create_highlights_success(self, mock_post, readwise_token):
         """Test successful highlight creation."""
         mock_response = Mock()
@@ -129,7 +146,7 @@ class TestReadwise:
         call_args = mock_post.call_args
         assert call_args[1]["json"] == {"highlights": highlights}
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_create_highlights_failure(self, mock_post, readwise_token):
         """Test failed highlight creation."""
         mock_response = Mock()
@@ -281,7 +298,7 @@ class TestReadwise:
         assert "page=5" in highlight.highlight_url
         assert "annotation=ABC123" in highlight.highlight_url
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_post_zotero_annotations_to_readwise_success(self, mock_post, readwise_token):
         """Test posting annotations to Readwise."""
         mock_response = Mock()
@@ -332,7 +349,7 @@ class TestReadwise:
             )
         ]
 
-        with patch("zotero2readwise.readwise.requests.post") as mock_post:
+        with patch("zotero2readwise.readwise.requests.Session.post") as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_post.return_value = mock_response
@@ -469,7 +486,7 @@ class TestReadwise:
         # Should use annotation_url as highlight_url when no attachment
         assert highlight.highlight_url == "https://www.zotero.org/users/123/items/ABC123"
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_create_highlights_empty_response(self, mock_post, readwise_token):
         """Test handling of empty response body from API."""
         mock_response = Mock()
@@ -486,7 +503,7 @@ class TestReadwise:
             with pytest.raises(Zotero2ReadwiseError, match="Uploading to Readwise failed"):
                 rw.create_highlights(highlights)
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_create_highlights_invalid_json_response(self, mock_post, readwise_token):
         """Test handling of invalid JSON response from API."""
         mock_response = Mock()
@@ -504,7 +521,7 @@ class TestReadwise:
             with pytest.raises(Zotero2ReadwiseError, match="Uploading to Readwise failed"):
                 rw.create_highlights(highlights)
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_post_zotero_annotations_handles_conversion_error(self, mock_post, readwise_token):
         """Test that conversion errors are handled gracefully."""
         mock_response = Mock()
@@ -544,7 +561,7 @@ class TestReadwise:
         assert highlight.location is None  # 0 becomes None
         assert highlight.location_type == "page"
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_post_multiple_annotations(self, mock_post, readwise_token):
         """Test posting multiple annotations at once."""
         mock_response = Mock()
@@ -601,7 +618,7 @@ class TestReadwise:
         assert ".c++" in result
         assert ".node.js" in result
 
-    @patch("zotero2readwise.readwise.requests.post")
+    @patch("zotero2readwise.readwise.requests.Session.post")
     def test_post_annotations_exactly_at_limit(self, mock_post, readwise_token):
         """Test annotation exactly at 8191 character limit is accepted."""
         mock_response = Mock()
@@ -633,3 +650,221 @@ class TestReadwise:
         # Should be uploaded successfully
         mock_post.assert_called_once()
         assert len(rw.failed_highlights) == 0
+
+
+class TestMatchHighlightIds:
+    """Tests for Readwise.match_highlight_ids."""
+
+    def test_ids_are_matched_per_book_in_order(self):
+        """Test that IDs are assigned to a book's highlights in request order."""
+        highlights = [
+            {"text": "a", "title": "Book A"},
+            {"text": "b", "title": "Book B"},
+            {"text": "c", "title": "Book A"},
+        ]
+        books = [
+            {"id": 1, "title": "Book A", "modified_highlights": [10, 30]},
+            {"id": 2, "title": "Book B", "modified_highlights": [20]},
+        ]
+
+        assert Readwise.match_highlight_ids(highlights, books) == [10, 20, 30]
+
+    def test_ambiguous_book_is_left_unmatched(self):
+        """Test that a book with a different number of IDs is not matched."""
+        highlights = [{"text": "a", "title": "Book A"}, {"text": "a", "title": "Book A"}]
+        books = [{"id": 1, "title": "Book A", "modified_highlights": [10]}]
+
+        assert Readwise.match_highlight_ids(highlights, books) == [None, None]
+
+    def test_unexpected_response(self):
+        """Test that responses without highlight IDs match nothing."""
+        highlights = [{"text": "a", "title": "Book A"}]
+
+        assert Readwise.match_highlight_ids(highlights, [{"id": 1}, "junk"]) == [None]
+
+
+class TestChunkedUpload:
+    """Tests for chunked Readwise uploads."""
+
+    def test_batches_bounded_by_count(self, readwise_token):
+        """Test that chunks hold at most batch_size highlights."""
+        rw = Readwise(readwise_token, batch_size=2)
+        highlights = [{"text": f"Highlight {i}"} for i in range(5)]
+
+        batches = [batch for batch, _ in rw.iter_highlight_batches(highlights)]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [h for batch in batches for h in batch] == highlights
+
+    def test_batches_bounded_by_bytes(self, readwise_token):
+        """Test that chunks stay within max_batch_bytes, except for oversized highlights."""
+        rw = Readwise(readwise_token, max_batch_bytes=100)
+        highlights = [{"text": "A" * 30}, {"text": "B" * 30}, {"text": "C" * 200}, {"text": "D"}]
+
+        batches = list(rw.iter_highlight_batches(highlights))
+
+        assert [len(batch) for batch, _ in batches] == [2, 1, 1]
+        assert all(n_bytes <= 100 for batch, n_bytes in batches if len(batch) > 1)
+
+    @patch("zotero2readwise.readwise.requests.Session.post")
+    def test_post_uploads_chunk_by_chunk(self, mock_post, readwise_token):
+        """Test that annotations are uploaded in several requests."""
+        mock_post.return_value = Mock(status_code=200)
+        rw = Readwise(readwise_token, batch_size=2)
+
+        rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(5)])
+
+        assert [len(c[1]["json"]["highlights"]) for c in mock_post.call_args_list] == [2, 2, 1]
+        assert all(result.succeeded for result in rw.upload_results)
+
+    @patch("zotero2readwise.readwise.requests.Session.post")
+    def test_post_reports_failed_chunks(self, mock_post, readwise_token, tmp_path, monkeypatch):
+        """Test that a failed chunk does not stop later chunks and is reported."""
+        monkeypatch.chdir(tmp_path)
+        ok = Mock(status_code=200)
+        failed = Mock(status_code=400, reason="Bad Request", text="")
+        mock_post.side_effect = [ok, failed, ok]
+        rw = Readwise(readwise_token, batch_size=2)
+
+        with pytest.raises(Zotero2ReadwiseError, match=r"1 of 3 upload chunks failed \(chunks 1\)"):
+            rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(5)])
+
+        assert mock_post.call_count == 3
+        assert [result.succeeded for result in rw.upload_results] == [True, False, True]
+        assert [h["text"] for h in rw.failed_highlights] == ["Highlight 2", "Highlight 3"]
+        assert rw.failed_highlights[0]["error_type"] == "Zotero2ReadwiseError"
+
+    @patch("zotero2readwise.readwise.requests.Session.post")
+    def test_post_reports_chunks_failed_by_network_errors(self, mock_post, readwise_token):
+        """Test that a network error outlasting the retries only fails its own chunk."""
+        ok = Mock(status_code=200)
+        mock_post.side_effect = [ok, requests.ReadTimeout("Read timed out"), ok]
+        rw = Readwise(readwise_token, batch_size=1, retry_policy=RetryPolicy(max_retries=0))
+
+        with pytest.raises(Zotero2ReadwiseError, match=r"1 of 3 upload chunks failed \(chunks 1\)"):
+            rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(3)])
+
+        assert mock_post.call_count == 3
+        assert [result.succeeded for result in rw.upload_results] == [True, False, True]
+        assert rw.upload_results[1].error == "Read timed out"
+        assert [h["text"] for h in rw.failed_highlights] == ["Highlight 1"]
+        assert rw.failed_highlights[0]["error_type"] == "ReadTimeout"
+
+
+class TestConcurrentUpload:
+    """Tests for concurrent Readwise uploads against a local stand-in server."""
+
+    @staticmethod
+    def make_readwise(readwise_token, server, **kwargs):
+        rw = Readwise(readwise_token, **kwargs)
+        rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+        return rw
+
+    def test_concurrent_upload_collects_results_in_order(self, readwise_token):
+        """Test that all chunks are uploaded and results keep chunk order."""
+        with ReadwiseStandIn(latency=0.01) as server:
+            rw = self.make_readwise(readwise_token, server, batch_size=3, upload_workers=4)
+
+            rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(20)])
+
+        assert [result.index for result in rw.upload_results] == list(range(7))
+        assert sorted(h["text"] for h in server.highlights) == sorted(
+            f"Highlight {i}" for i in range(20)
+        )
+        assert rw.failed_highlights == []
+
+    def test_concurrent_upload_aggregates_failures(self, readwise_token, tmp_path, monkeypatch):
+        """Test that failed chunks are reported in failed_highlights."""
+        monkeypatch.chdir(tmp_path)
+        with ReadwiseStandIn() as server:
+            server.fail_next = [500]
+            rw = self.make_readwise(readwise_token, server, batch_size=2, upload_workers=3)
+
+            with pytest.raises(Zotero2ReadwiseError, match="1 of 3 upload chunks failed"):
+                rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(6)])
+
+        assert sum(not result.succeeded for result in rw.upload_results) == 1
+        assert len(rw.failed_highlights) == 2
+        assert len(server.highlights) == 4
+
+    def test_in_flight_requests_are_bounded(self, readwise_token):
+        """Test that no more than upload_workers requests run at once."""
+        lock = threading.Lock()
+        active = peak = 0
+
+        def slow_create_highlights(highlights):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+            return []
+
+        rw = Readwise(readwise_token, batch_size=1, upload_workers=2)
+        rw.create_highlights = slow_create_highlights
+
+        failed = rw.upload_highlights([{"text": str(i)} for i in range(10)])
+
+        assert failed == []
+        assert peak == 2
+
+    def test_unexpected_error_does_not_drop_chunks_in_flight(self, readwise_token, tmp_path):
+        """Test that a chunk whose upload raised does not skip recording the others."""
+
+        def create_highlights(highlights):
+            time.sleep(0.01)
+            if highlights[0]["text"] == "0":
+                raise RuntimeError("Unexpected response")
+            return []
+
+        ledger = UploadLedger(str(tmp_path / "uploads.sqlite"))
+        rw = Readwise(readwise_token, batch_size=1, upload_workers=3, ledger=ledger)
+        rw.create_highlights = create_highlights
+        highlights = [{"text": str(i)} for i in range(3)]
+        entries = [(f"KEY{i}", UploadLedger.fingerprint(h)) for i, h in enumerate(highlights)]
+
+        failed = rw.upload_highlights(highlights, entries)
+
+        assert [result.index for result in failed] == [0]
+        assert failed[0].error_type == "RuntimeError"
+        assert [result.succeeded for result in rw.upload_results] == [False, True, True]
+        assert [ledger.get(key) is not None for key, _ in entries] == [False, True, True]
+
+
+class TestUploadDeadline:
+    """Tests for stopping an upload at the run deadline."""
+
+    @pytest.mark.parametrize("upload_workers", [1, 3])
+    def test_stops_at_deadline_and_keeps_uploaded_chunks(
+        self, readwise_token, tmp_path, expiring_deadline, upload_workers
+    ):
+        """Test that no chunk starts after the deadline and sent chunks are recorded."""
+        ledger = UploadLedger(str(tmp_path / "uploads.sqlite"))
+        policy = RetryPolicy(deadline=expiring_deadline(5))
+        with ReadwiseStandIn(latency=0.01) as server:
+            rw = Readwise(
+                readwise_token,
+                batch_size=10,
+                upload_workers=upload_workers,
+                retry_policy=policy,
+                ledger=ledger,
+            )
+            rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+
+            with pytest.raises(DeadlineExceeded):
+                rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(100)])
+
+        uploaded = ledger.highlight_ids([f"KEY{i}" for i in range(100)])
+        assert 0 < len(server.highlights) < 100
+        assert len(uploaded) == len(server.highlights)
+        assert sum(r.n_highlights for r in rw.upload_results if r.succeeded) == len(uploaded)
+
+    def test_request_timeout_is_sent(self, readwise_token):
+        """Test that every upload request carries the configured timeout."""
+        rw = Readwise(readwise_token, timeout=(2.0, 5.0))
+        with patch.object(rw.session, "post", return_value=Mock(status_code=200)) as mock_post:
+            rw.create_highlights([{"text": "Highlight"}])
+
+        assert mock_post.call_args[1]["timeout"] == (2.0, 5.0)
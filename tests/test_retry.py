@@ -0,0 +1,276 @@
+"""Tests for retry module."""
+
+from email.utils import formatdate
+from time import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded
+from zotero2readwise.readwise import Readwise, ReadwiseAPI
+from zotero2readwise.retry import RetryPolicy, httpx, parse_retry_after
+from zotero2readwise.scheduler import FairScheduler
+from zotero2readwise.zotero import ZoteroPageFetcher, get_zotero_client
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+class TestParseRetryAfter:
+    """Tests for parse_retry_after function."""
+
+    def test_no_headers(self):
+        """Test that missing headers request no delay."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after({}) is None
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After given in seconds."""
+        assert parse_retry_after({"Retry-After": "7"}) == 7.0
+
+    def test_retry_after_http_date(self):
+        """Test Retry-After given as an HTTP date."""
+        delay = parse_retry_after({"Retry-After": formatdate(time() + 30, usegmt=True)})
+        assert 28 <= delay <= 30
+
+    def test_backoff_header(self):
+        """Test Zotero's Backoff header."""
+        assert parse_retry_after({"Backoff": "12"}) == 12.0
+
+    def test_longest_delay_wins(self):
+        """Test that the longer of both headers is used."""
+        assert parse_retry_after({"Retry-After": "3", "Backoff": "10"}) == 10.0
+
+    def test_invalid_value_is_ignored(self):
+        """Test that unparsable header values are ignored."""
+        assert parse_retry_after({"Retry-After": "soon"}) is None
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy class."""
+
+    def test_backoff_delay_is_jittered_and_capped(self):
+        """Test that backoff delays stay within the exponential bound."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+
+        for attempt in range(6):
+            assert 0 <= policy.backoff_delay(attempt) <= min(5.0, 2**attempt)
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_send_retries_retry_after(self, mock_sleep):
+        """Test that a 429 response is retried after the Retry-After delay."""
+        throttled = Mock(status_code=429, headers={"Retry-After": "4"})
+        ok = Mock(status_code=200, headers={})
+        request = Mock(side_effect=[throttled, ok])
+        policy = RetryPolicy()
+
+        assert policy.send(request) is ok
+        mock_sleep.assert_called_once_with(4.0)
+        assert policy.retries == 1
+        assert policy.sleep_seconds == 4.0
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_send_gives_up_after_max_retries(self, mock_sleep):
+        """Test that the last response is returned once retries are exhausted."""
+        request = Mock(return_value=Mock(status_code=503, headers={}))
+        policy = RetryPolicy(max_retries=2)
+
+        assert policy.send(request).status_code == 503
+        assert request.call_count == 3
+        assert policy.retries == 2
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_send_does_not_retry_client_errors(self, mock_sleep):
+        """Test that non-transient statuses are returned immediately."""
+        request = Mock(return_value=Mock(status_code=400, headers={}))
+        policy = RetryPolicy()
+
+        assert policy.send(request).status_code == 400
+        assert request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_send_retries_connection_errors(self, mock_sleep):
+        """Test that network errors are retried and re-raised when persistent."""
+        request = Mock(side_effect=requests.ConnectionError("refused"))
+        policy = RetryPolicy(max_retries=3)
+
+        with pytest.raises(requests.ConnectionError):
+            policy.send(request)
+        assert request.call_count == 4
+        assert policy.retries == 3
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_backoff_header_delays_next_request(self, mock_sleep):
+        """Test that a Backoff header on a success delays the next request."""
+        request = Mock(return_value=Mock(status_code=200, headers={"Backoff": "30"}))
+        policy = RetryPolicy()
+
+        policy.send(request)
+        mock_sleep.assert_not_called()
+        policy.send(request)
+
+        assert mock_sleep.call_count == 1
+        assert 29 <= mock_sleep.call_args[0][0] <= 30
+        assert policy.retries == 0
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_call_zotero_retries_on_client_status(self, mock_sleep):
+        """Test that Pyzotero errors are retried based on the last response status."""
+        zot = Mock()
+        zot.request = Mock(status_code=503, headers={"Retry-After": "2"})
+        func = Mock(side_effect=[RuntimeError("Service Unavailable"), ["item"]])
+        policy = RetryPolicy()
+
+        assert policy.call_zotero(zot, func, "KEY") == ["item"]
+        func.assert_called_with("KEY")
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_call_zotero_retries_transport_errors(self, mock_sleep):
+        """Test that network errors raised by Pyzotero's HTTP library are retried."""
+        func = Mock(side_effect=[httpx.ConnectError("Connection refused"), ["item"]])
+        policy = RetryPolicy()
+
+        assert policy.call_zotero(Mock(request=None), func) == ["item"]
+        assert policy.retries == 1
+
+    def test_call_zotero_reraises_other_errors(self):
+        """Test that errors with a non-transient status are not retried."""
+        zot = Mock()
+        zot.request = Mock(status_code=404, headers={})
+        func = Mock(side_effect=RuntimeError("Not found"))
+
+        with pytest.raises(RuntimeError):
+            RetryPolicy().call_zotero(zot, func)
+        assert func.call_count == 1
+
+    def test_expired_deadline_stops_before_request(self):
+        """Test that no request is sent once the deadline has passed."""
+        request = Mock()
+        policy = RetryPolicy(deadline=Deadline(expires_at=0.0))
+
+        with pytest.raises(DeadlineExceeded, match="deadline was reached"):
+            policy.send(request)
+        with pytest.raises(DeadlineExceeded):
+            policy.call_zotero(Mock(), request)
+        request.assert_not_called()
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_retry_delay_past_deadline_is_not_waited(self, mock_sleep):
+        """Test that a retry whose delay would outlast the deadline is abandoned."""
+        request = Mock(return_value=Mock(status_code=429, headers={"Retry-After": "120"}))
+        policy = RetryPolicy(deadline=Deadline.after(60))
+
+        with pytest.raises(DeadlineExceeded, match="waiting 120.0s"):
+            policy.send(request)
+        assert request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_retry_within_deadline(self, mock_sleep):
+        """Test that retries that fit before the deadline still happen."""
+        ok = Mock(status_code=200, headers={})
+        request = Mock(side_effect=[Mock(status_code=503, headers={"Retry-After": "1"}), ok])
+        policy = RetryPolicy(deadline=Deadline.after(60))
+
+        assert policy.send(request) is ok
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_requests_hold_a_scheduler_slot(self):
+        """Test that every attempt is sent in a slot of the policy's tenant."""
+        scheduler = FairScheduler(max_in_flight=1)
+        in_flight = []
+        request = Mock(
+            side_effect=lambda: (
+                in_flight.append(scheduler._in_flight) or Mock(status_code=200, headers={})
+            )
+        )
+        policy = RetryPolicy(scheduler=scheduler, tenant="groups/1")
+
+        policy.send(request)
+        policy.call_zotero(Mock(), request)
+
+        assert in_flight == [1, 1]
+        assert scheduler.granted == {"groups/1": 2}
+
+    @patch("zotero2readwise.retry.time.sleep")
+    def test_server_delays_apply_to_all_tenants(self, mock_sleep):
+        """Test that Retry-After and Backoff delays pause other policies of the scheduler."""
+        scheduler = FairScheduler(max_in_flight=4)
+        throttled = Mock(
+            side_effect=[
+                Mock(status_code=429, headers={"Retry-After": "20"}),
+                Mock(status_code=200, headers={"Backoff": "30"}),
+            ]
+        )
+        RetryPolicy(scheduler=scheduler, tenant="users/1").send(throttled)
+        mock_sleep.reset_mock()
+
+        other = RetryPolicy(scheduler=scheduler, tenant="groups/2")
+        other.send(Mock(return_value=Mock(status_code=200, headers={})))
+
+        assert mock_sleep.call_count == 1
+        assert 29 <= mock_sleep.call_args[0][0] <= 30
+
+
+class TestRetryAgainstStandIns:
+    """Tests for retries against local stand-in servers."""
+
+    def test_readwise_upload_retries_throttled_chunk(self, readwise_token):
+        """Test that a throttled upload chunk is retried and succeeds."""
+        policy = RetryPolicy(base_delay=0)
+        with ReadwiseStandIn() as server:
+            server.fail_next = [429]
+            server.failure_headers = {"Retry-After": "0"}
+            rw = Readwise(readwise_token, retry_policy=policy)
+            rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+
+            failed = rw.upload_highlights([{"text": "one"}, {"text": "two"}])
+
+        assert failed == []
+        assert [h["text"] for h in server.highlights] == ["one", "two"]
+        assert policy.retries == 1
+
+    def test_zotero_page_fetch_retries_unavailable(self):
+        """Test that a Zotero page request is retried after a 503."""
+        items = [make_annotation(f"A{i}", "P1") for i in range(5)]
+        policy = RetryPolicy(base_delay=0)
+        with ZoteroStandIn(items) as server:
+            server.fail_next = [503]
+            zot = get_zotero_client(library_id="1", api_key="key")
+            zot.endpoint = server.url
+            fetcher = ZoteroPageFetcher(zot, page_size=2, max_workers=2, retry_policy=policy)
+
+            pages = list(fetcher.iter_pages(itemType="annotation"))
+
+        assert [item["key"] for page in pages for item in page] == [i["key"] for i in items]
+        assert policy.retries == 1
+
+    def test_retrieve_all_retries_only_the_throttled_page(self, readwise_token):
+        """Test that a rate limit late in a listing does not restart it from the first page."""
+        items = [make_annotation(f"A{i}", "P1") for i in range(7)]
+        with ZoteroStandIn(items) as server:
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                page_size=2,
+                retry_policy=RetryPolicy(base_delay=0),
+            )
+            zot = zt_rw.zotero_client
+            zot.endpoint = server.url
+            list_items = zot.items
+
+            def throttle_third_page(**params):
+                if params.get("start") == 4 and not zt_rw.retry_policy.retries:
+                    server.fail_next = [429]
+                return list_items(**params)
+
+            zot.items = throttle_third_page
+            retrieved = zt_rw.retrieve_all("annotation")
+
+        assert [item["key"] for item in retrieved] == [item["key"] for item in items]
+        assert zt_rw.retry_policy.retries == 1
+        assert sum("start=0" in path for path in server.requests) == 1
@@ -1,9 +1,11 @@
 """Tests for CLI run module."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 import pytest
 
+from zotero2readwise.exception import DeadlineExceeded
+from zotero2readwise.multi import Library
 from zotero2readwise.run import main, strtobool
 
 
@@ -74,13 +76,11 @@ class TestMainFunction:
     """Tests for main CLI function."""
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    @patch("zotero2readwise.run.write_library_version")
-    def test_main_with_positional_args(self, mock_write_version, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_positional_args(self, mock_state, mock_zt2rw):
         """Test main function with positional arguments."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -96,7 +96,7 @@ class TestMainFunction:
         mock_instance.run.assert_called_once()
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
+    @patch("zotero2readwise.run.SyncState")
     @patch.dict(
         "os.environ",
         {
@@ -105,11 +105,10 @@ class TestMainFunction:
             "ZOTERO_LIBRARY_ID": "env_library_id",
         },
     )
-    def test_main_with_environment_variables(self, mock_read_version, mock_zt2rw):
+    def test_main_with_environment_variables(self, mock_state, mock_zt2rw):
         """Test main function with environment variables."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch("sys.argv", ["run"]):
             main()
@@ -120,12 +119,11 @@ class TestMainFunction:
         assert call_kwargs["zotero_library_id"] == "env_library_id"
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_include_annotations_yes(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_include_annotations_yes(self, mock_state, mock_zt2rw):
         """Test main function with --include_annotations=y."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -144,12 +142,11 @@ class TestMainFunction:
         assert call_kwargs["include_annotations"] is True
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_include_annotations_no(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_include_annotations_no(self, mock_state, mock_zt2rw):
         """Test main function with --include_annotations=n."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -168,12 +165,11 @@ class TestMainFunction:
         assert call_kwargs["include_annotations"] is False
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_include_notes(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_include_notes(self, mock_state, mock_zt2rw):
         """Test main function with --include_notes=y."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -192,12 +188,11 @@ class TestMainFunction:
         assert call_kwargs["include_notes"] is True
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_filter_colors(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_filter_colors(self, mock_state, mock_zt2rw):
         """Test main function with --filter_color."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -218,12 +213,11 @@ class TestMainFunction:
         assert call_kwargs["filter_colors"] == ("#ffd400", "#ff6666")
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_filter_tags(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_filter_tags(self, mock_state, mock_zt2rw):
         """Test main function with --filter_tags."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -244,12 +238,11 @@ class TestMainFunction:
         assert call_kwargs["filter_tags"] == ("important", "review")
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_include_filter_tags(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_include_filter_tags(self, mock_state, mock_zt2rw):
         """Test main function with --include_filter_tags."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -266,14 +259,16 @@ class TestMainFunction:
         call_kwargs = mock_zt2rw.call_args[1]
         assert call_kwargs["include_filter_tags"] is True
 
+    @patch("zotero2readwise.run.is_library_modified", return_value=True)
+    @patch("zotero2readwise.run.get_zotero_client")
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    @patch("zotero2readwise.run.write_library_version")
-    def test_main_with_use_since(self, mock_write_version, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_use_since(self, mock_state, mock_zt2rw, mock_get_client, mock_modified):
         """Test main function with --use_since."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 12345
+        state = mock_state.return_value
+        state.versions.return_value = {"annotation": 12345}
 
         with patch(
             "sys.argv",
@@ -281,18 +276,76 @@ class TestMainFunction:
         ):
             main()
 
-        mock_read_version.assert_called_once()
+        mock_state.assert_called_once_with("zotero2readwise_state.sqlite")
+        state.import_since_file.assert_called_once_with("users/id", ["annotation"])
+        state.versions.assert_called_once_with("users/id", ["annotation"])
         call_kwargs = mock_zt2rw.call_args[1]
-        assert call_kwargs["since"] == 12345
-        mock_write_version.assert_called_once_with(mock_instance.zotero_client)
+        assert call_kwargs["since"] == {"annotation": 12345}
+        state.start_run.assert_called_once_with("users/id", ["annotation"])
+        state.finish_run.assert_called_once_with(
+            state.start_run.return_value, library_version=mock_instance.library_version
+        )
+        mock_modified.assert_called_once_with(
+            mock_get_client.return_value, 12345, retry_policy=ANY, timeout=(10.0, 60.0)
+        )
+
+    @patch("zotero2readwise.run.is_library_modified", return_value=False)
+    @patch("zotero2readwise.run.get_zotero_client")
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_use_since_unchanged_library(
+        self, mock_state, mock_zt2rw, mock_get_client, mock_modified
+    ):
+        """Test that an unchanged library exits before any sync work."""
+        mock_state.return_value.versions.return_value = {"annotation": 12345}
+
+        with patch("sys.argv", ["run", "token", "key", "id", "--use_since"]):
+            main()
+
+        mock_get_client.assert_called_once_with(
+            library_id="id", api_key="key", library_type="user", local_api_url=None
+        )
+        mock_zt2rw.assert_not_called()
+        mock_state.return_value.start_run.assert_not_called()
+
+    @patch("zotero2readwise.run.is_library_modified")
+    @patch("zotero2readwise.run.get_zotero_client")
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_deadline_during_version_check(
+        self, mock_state, mock_zt2rw, mock_get_client, mock_modified, capsys
+    ):
+        """Test that --max_runtime expiring in the version check exits with status 124."""
+        mock_state.return_value.versions.return_value = {"annotation": 12345}
+        mock_modified.side_effect = DeadlineExceeded("The run deadline was reached.")
+
+        argv = ["run", "token", "key", "id", "--use_since", "--max_runtime", "1"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 124
+        assert "Stopped after --max_runtime 1s." in capsys.readouterr().out
+        mock_zt2rw.assert_not_called()
 
+    @patch("zotero2readwise.run.is_library_modified")
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_suppress_failures(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_use_since_first_run(self, mock_state, mock_zt2rw, mock_modified):
+        """Test that the version check is skipped when there is no stored version."""
+        mock_state.return_value.versions.return_value = {"annotation": 0}
+
+        with patch("sys.argv", ["run", "token", "key", "id", "--use_since"]):
+            main()
+
+        mock_modified.assert_not_called()
+        mock_zt2rw.return_value.run.assert_called_once()
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_suppress_failures(self, mock_state, mock_zt2rw):
         """Test main function with --suppress_failures."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -304,12 +357,11 @@ class TestMainFunction:
         assert call_kwargs["write_failures"] is False
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_custom_tag(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_custom_tag(self, mock_state, mock_zt2rw):
         """Test main function with --custom_tag."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -321,12 +373,216 @@ class TestMainFunction:
         assert call_kwargs["custom_tag"] == "zotero"
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_with_library_type_group(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_stream(self, mock_state, mock_zt2rw):
+        """Test main function with --stream."""
+        mock_instance = Mock()
+        mock_zt2rw.return_value = mock_instance
+
+        with patch("sys.argv", ["run", "token", "key", "id", "--stream"]):
+            main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert call_kwargs["stream"] is True
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_fetch_workers(self, mock_state, mock_zt2rw):
+        """Test main function with --fetch_workers."""
+        mock_instance = Mock()
+        mock_zt2rw.return_value = mock_instance
+
+        with patch("sys.argv", ["run", "token", "key", "id", "--fetch_workers", "8"]):
+            main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert call_kwargs["fetch_workers"] == 8
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_stopped_by_max_runtime(self, mock_state, mock_zt2rw):
+        """Test that a run reaching --max_runtime exits with status 124 without saving since."""
+        mock_zt2rw.return_value.run.side_effect = DeadlineExceeded("The run deadline was reached.")
+        state = mock_state.return_value
+        state.versions.return_value = {"annotation": 0}
+
+        argv = ["run", "token", "key", "id", "--use_since", "--max_runtime", "600"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 124
+        deadline = mock_zt2rw.return_value.run.call_args[1]["deadline"]
+        assert 0 < deadline.remaining() <= 600
+        state.finish_run.assert_called_once_with(
+            state.start_run.return_value,
+            error="DeadlineExceeded: The run deadline was reached.",
+        )
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_checkpoint(self, mock_state, mock_zt2rw):
+        """Test main function with --checkpoint."""
+        argv = ["run", "token", "key", "id", "--checkpoint", "/tmp/sync.sqlite"]
+        with patch("sys.argv", argv):
+            main()
+
+        assert mock_zt2rw.call_args[1]["checkpoint_path"] == "/tmp/sync.sqlite"
+        mock_state.assert_not_called()
+
+    @pytest.mark.parametrize("mode", ["--stream", "--pipeline"])
+    def test_main_checkpoint_requires_default_mode(self, mode):
+        """Test that --checkpoint is rejected with --stream and --pipeline."""
+        argv = ["run", "token", "key", "id", "--checkpoint", "/tmp/sync.sqlite", mode]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            main()
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_filter(self, mock_state, mock_zt2rw):
+        """Test main function with --filter."""
+        expression = 'color:yellow and not tag:"to read" and doctype:book'
+        with patch("sys.argv", ["run", "token", "key", "id", "--filter", expression]):
+            main()
+
+        assert mock_zt2rw.call_args[1]["filter_expression"] == expression
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    def test_main_invalid_filter(self, mock_zt2rw, capsys):
+        """Test that a malformed --filter is reported before syncing."""
+        argv = ["run", "token", "key", "id", "--filter", "tag:a and (tag:b"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 2
+        assert "--filter: Invalid filter expression" in capsys.readouterr().err
+        mock_zt2rw.assert_not_called()
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_columnar(self, mock_state, mock_zt2rw):
+        """Test main function with --columnar."""
+        with patch("sys.argv", ["run", "token", "key", "id", "--columnar"]):
+            main()
+
+        assert mock_zt2rw.call_args[1]["columnar"] is True
+
+    def test_main_columnar_rejects_pipeline(self):
+        """Test that --columnar is rejected with --pipeline."""
+        argv = ["run", "token", "key", "id", "--columnar", "--pipeline"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            main()
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_timeouts(self, mock_state, mock_zt2rw):
+        """Test main function with --connect_timeout and --read_timeout."""
+
+        argv = ["run", "token", "key", "id", "--connect_timeout", "3", "--read_timeout", "20"]
+        with patch("sys.argv", argv):
+            main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert (call_kwargs["connect_timeout"], call_kwargs["read_timeout"]) == (3.0, 20.0)
+        assert mock_zt2rw.return_value.run.call_args[1]["deadline"] is None
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_http_pool_options(self, mock_state, mock_zt2rw):
+        """Test main function with --http_pool_size and --http_keepalive."""
+        mock_zt2rw.return_value = Mock()
+
+        argv = ["run", "token", "key", "id", "--http_pool_size", "32", "--http_keepalive", "90"]
+        with patch("sys.argv", argv):
+            main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert call_kwargs["http_pool_size"] == 32
+        assert call_kwargs["http_keepalive"] == 90.0
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_metadata_cache(self, mock_state, mock_zt2rw):
+        """Test main function with --metadata_cache."""
+        mock_instance = Mock()
+        mock_zt2rw.return_value = mock_instance
+
+        with patch(
+            "sys.argv", ["run", "token", "key", "id", "--metadata_cache", "/tmp/meta.sqlite"]
+        ):
+            main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert call_kwargs["metadata_cache_path"] == "/tmp/meta.sqlite"
+        assert call_kwargs["metadata_cache_size"] == 10_000
+
+    @patch("zotero2readwise.run.ZoteroWatcher")
+    @patch("zotero2readwise.run.is_library_modified")
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_watch(self, mock_state, mock_zt2rw, mock_modified, mock_watcher):
+        """Test that `watch` starts a watcher from the stored library version."""
+        mock_state.return_value.versions.return_value = {"annotation": 12345}
+
+        with patch("sys.argv", ["run", "watch", "token", "key", "id", "--debounce", "2"]):
+            main()
+
+        assert mock_zt2rw.call_args[1]["since"] == 12345
+        mock_watcher.assert_called_once_with(
+            mock_zt2rw.return_value,
+            api_key="key",
+            debounce=2.0,
+            max_wait=60.0,
+            state=mock_state.return_value,
+        )
+        mock_watcher.return_value.run_forever.assert_called_once()
+        mock_zt2rw.return_value.run.assert_not_called()
+        mock_modified.assert_not_called()
+        mock_state.return_value.start_run.assert_not_called()
+
+    def test_main_watch_requires_web_api(self):
+        """Test that `watch` rejects the local backends."""
+        with patch("sys.argv", ["run", "watch", "token", "--zotero_local"]):
+            with pytest.raises(SystemExit):
+                main()
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_zotero_local(self, mock_state, mock_zt2rw):
+        """Test that --zotero_local needs no Zotero key and defaults the library ID."""
+
+        with patch.dict("os.environ", {}, clear=True):
+            with patch("sys.argv", ["run", "token", "--zotero_local"]):
+                main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert call_kwargs["zotero_local_api_url"] == "http://localhost:23119/api"
+        assert call_kwargs["zotero_library_id"] == "0"
+        assert call_kwargs["zotero_key"] is None
+        assert call_kwargs["fetch_workers"] is None
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_batch_limits(self, mock_state, mock_zt2rw):
+        """Test main function with --batch_size and --max_batch_bytes."""
+        mock_instance = Mock()
+        mock_zt2rw.return_value = mock_instance
+
+        with patch(
+            "sys.argv",
+            ["run", "token", "key", "id", "--batch_size", "100", "--max_batch_bytes", "50000"],
+        ):
+            main()
+
+        call_kwargs = mock_zt2rw.call_args[1]
+        assert call_kwargs["readwise_batch_size"] == 100
+        assert call_kwargs["readwise_max_batch_bytes"] == 50000
+
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_library_type_group(self, mock_state, mock_zt2rw):
         """Test main function with --library_type=group."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -337,6 +593,62 @@ class TestMainFunction:
         call_kwargs = mock_zt2rw.call_args[1]
         assert call_kwargs["zotero_library_type"] == "group"
 
+    @patch("zotero2readwise.run.discover_group_libraries")
+    @patch("zotero2readwise.run.get_zotero_client")
+    @patch("zotero2readwise.run.MultiLibrarySync")
+    @patch("zotero2readwise.run.Zotero2Readwise")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_with_groups(
+        self, mock_state, mock_zt2rw, mock_multi, mock_get_client, mock_discover
+    ):
+        """Test that --group and --all_groups sync several libraries at once."""
+        mock_discover.return_value = [Library("group", "8", "Lab")]
+        argv = ["run", "token", "key", "1", "--group", "7", "--all_groups", "--use_since"]
+        argv += ["--library_workers", "2", "--upload_ledger", "/tmp/uploads.sqlite"]
+
+        with patch("sys.argv", argv):
+            main()
+
+        mock_zt2rw.assert_not_called()
+        mock_get_client.assert_called_once_with(library_id="1", api_key="key")
+        args, kwargs = mock_multi.call_args
+        assert args == ([Library("user", "1"), Library("group", "7"), Library("group", "8")],)
+        assert kwargs["max_concurrent_libraries"] == 2
+        assert kwargs["state"] is mock_state.return_value
+        assert kwargs["upload_ledger_path"] == "/tmp/uploads.sqlite"
+        assert "since" not in kwargs
+        mock_multi.return_value.run.assert_called_once_with(deadline=None)
+
+    @patch("zotero2readwise.run.discover_group_libraries")
+    @patch("zotero2readwise.run.get_zotero_client")
+    @patch("zotero2readwise.run.MultiLibrarySync")
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_deadline_during_group_discovery(
+        self, mock_state, mock_multi, mock_get_client, mock_discover
+    ):
+        """Test that --max_runtime expiring while listing groups exits with status 124."""
+        mock_discover.side_effect = DeadlineExceeded("The run deadline was reached.")
+        argv = ["run", "token", "key", "1", "--all_groups", "--max_runtime", "1"]
+
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 124
+        mock_multi.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["run", "watch", "token", "key", "1", "--group", "7"],
+            ["run", "token", "--zotero_local", "--group", "7"],
+            ["run", "token", "key", "7", "--library_type", "group", "--all_groups"],
+        ],
+    )
+    def test_main_groups_rejected(self, argv):
+        """Test that several libraries need the Web API, no watch mode, and a user key."""
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            main()
+
     def test_main_missing_readwise_token(self):
         """Test main function errors when readwise_token is missing."""
         with patch("sys.argv", ["run"]):
@@ -359,10 +671,9 @@ class TestMainFunction:
                     main()
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_invalid_include_annotations(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_invalid_include_annotations(self, mock_state, mock_zt2rw):
         """Test main function with invalid --include_annotations value."""
-        mock_read_version.return_value = 0
 
         with patch(
             "sys.argv",
@@ -372,12 +683,11 @@ class TestMainFunction:
                 main()
 
     @patch("zotero2readwise.run.Zotero2Readwise")
-    @patch("zotero2readwise.run.read_library_version")
-    def test_main_default_values(self, mock_read_version, mock_zt2rw):
+    @patch("zotero2readwise.run.SyncState")
+    def test_main_default_values(self, mock_state, mock_zt2rw):
         """Test main function uses correct default values."""
         mock_instance = Mock()
         mock_zt2rw.return_value = mock_instance
-        mock_read_version.return_value = 0
 
         with patch("sys.argv", ["run", "token", "key", "id"]):
             main()
@@ -392,3 +702,4 @@ class TestMainFunction:
         assert call_kwargs["write_failures"] is True
         assert call_kwargs["custom_tag"] is None
         assert call_kwargs["zotero_library_type"] == "user"
+        assert call_kwargs["stream"] is False
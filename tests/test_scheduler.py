@@ -0,0 +1,78 @@
+"""Tests for scheduler module."""
+
+import threading
+import time
+
+from zotero2readwise.scheduler import FairScheduler
+
+
+def wait_until(condition, timeout: float = 5.0) -> None:
+    """Poll `condition` until it holds."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.001)
+
+
+class TestFairScheduler:
+    """Tests for FairScheduler."""
+
+    def test_slots_are_granted_round_robin(self):
+        """Test that a tenant with many waiting requests does not starve another."""
+        scheduler = FairScheduler(max_in_flight=1)
+        order = []
+
+        def send(tenant):
+            with scheduler.slot(tenant):
+                order.append(tenant)
+
+        with scheduler.slot("big"):
+            threads = []
+            for n_waiting, tenant in enumerate(["big", "big", "big", "small"], start=1):
+                threads.append(threading.Thread(target=send, args=(tenant,)))
+                threads[-1].start()
+                # Queue the requests in a known order
+                wait_until(lambda n=n_waiting: sum(map(len, scheduler._waiting.values())) == n)
+        for thread in threads:
+            thread.join()
+
+        # First come, first served would be ["big", "big", "big", "small"]
+        assert order == ["big", "small", "big", "big"]
+        assert scheduler.granted == {"big": 4, "small": 1}
+
+    def test_max_in_flight(self):
+        """Test that no more than max_in_flight requests are admitted at once."""
+        scheduler = FairScheduler(max_in_flight=3)
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def send(tenant):
+            with scheduler.slot(tenant):
+                with lock:
+                    in_flight.append(tenant)
+                    peak.append(len(in_flight))
+                time.sleep(0.005)
+                with lock:
+                    in_flight.remove(tenant)
+
+        threads = [threading.Thread(target=send, args=(f"t{i % 4}",)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 3
+        assert sum(scheduler.granted.values()) == 20
+
+    def test_pause(self):
+        """Test that pauses extend but never shorten the resume time."""
+        scheduler = FairScheduler(max_in_flight=1)
+        assert scheduler.resume_at == 0.0
+
+        scheduler.pause(30)
+        resume_at = scheduler.resume_at
+        scheduler.pause(1)
+
+        assert scheduler.resume_at == resume_at
+        assert 29 <= resume_at - time.monotonic() <= 30
@@ -0,0 +1,202 @@
+"""Tests for session module and connection reuse across a sync."""
+
+import gc
+import socket
+import time
+from unittest.mock import Mock
+
+import pytest
+import requests
+from pyzotero.zotero import Zotero
+
+from tests.stand_in import (
+    ReadwiseStandIn,
+    ZoteroStandIn,
+    make_annotation,
+    make_document,
+    make_zotero_item,
+)
+from zotero2readwise.readwise import Readwise, ReadwiseAPI
+from zotero2readwise.retry import TRANSIENT_ERRORS, RetryPolicy
+from zotero2readwise.session import DEFAULT_POOL_SIZE, HTTPSessions
+from zotero2readwise.zotero import clone_zotero_client
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+@pytest.fixture
+def library():
+    items = [make_document(f"DOC{d}") for d in range(3)]
+    items += [make_document(f"PDF{d}", parent_key=f"DOC{d}") for d in range(3)]
+    items += [make_annotation(f"A{i:03d}", f"PDF{i % 3}") for i in range(250)]
+    return items
+
+
+class TestHTTPSessions:
+    """Tests for HTTPSessions class."""
+
+    def test_session_pool_settings(self):
+        """Test that the Readwise session mounts an adapter with the pool settings."""
+        sessions = HTTPSessions(pool_size=16, max_hosts=2)
+
+        adapter = sessions.session.get_adapter("https://readwise.io/api/v2/highlights/")
+
+        assert adapter._pool_maxsize == 16
+        assert adapter._pool_connections == 2
+        assert sessions.session.get_adapter("http://localhost:23119/api") is adapter
+
+    def test_attach_shares_one_client(self):
+        """Test that all attached Pyzotero clients share one HTTPX client."""
+        sessions = HTTPSessions(pool_size=4, keepalive_expiry=5.0)
+        zot = sessions.attach_zotero_client(Zotero("1", "user", "key"))
+        clone = clone_zotero_client(zot, sessions)
+
+        assert clone.client is zot.client
+
+    def test_timeouts(self):
+        """Test that the shared Zotero client uses the configured timeouts."""
+        sessions = HTTPSessions(connect_timeout=3.0, read_timeout=20.0)
+        zot = sessions.attach_zotero_client(Zotero("1", "user", "key"))
+
+        assert sessions.timeout == (3.0, 20.0)
+        assert zot.client.timeout.connect == 3.0
+        assert zot.client.timeout.read == 20.0
+
+    def test_clone_without_sessions_has_own_client(self):
+        """Test that a clone keeps its own HTTPX client unless sessions are given."""
+        sessions = HTTPSessions()
+        zot = sessions.attach_zotero_client(Zotero("1", "user", "key"))
+
+        assert clone_zotero_client(zot).client is not zot.client
+
+    def test_non_pyzotero_clients_are_unchanged(self):
+        """Test that clients other than Pyzotero's (e.g. mocks) are left alone."""
+        sessions = HTTPSessions()
+        client = Mock()
+        original = client.client
+
+        assert sessions.attach_zotero_client(client) is client
+        assert client.client is original
+
+    def test_shared_client_outlives_collected_clones(self, library):
+        """Test that garbage-collected clones do not close the shared client."""
+        sessions = HTTPSessions()
+        with ZoteroStandIn(library) as server:
+            zot = sessions.attach_zotero_client(Zotero("1", "user", "key"))
+            zot.endpoint = server.url
+            clone = clone_zotero_client(zot, sessions)
+            del clone
+            gc.collect()
+
+            assert len(zot.items(itemType="annotation", limit=5)) == 5
+
+    def test_close(self):
+        """Test that close() closes the shared HTTPX client and the session."""
+        sessions = HTTPSessions()
+        zot = sessions.attach_zotero_client(Zotero("1", "user", "key"))
+        shared = zot.client
+
+        sessions.close()
+
+        assert shared.is_closed
+
+
+class TestTimeouts:
+    """Tests that requests to a stalled server time out instead of hanging."""
+
+    @pytest.fixture
+    def stalled_url(self):
+        """URL of a server that accepts connections but never responds."""
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            host, port = listener.getsockname()[:2]
+            yield f"http://{host}:{port}"
+
+    def test_readwise_request_times_out(self, stalled_url):
+        """Test that a Readwise upload fails after the read timeout."""
+        sessions = HTTPSessions(read_timeout=0.2)
+        rw = Readwise(
+            "token",
+            session=sessions.session,
+            timeout=sessions.timeout,
+            retry_policy=RetryPolicy(max_retries=0),
+        )
+        rw.endpoints = ReadwiseAPI(highlights=f"{stalled_url}/highlights/")
+
+        start = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            rw.create_highlights([{"text": "Highlight"}])
+        assert time.monotonic() - start < 5
+
+    def test_zotero_request_times_out(self, stalled_url):
+        """Test that a Zotero request fails after the read timeout."""
+        sessions = HTTPSessions(read_timeout=0.2)
+        zot = sessions.attach_zotero_client(Zotero("1", "user", "key"))
+        zot.endpoint = stalled_url
+
+        start = time.monotonic()
+        with pytest.raises(TRANSIENT_ERRORS):
+            zot.items(limit=1)
+        assert time.monotonic() - start < 5
+
+
+class TestConnectionReuse:
+    """Tests that a sync reuses connections instead of opening one per request."""
+
+    def test_readwise_chunks_reuse_one_connection(self):
+        """Test that sequential upload chunks are sent on one keep-alive connection."""
+        with ReadwiseStandIn() as server:
+            rw = Readwise("token", batch_size=10, session=HTTPSessions().session)
+            rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+            items = [make_zotero_item(i) for i in range(100)]
+
+            rw.post_zotero_annotations_to_readwise(items)
+
+            assert len(server.requests) == 10
+            assert server.connections == 1
+
+    def test_concurrent_uploads_are_bounded_by_workers(self):
+        """Test that concurrent uploads open at most one connection per worker."""
+        with ReadwiseStandIn(latency=0.01) as server:
+            rw = Readwise("token", batch_size=5, upload_workers=3, session=HTTPSessions().session)
+            rw.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+
+            rw.post_zotero_annotations_to_readwise([make_zotero_item(i) for i in range(100)])
+
+            assert len(server.requests) == 20
+            assert server.connections <= 3
+
+    @pytest.mark.parametrize("fetch_workers", [1, 4])
+    def test_sync_reuses_zotero_connections(self, library, fetch_workers):
+        """Test that fetch workers and metadata lookups share the Zotero pool."""
+        with ZoteroStandIn(library) as zotero, ReadwiseStandIn() as readwise:
+            zt_rw = Zotero2Readwise(
+                readwise_token="token",
+                zotero_key="key",
+                zotero_library_id="1",
+                fetch_workers=fetch_workers,
+                stream=True,
+                page_size=25,
+                readwise_batch_size=50,
+                write_failures=False,
+            )
+            zt_rw.zotero_client.endpoint = zotero.url
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise.url}/highlights/")
+
+            zt_rw.run()
+
+            assert len(readwise.highlights) == 250
+            assert len(zotero.requests) >= 10
+            assert zotero.connections <= fetch_workers + 1
+            assert readwise.connections == 1
+
+    def test_default_pool_size_covers_workers(self):
+        """Test that the default pool is large enough for all fetch and upload workers."""
+        zt_rw = Zotero2Readwise(
+            readwise_token="token",
+            zotero_key="key",
+            zotero_library_id="1",
+            fetch_workers=3,
+            readwise_upload_workers=DEFAULT_POOL_SIZE + 6,
+        )
+
+        assert zt_rw.sessions.pool_size == DEFAULT_POOL_SIZE + 6
+        assert zt_rw.readwise.session is zt_rw.sessions.session
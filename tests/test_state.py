@@ -0,0 +1,145 @@
+"""Tests for state module."""
+
+import pytest
+
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.state import COMPLETED, FAILED, RUNNING, SyncState, library_key
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+
+@pytest.fixture
+def state(tmp_path):
+    """Create a state store in a temporary directory."""
+    state = SyncState(tmp_path / "state.sqlite")
+    yield state
+    state.close()
+
+
+def test_library_key():
+    """Test that library keys follow the Zotero API paths."""
+    assert library_key("user", "123") == "users/123"
+    assert library_key("groups", 456) == "groups/456"
+
+
+class TestSyncState:
+    """Tests for SyncState."""
+
+    def test_versions_default_to_zero(self, state):
+        """Test that never synced item types start from version 0."""
+        assert state.versions("users/1", ["annotation", "note"]) == {"annotation": 0, "note": 0}
+
+    def test_versions_per_library_and_item_type(self, state):
+        """Test that versions are kept separately per library and item type."""
+        state.save_versions("users/1", {"annotation": 10, "note": 7})
+        state.save_versions("groups/2", {"annotation": 3})
+
+        assert state.versions("users/1", ["annotation", "note"]) == {"annotation": 10, "note": 7}
+        assert state.versions("groups/2", ["annotation", "note"]) == {"annotation": 3, "note": 0}
+
+    def test_completed_run_saves_versions(self, state):
+        """Test that a completed run saves its version for its item types only."""
+        state.save_versions("users/1", {"note": 4})
+        run_id = state.start_run("users/1", ["annotation"])
+        assert state.last_run("users/1")["status"] == RUNNING
+
+        state.finish_run(run_id, library_version=20)
+
+        assert state.versions("users/1", ["annotation", "note"]) == {"annotation": 20, "note": 4}
+        run = state.last_run("users/1")
+        assert run["status"] == COMPLETED
+        assert run["item_types"] == ["annotation"]
+        assert run["library_version"] == 20
+
+    def test_failed_run_keeps_versions(self, state):
+        """Test that a failed run records its error without advancing the versions."""
+        state.save_versions("users/1", {"annotation": 10})
+        run_id = state.start_run("users/1", ["annotation"])
+
+        state.finish_run(run_id, library_version=20, error="ConnectionError: boom")
+
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 10}
+        run = state.last_run("users/1")
+        assert run["status"] == FAILED
+        assert run["error"] == "ConnectionError: boom"
+
+    def test_last_run_of_unknown_library(self, state):
+        """Test that a library never synced has no last run."""
+        assert state.last_run("users/1") is None
+
+    def test_versions_survive_reopening(self, tmp_path):
+        """Test that saved versions are durable."""
+        state = SyncState(tmp_path / "state.sqlite")
+        state.save_versions("users/1", {"annotation": 10})
+        state.close()
+
+        reopened = SyncState(tmp_path / "state.sqlite")
+        assert reopened.versions("users/1", ["annotation"]) == {"annotation": 10}
+        reopened.close()
+
+    def test_import_since_file(self, state, tmp_path, monkeypatch):
+        """Test that a legacy since file is imported once for a new library."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "since").write_text("55")
+
+        assert state.import_since_file("users/1", ["annotation", "note"]) is True
+        assert state.versions("users/1", ["annotation", "note"]) == {"annotation": 55, "note": 55}
+
+        (tmp_path / "since").write_text("99")
+        assert state.import_since_file("users/1", ["annotation"]) is False
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 55}
+
+    def test_import_without_since_file(self, state, tmp_path, monkeypatch):
+        """Test that nothing is imported without a since file."""
+        monkeypatch.chdir(tmp_path)
+
+        assert state.import_since_file("users/1", ["annotation"]) is False
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 0}
+
+
+class TestIncrementalSync:
+    """Tests for incremental syncs recorded in the state store."""
+
+    def test_items_modified_mid_run_are_synced_next_run(self, state, monkeypatch):
+        """Test that the version captured before fetching is the one saved."""
+        library = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+        library += [make_annotation(f"A{i}", "PDF1", version=5) for i in range(3)]
+        get_all_zotero_items = Zotero2Readwise.get_all_zotero_items
+
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+
+            def edit_after_fetch(zt_rw):
+                items = get_all_zotero_items(zt_rw)
+                edited = make_annotation("A0", "PDF1", version=6, annotationText="Edited")
+                zotero_server.items["A0"] = edited
+                return items
+
+            def sync():
+                zt_rw = Zotero2Readwise(
+                    readwise_token="token",
+                    zotero_key="key",
+                    zotero_library_id="1",
+                    write_failures=False,
+                    since=state.versions("users/1", ["annotation"]),
+                )
+                zt_rw.zotero_client.endpoint = zotero_server.url
+                zt_rw.readwise.endpoints = ReadwiseAPI(
+                    highlights=f"{readwise_server.url}/highlights/"
+                )
+                run_id = state.start_run("users/1", ["annotation"])
+                zt_rw.run()
+                state.finish_run(run_id, library_version=zt_rw.library_version)
+
+            with monkeypatch.context() as m:
+                m.setattr(Zotero2Readwise, "get_all_zotero_items", edit_after_fetch)
+                sync()
+            assert state.versions("users/1", ["annotation"]) == {"annotation": 5}
+            sync()
+
+        assert [h["text"] for h in readwise_server.highlights] == [
+            "Highlight A0",
+            "Highlight A1",
+            "Highlight A2",
+            "Edited",
+        ]
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 6}
@@ -0,0 +1,247 @@
+"""Tests for watch module."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.exception import Zotero2ReadwiseError
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.state import COMPLETED, SyncState
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+websockets_server = pytest.importorskip("websockets.sync.server")
+
+from zotero2readwise.watch import ZoteroWatcher  # noqa: E402
+
+
+class StreamStandIn:
+    """A minimal Zotero streaming API stand-in.
+
+    Sends `connected` on connection, answers `createSubscriptions` (rejecting the
+    API key "bad"), and pushes `topicUpdated` events to subscribed clients.
+    """
+
+    def __init__(self, retry_ms: int = 50):
+        self.retry_ms = retry_ms
+        self.subscriptions: list[dict] = []
+        self._connections: list = []
+        self._lock = threading.Lock()
+        self._server = websockets_server.serve(self._handle, "127.0.0.1", 0)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.socket.getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+
+    def _handle(self, connection) -> None:
+        connection.send(json.dumps({"event": "connected", "retry": self.retry_ms}))
+        request = json.loads(connection.recv())
+        subscription = request["subscriptions"][0]
+        with self._lock:
+            self.subscriptions.append(subscription)
+        if subscription["apiKey"] == "bad":
+            errors = [{"apiKey": "bad", "topic": subscription["topics"][0], "error": "Forbidden"}]
+            connection.send(
+                json.dumps({"event": "subscriptionsCreated", "subscriptions": [], "errors": errors})
+            )
+            return
+        connection.send(
+            json.dumps(
+                {"event": "subscriptionsCreated", "subscriptions": [subscription], "errors": []}
+            )
+        )
+        with self._lock:
+            self._connections.append(connection)
+        for _ in connection:  # Keep the connection open until either side closes it
+            pass
+
+    def publish(self, topic: str, version: int) -> None:
+        """Send a topicUpdated event to all subscribed clients."""
+        event = json.dumps({"event": "topicUpdated", "topic": topic, "version": version})
+        with self._lock:
+            for connection in self._connections:
+                connection.send(event)
+
+    def disconnect_all(self) -> None:
+        """Close all client connections."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    """Wait until `condition()` is true, failing the test after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("Timed out waiting for the watcher")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def library():
+    items = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+    items += [make_annotation(f"A{i}", "PDF1", version=2) for i in range(3)]
+    return items
+
+
+@pytest.fixture
+def servers(library):
+    with (
+        ZoteroStandIn(library) as zotero,
+        ReadwiseStandIn() as readwise,
+        StreamStandIn() as stream,
+    ):
+        yield zotero, readwise, stream
+
+
+def make_watcher(servers, api_key="key", **kwargs):
+    zotero, readwise, stream = servers
+    zt_rw = Zotero2Readwise(
+        readwise_token="token",
+        zotero_key=api_key,
+        zotero_library_id="1",
+        write_failures=False,
+    )
+    zt_rw.zotero_client.endpoint = zotero.url
+    zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise.url}/highlights/")
+    return ZoteroWatcher(zt_rw, api_key=api_key, stream_url=stream.url, **kwargs)
+
+
+class TestZoteroWatcher:
+    """Tests for ZoteroWatcher against stand-in servers."""
+
+    @pytest.fixture
+    def running(self, servers, monkeypatch):
+        """Start a watcher on a background thread and stop it after the test."""
+        monkeypatch.setattr("zotero2readwise.watch._POLL_INTERVAL", 0.05)
+        watcher = make_watcher(servers, debounce=0.2, max_wait=5.0)
+        thread = threading.Thread(target=watcher.run_forever, daemon=True)
+        thread.start()
+        wait_for(lambda: watcher.syncs == 1)
+        yield watcher
+        watcher.stop()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+    def test_initial_catch_up_sync(self, servers, running):
+        """Test that connecting subscribes to the library and runs a catch-up sync."""
+        zotero, readwise, stream = servers
+
+        assert stream.subscriptions == [{"apiKey": "key", "topics": ["/users/1"]}]
+        assert len(readwise.highlights) == 3
+        assert running.version == 2
+
+    def test_burst_of_updates_runs_one_sync(self, servers, running):
+        """Test that a burst of topicUpdated events is debounced into one sync."""
+        zotero, readwise, stream = servers
+        for i, version in enumerate(range(3, 8)):
+            new = make_annotation(f"NEW{i}", "PDF1", version=version)
+            zotero.items[new["key"]] = new
+            stream.publish("/users/1", version)
+            time.sleep(0.02)
+
+        wait_for(lambda: running.syncs == 2)
+        time.sleep(0.3)
+
+        assert running.syncs == 2
+        assert running.version == 7
+        assert sorted(h["text"] for h in readwise.highlights[3:]) == [
+            f"Highlight NEW{i}" for i in range(5)
+        ]
+
+    def test_caches_stay_warm_between_syncs(self, servers, running):
+        """Test that unchanged document metadata is not fetched again."""
+        zotero, readwise, stream = servers
+        n_requests = len(zotero.requests)
+        new = make_annotation("NEW", "PDF1", version=3)
+        zotero.items["NEW"] = new
+        stream.publish("/users/1", 3)
+
+        wait_for(lambda: running.syncs == 2)
+
+        second_sync = zotero.requests[n_requests:]
+        assert not any("/items/PDF1" in p or "/items/DOC1" in p for p in second_sync)
+        assert not any("itemKey=" in p for p in second_sync)
+        assert readwise.highlights[-1]["text"] == "Highlight NEW"
+
+    def test_changed_document_metadata_is_refreshed(self, servers, running):
+        """Test that a document changed in Zotero is re-fetched, not served from cache."""
+        zotero, readwise, stream = servers
+        zotero.items["DOC1"] = make_document("DOC1", version=3, title="Renamed")
+        zotero.items["NEW"] = make_annotation("NEW", "PDF1", version=3)
+        stream.publish("/users/1", 3)
+
+        wait_for(lambda: running.syncs == 2)
+
+        assert readwise.highlights[-1]["title"] == "Renamed"
+
+    def test_other_topics_and_old_versions_are_ignored(self, servers, running):
+        """Test that updates of other libraries or already synced versions do nothing."""
+        zotero, readwise, stream = servers
+        n_requests = len(zotero.requests)
+        stream.publish("/groups/99", 50)
+        stream.publish("/users/1", 2)
+        time.sleep(0.4)
+
+        assert running.syncs == 1
+        assert len(zotero.requests) == n_requests
+
+    def test_reconnects_and_catches_up(self, servers, running):
+        """Test that a lost connection is re-established and missed changes synced."""
+        zotero, readwise, stream = servers
+        stream.disconnect_all()
+        zotero.items["NEW"] = make_annotation("NEW", "PDF1", version=3)
+
+        wait_for(lambda: running.syncs == 2)
+
+        assert len(stream.subscriptions) == 2
+        assert readwise.highlights[-1]["text"] == "Highlight NEW"
+
+    def test_failed_highlights_are_reset_per_sync(self, servers, running):
+        """Test that each sync reports only its own failed highlights."""
+        zotero, readwise, stream = servers
+        for sync, key in enumerate(("LONG1", "LONG2"), start=2):
+            zotero.items[key] = make_annotation(
+                key, "PDF1", version=sync + 1, annotationText="x" * 9000
+            )
+            stream.publish("/users/1", sync + 1)
+            wait_for(lambda sync=sync: running.syncs == sync)
+
+            failed = running.zt2rw.readwise.failed_highlights
+            assert [h["text"] for h in failed] == ["x" * 9000]
+
+    def test_syncs_are_recorded_in_state(self, servers, tmp_path, monkeypatch):
+        """Test that every sync and the library version reached are saved to the state store."""
+        monkeypatch.setattr("zotero2readwise.watch._POLL_INTERVAL", 0.05)
+        state = SyncState(tmp_path / "state.sqlite")
+        watcher = make_watcher(servers, debounce=0.2, max_wait=5.0, state=state)
+        thread = threading.Thread(target=watcher.run_forever, daemon=True)
+        thread.start()
+        try:
+            wait_for(lambda: watcher.syncs == 1)
+        finally:
+            watcher.stop()
+            thread.join(timeout=5)
+
+        assert state.versions("users/1", ["annotation"]) == {"annotation": 2}
+        assert state.last_run("users/1")["status"] == COMPLETED
+
+    def test_rejected_subscription_raises(self, servers):
+        """Test that a subscription error from Zotero stops the watcher."""
+        watcher = make_watcher(servers, api_key="bad")
+
+        with pytest.raises(Zotero2ReadwiseError, match="Forbidden"):
+            watcher.run_forever()
@@ -1,13 +1,21 @@
 """Tests for Zotero module."""
 
-from unittest.mock import mock_open, patch
+import json
+import tracemalloc
+from unittest.mock import Mock, mock_open, patch
 
 import pytest
 
+from tests.stand_in import ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.retry import RetryPolicy
 from zotero2readwise.zotero import (
+    ZOTERO_LOCAL_API_URL,
     ZoteroAnnotationsNotes,
     ZoteroItem,
+    ZoteroPageFetcher,
+    clone_zotero_client,
     get_zotero_client,
+    is_library_modified,
 )
 
 
@@ -102,6 +110,38 @@ class TestZoteroItem:
         assert "comment" not in params or params.get("comment") is None
         assert "title" not in params or params.get("title") is None
 
+    def test_get_nonempty_params_in_field_order(self):
+        """Test that non-empty fields are returned in declaration order."""
+        item = ZoteroItem(
+            key="ABC123",
+            version=100,
+            item_type="annotation",
+            text="Sample text",
+            annotated_at="2023-01-01T12:00:00Z",
+            annotation_url="https://example.com",
+            tags=[{"tag": "a"}],
+            color="#ffd400",
+        )
+
+        assert list(item.get_nonempty_params().items()) == [
+            ("key", "ABC123"),
+            ("version", 100),
+            ("item_type", "annotation"),
+            ("text", "Sample text"),
+            ("annotated_at", "2023-01-01T12:00:00Z"),
+            ("annotation_url", "https://example.com"),
+            ("tags", ["a"]),
+            ("color", "#ffd400"),
+        ]
+
+    def test_zotero_item_is_slotted(self):
+        """Test that items carry no per-instance dictionary."""
+        item = ZoteroItem("K", 1, "note", "text", "2023-01-01T12:00:00Z", "https://example.com")
+
+        assert not hasattr(item, "__dict__")
+        with pytest.raises(AttributeError):
+            item.unknown = 1
+
     def test_zotero_item_with_unicode_text(self):
         """Test ZoteroItem with Unicode text (for issue #90)."""
         item = ZoteroItem(
@@ -162,6 +202,38 @@ class TestGetZoteroClient:
             get_zotero_client(library_id="123456", api_key="test_key", library_type="invalid")
 
 
+class TestLocalZoteroClient:
+    """Tests for clients of the Zotero 7 local API."""
+
+    def test_local_client_needs_no_credentials(self):
+        """Test that the local API needs neither an API key nor a library ID."""
+        with patch.dict("os.environ", {}, clear=True):
+            zot = get_zotero_client(local_api_url=ZOTERO_LOCAL_API_URL)
+
+        assert zot.local
+        assert zot.api_key is None
+        assert zot.library_id == "0"
+        assert zot.endpoint == "http://localhost:23119/api"
+
+    def test_local_client_custom_url_and_group(self):
+        """Test a custom base URL and a group library."""
+        zot = get_zotero_client(
+            library_id="4321", library_type="group", local_api_url="http://127.0.0.1:9999/api/"
+        )
+
+        assert zot.endpoint == "http://127.0.0.1:9999/api"
+        assert zot.library_type == "groups"
+
+    def test_clone_keeps_local_mode(self):
+        """Test that clones of a local client also talk to the local API."""
+        zot = get_zotero_client(local_api_url="http://127.0.0.1:9999/api")
+
+        clone = clone_zotero_client(zot)
+
+        assert clone.local
+        assert clone.endpoint == "http://127.0.0.1:9999/api"
+
+
 class TestZoteroAnnotationsNotes:
     """Tests for ZoteroAnnotationsNotes class."""
 
@@ -278,6 +350,24 @@ class TestZoteroAnnotationsNotes:
 
         assert len(formatted) == 1
 
+    def test_format_items_from_generator(
+        self, mock_zotero_client, sample_zotero_annotation, sample_parent_item
+    ):
+        """Test formatting items from a lazy iterator (streaming retrieval)."""
+        mock_zotero_client.item.return_value = sample_parent_item
+
+        zan = ZoteroAnnotationsNotes(
+            mock_zotero_client,
+            filter_colors=[],
+            filter_tags=[],
+            include_filter_tags=False,
+        )
+
+        formatted = zan.format_items(annot for annot in [sample_zotero_annotation])
+
+        assert len(formatted) == 1
+        assert formatted[0].key == "ABC123"
+
     def test_save_failed_items_to_json(self, mock_zotero_client, tmp_path):
         """Test saving failed items to JSON."""
         zan = ZoteroAnnotationsNotes(
@@ -418,6 +508,44 @@ class TestZoteroAnnotationsNotes:
         # Tag 'important' should be excluded
         assert "important" not in formatted[0].tags
 
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ("color:yellow and doctype:journalArticle", 1),
+            ("color:yellow and not tag:important", 0),
+            ("doctype:book or after:2023-01-02", 0),
+        ],
+    )
+    def test_format_items_filter_expression(
+        self,
+        mock_zotero_client,
+        sample_zotero_annotation,
+        sample_parent_item,
+        expression,
+        expected,
+    ):
+        """Test that items are filtered by an expression, using the parent document type."""
+        mock_zotero_client.item.return_value = sample_parent_item
+
+        zan = ZoteroAnnotationsNotes(
+            mock_zotero_client,
+            filter_colors=[],
+            filter_tags=[],
+            filter_expression=expression,
+        )
+
+        formatted = zan.format_items([sample_zotero_annotation])
+
+        assert len(formatted) == expected
+        assert zan.failed_items == []
+
+    def test_invalid_filter_expression(self, mock_zotero_client):
+        """Test that a malformed filter expression is rejected up front."""
+        with pytest.raises(ValueError, match="Invalid filter expression"):
+            ZoteroAnnotationsNotes(
+                mock_zotero_client, filter_colors=[], filter_tags=[], filter_expression="tag:a or"
+            )
+
     def test_format_item_note_annotation_type(self, mock_zotero_client, sample_parent_item):
         """Test formatting an annotation with 'note' annotationType."""
         note_annotation = {
@@ -755,3 +883,304 @@ class TestZoteroAnnotationsNotes:
         metadata = zan.get_item_metadata(annotation)
 
         assert "World Health Organization" in metadata["creators"]
+
+
+class TestSharedDocumentFields:
+    """Tests for sharing document fields between the formatted items of a document."""
+
+    N_BOOKS = 4
+    N_ANNOTATIONS = 250
+
+    @pytest.fixture
+    def library(self):
+        """Raw books with many annotations each, decoded like API responses."""
+        books = {}
+        annotations = []
+        for b in range(self.N_BOOKS):
+            book = make_document(
+                f"BOOK{b}",
+                title=f"A Rather Long Book Title Number {b}: With a Subtitle",
+                creators=[
+                    {"firstName": f"Author{a}", "lastName": f"Surname{a}", "creatorType": "author"}
+                    for a in range(8)
+                ],
+                tags=[{"tag": f"book tag {t}"} for t in range(6)],
+            )
+            books[f"BOOK{b}"] = book
+            annotations += [
+                make_annotation(
+                    f"B{b}A{a:04d}",
+                    f"BOOK{b}",
+                    annotationColor="#ffd400",
+                    tags=[{"tag": "important"}, {"tag": "to read"}],
+                )
+                for a in range(self.N_ANNOTATIONS)
+            ]
+        # Every raw item gets its own strings, as when decoded from a response
+        return books, json.loads(json.dumps(annotations))
+
+    def test_items_of_a_document_share_its_fields(self, library):
+        """Test that document fields, colors and tags are single instances."""
+        books, annotations = library
+        zan = ZoteroAnnotationsNotes(Mock(item=books.get), filter_colors=[], filter_tags=[])
+
+        items = zan.format_items(annotations)
+
+        first, second = [item for item in items if item.key.startswith("B0")][:2]
+        for name in ("title", "creators", "document_tags", "source_url", "document_type"):
+            assert getattr(first, name) is getattr(second, name)
+        assert first.color is second.color
+        assert first.tags[0] is second.tags[0]
+        assert first.creators.startswith("Author0 Surname0, Author1 Surname1")
+        assert first.document_tags == [f"book tag {t}" for t in range(6)]
+
+    def test_shared_fields_use_less_memory(self, library):
+        """Test that formatted items take less memory than items with their own copies."""
+        books, annotations = library
+        zan = ZoteroAnnotationsNotes(Mock(item=books.get), filter_colors=[], filter_tags=[])
+        metadata = {key: zan._build_metadata(book) for key, book in books.items()}
+
+        def copied_items():
+            # Formatting as before, with the fields of every item built from its own copies
+            copies = json.loads(
+                json.dumps([(a, metadata[a["data"]["parentItem"]]) for a in annotations])
+            )
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            items = [
+                ZoteroItem(
+                    key=a["data"]["key"],
+                    version=a["data"]["version"],
+                    item_type=a["data"]["itemType"],
+                    text=a["data"]["annotationText"],
+                    annotated_at=a["data"]["dateModified"],
+                    annotation_url=a["links"]["alternate"]["href"],
+                    attachment_url=m["attachment_url"],
+                    comment=a["data"]["annotationComment"],
+                    title=m["title"],
+                    tags=a["data"]["tags"],
+                    document_tags=m["tags"],
+                    document_type=m["document_type"],
+                    annotation_type=a["data"]["annotationType"],
+                    creators=m["creators"],
+                    source_url=m["source_url"],
+                    color=a["data"]["annotationColor"],
+                )
+                for a, m in copies
+            ]
+            return tracemalloc.get_traced_memory()[0] - start, items
+
+        def shared_items():
+            start = tracemalloc.get_traced_memory()[0]
+            items = zan.format_items(annotations)
+            return tracemalloc.get_traced_memory()[0] - start, items
+
+        tracemalloc.start()
+        try:
+            copied_bytes, copied = copied_items()
+            shared_bytes, shared = shared_items()
+        finally:
+            tracemalloc.stop()
+
+        assert [item.creators for item in shared] == [item.creators for item in copied]
+        assert shared_bytes < 0.7 * copied_bytes
+
+
+class TestZoteroPageFetcher:
+    """Tests for ZoteroPageFetcher against a local stand-in Zotero server."""
+
+    @pytest.fixture
+    def zotero_server(self):
+        items = [make_annotation(f"A{i:04d}", "PARENT", version=i + 1) for i in range(250)]
+        items.append(make_document("PARENT", version=1))
+        with ZoteroStandIn(items) as server:
+            yield server
+
+    def test_iter_pages_in_order(self, zotero_server):
+        """Test that concurrently fetched pages are reassembled in order."""
+        zot = get_zotero_client(library_id="1", api_key="key")
+        zot.endpoint = zotero_server.url
+
+        fetcher = ZoteroPageFetcher(zot, page_size=20, max_workers=4)
+        pages = list(fetcher.iter_pages(itemType="annotation"))
+
+        assert [len(page) for page in pages] == [20] * 12 + [10]
+        keys = [item["key"] for page in pages for item in page]
+        assert keys == [f"A{i:04d}" for i in range(250)]
+        assert len(zotero_server.requests) == 13
+
+    def test_rejects_page_size_above_api_maximum(self):
+        """Test that a page size above the API's cap is rejected."""
+        with pytest.raises(ValueError, match="page_size"):
+            ZoteroPageFetcher(Mock(), page_size=200)
+
+    def test_iter_pages_passes_query_params(self, zotero_server):
+        """Test that query parameters are applied to every page request."""
+        zot = get_zotero_client(library_id="1", api_key="key")
+        zot.endpoint = zotero_server.url
+
+        fetcher = ZoteroPageFetcher(zot, page_size=20, max_workers=2)
+        items = [
+            item for page in fetcher.iter_pages(itemType="annotation", since=200) for item in page
+        ]
+
+        assert [item["version"] for item in items] == list(range(201, 251))
+
+    def test_iter_pages_empty_result(self, zotero_server):
+        """Test that an empty listing yields no pages."""
+        zot = get_zotero_client(library_id="1", api_key="key")
+        zot.endpoint = zotero_server.url
+
+        fetcher = ZoteroPageFetcher(zot, max_workers=2)
+
+        assert list(fetcher.iter_pages(itemType="note")) == []
+
+
+class TestMetadataPrefetch:
+    """Tests for batched metadata prefetching in ZoteroAnnotationsNotes."""
+
+    @staticmethod
+    def _items_by_key(library):
+        def items(itemKey, limit):
+            return [library[key] for key in itemKey.split(",") if key in library]
+
+        return items
+
+    def test_prefetch_resolves_attachments_to_top_items(self, mock_zotero_client):
+        """Test that parents and top-level items are resolved with multi-key requests."""
+        library = {
+            "ATT1": make_document("ATT1", parent_key="DOC1"),
+            "ATT2": make_document("ATT2", parent_key="DOC1"),
+            "DOC1": make_document("DOC1", title="First"),
+            "DOC2": make_document("DOC2", title="Second"),
+        }
+        mock_zotero_client.items.side_effect = self._items_by_key(library)
+        annots = [
+            make_annotation("A1", "ATT1"),
+            make_annotation("A2", "ATT2"),
+            make_annotation("A3", "DOC2"),
+        ]
+
+        zan = ZoteroAnnotationsNotes(mock_zotero_client, filter_colors=[], filter_tags=[])
+        zan.prefetch_metadata(annots)
+
+        assert mock_zotero_client.items.call_count == 2
+        assert zan._parent_mapping == {"ATT1": "DOC1", "ATT2": "DOC1", "DOC2": "DOC2"}
+        assert zan._cache["DOC1"]["title"] == "First"
+        assert zan._cache["DOC2"]["title"] == "Second"
+
+        formatted = zan.format_items(annots)
+
+        assert len(formatted) == 3
+        mock_zotero_client.item.assert_not_called()
+
+    def test_prefetch_batches_at_most_50_keys(self, mock_zotero_client):
+        """Test that parent keys are requested in batches of at most 50."""
+        library = {f"DOC{i}": make_document(f"DOC{i}") for i in range(120)}
+        mock_zotero_client.items.side_effect = self._items_by_key(library)
+        annots = [make_annotation(f"A{i}", f"DOC{i}") for i in range(120)]
+
+        zan = ZoteroAnnotationsNotes(mock_zotero_client, filter_colors=[], filter_tags=[])
+        zan.prefetch_metadata(annots)
+
+        batch_sizes = [
+            len(call[1]["itemKey"].split(",")) for call in mock_zotero_client.items.call_args_list
+        ]
+        assert batch_sizes == [50, 50, 20]
+        assert len(zan._cache) == 120
+
+    def test_prefetch_skips_known_parents(self, mock_zotero_client, sample_parent_item):
+        """Test that already-resolved parents are not requested again."""
+        mock_zotero_client.items.return_value = [sample_parent_item]
+        annots = [make_annotation("A1", "PARENT123")]
+
+        zan = ZoteroAnnotationsNotes(mock_zotero_client, filter_colors=[], filter_tags=[])
+        zan.prefetch_metadata(annots)
+        zan.prefetch_metadata(annots)
+
+        assert mock_zotero_client.items.call_count == 1
+
+    def test_prefetch_failure_falls_back_to_item_lookup(
+        self, mock_zotero_client, sample_parent_item
+    ):
+        """Test that a failed batch leaves per-item lookups to get_item_metadata."""
+        mock_zotero_client.items.side_effect = Exception("API Error")
+        mock_zotero_client.item.return_value = sample_parent_item
+        annots = [make_annotation("A1", "PARENT123")]
+
+        zan = ZoteroAnnotationsNotes(mock_zotero_client, filter_colors=[], filter_tags=[])
+        zan.prefetch_metadata(annots)
+        formatted = zan.format_items(annots)
+
+        assert len(formatted) == 1
+        mock_zotero_client.item.assert_called_once_with("PARENT123")
+
+
+class TestIsLibraryModified:
+    """Tests for the conditional library version check."""
+
+    def test_unchanged_library(self):
+        """Test that a 304 response reports an unchanged library."""
+        with ZoteroStandIn([make_annotation("A1", "P1", version=10)]) as server:
+            zot = get_zotero_client(library_id="1", api_key="key")
+            zot.endpoint = server.url
+
+            assert is_library_modified(zot, 10) is False
+
+    def test_changed_library(self):
+        """Test that a newer library version reports a changed library."""
+        with ZoteroStandIn([make_annotation("A1", "P1", version=11)]) as server:
+            zot = get_zotero_client(library_id="1", api_key="key")
+            zot.endpoint = server.url
+
+            assert is_library_modified(zot, 10) is True
+            assert server.requests == ["/users/1/items?limit=1&format=versions"]
+
+    def test_connection_error_assumes_modified(self):
+        """Test that a failed check falls back to a regular sync."""
+        zot = get_zotero_client(library_id="1", api_key="key")
+        zot.endpoint = "http://127.0.0.1:9"
+        policy = RetryPolicy(max_retries=2, base_delay=0)
+
+        assert is_library_modified(zot, 10, retry_policy=policy) is True
+        assert policy.retries == 2
+
+
+class TestLocalZoteroAPI:
+    """Tests for reading a library through a stand-in of the Zotero 7 local API."""
+
+    @pytest.fixture
+    def local_server(self):
+        items = [make_document(f"DOC{d}") for d in range(3)]
+        items += [make_document(f"PDF{d}", parent_key=f"DOC{d}") for d in range(3)]
+        items += [make_annotation(f"A{i:03d}", f"PDF{i % 3}") for i in range(120)]
+        with ZoteroStandIn(items) as server:
+            yield server
+
+    def test_everything_follows_local_next_links(self, local_server):
+        """Test that paging through `next` links stays on the local endpoint."""
+        zot = get_zotero_client(local_api_url=f"{local_server.url}/api")
+
+        items = zot.everything(zot.items(itemType="annotation"))
+
+        assert len(items) == 120
+        assert all(path.startswith("/api/users/0/items") for path in local_server.requests)
+        assert not any("Zotero-API-Key" in h for h in local_server.request_headers)
+
+    def test_metadata_is_prefetched_in_batches(self, local_server):
+        """Test that document metadata is fetched with batched `itemKey` requests."""
+        zot = get_zotero_client(local_api_url=f"{local_server.url}/api")
+        zan = ZoteroAnnotationsNotes(zot, filter_colors=(), filter_tags=())
+        pages = list(ZoteroPageFetcher(zot, max_workers=4).iter_pages(itemType="annotation"))
+        items = [item for page in pages for item in page]
+        n_listing_requests = len(local_server.requests)
+
+        zan.prefetch_metadata(items)
+        formatted = zan.format_items(items)
+
+        assert len(formatted) == 120
+        assert {item.title for item in formatted} == {f"Document DOC{d}" for d in range(3)}
+        # One request for the attachments, one for their parent documents
+        metadata_requests = local_server.requests[n_listing_requests:]
+        assert len(metadata_requests) == 2
+        assert all("itemKey=" in path for path in metadata_requests)
@@ -0,0 +1,333 @@
+"""Tests for the local zotero.sqlite backend."""
+
+import sqlite3
+
+import pytest
+
+from tests.stand_in import ReadwiseStandIn
+from zotero2readwise.exception import Zotero2ReadwiseError
+from zotero2readwise.readwise import ReadwiseAPI
+from zotero2readwise.zotero import ZoteroAnnotationsNotes
+from zotero2readwise.zotero_sqlite import ZoteroSQLiteClient
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+# The subset of the Zotero desktop schema read by ZoteroSQLiteClient
+SCHEMA = """
+CREATE TABLE libraries (libraryID INTEGER PRIMARY KEY, type TEXT NOT NULL,
+    editable INT NOT NULL DEFAULT 1, version INT NOT NULL DEFAULT 0);
+CREATE TABLE groups (groupID INTEGER PRIMARY KEY, libraryID INT NOT NULL UNIQUE, name TEXT);
+CREATE TABLE itemTypes (itemTypeID INTEGER PRIMARY KEY, typeName TEXT);
+CREATE TABLE items (itemID INTEGER PRIMARY KEY, itemTypeID INT NOT NULL,
+    dateAdded TIMESTAMP NOT NULL, dateModified TIMESTAMP NOT NULL,
+    libraryID INT NOT NULL, key TEXT NOT NULL, version INT NOT NULL DEFAULT 0,
+    synced INT NOT NULL DEFAULT 0, UNIQUE (libraryID, key));
+CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT);
+CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+CREATE TABLE itemData (itemID INT, fieldID INT, valueID INT, PRIMARY KEY (itemID, fieldID));
+CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+CREATE TABLE creators (creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT,
+    fieldMode INT);
+CREATE TABLE itemCreators (itemID INT NOT NULL, creatorID INT NOT NULL,
+    creatorTypeID INT NOT NULL DEFAULT 1, orderIndex INT NOT NULL DEFAULT 0);
+CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE itemTags (itemID INT NOT NULL, tagID INT NOT NULL, type INT NOT NULL);
+CREATE TABLE itemAttachments (itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT,
+    contentType TEXT, path TEXT);
+CREATE TABLE itemNotes (itemID INTEGER PRIMARY KEY, parentItemID INT, note TEXT, title TEXT);
+CREATE TABLE itemAnnotations (itemID INTEGER PRIMARY KEY, parentItemID INT NOT NULL,
+    type INTEGER NOT NULL, authorName TEXT, text TEXT, comment TEXT, color TEXT,
+    pageLabel TEXT, sortIndex TEXT NOT NULL, position TEXT NOT NULL, isExternal INT NOT NULL);
+CREATE TABLE relationPredicates (predicateID INTEGER PRIMARY KEY, predicate TEXT UNIQUE);
+CREATE TABLE itemRelations (itemID INT NOT NULL, predicateID INT NOT NULL, object TEXT NOT NULL);
+CREATE TABLE deletedItems (itemID INTEGER PRIMARY KEY, dateDeleted DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE syncObjectTypes (syncObjectTypeID INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE syncDeleteLog (syncObjectTypeID INT NOT NULL, libraryID INT NOT NULL,
+    key TEXT NOT NULL, dateDeleted TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP);
+
+INSERT INTO libraries VALUES (1, 'user', 1, 120), (2, 'group', 1, 40);
+INSERT INTO groups VALUES (9876, 2, 'Reading group');
+INSERT INTO itemTypes VALUES (1, 'annotation'), (2, 'attachment'), (3, 'note'),
+    (4, 'journalArticle'), (5, 'book');
+INSERT INTO fields VALUES (1, 'title'), (2, 'date'), (3, 'publicationTitle');
+INSERT INTO creatorTypes VALUES (1, 'author'), (2, 'editor');
+INSERT INTO relationPredicates VALUES (1, 'dc:replaces');
+INSERT INTO syncObjectTypes VALUES (1, 'collection'), (3, 'item');
+INSERT INTO syncDeleteLog (syncObjectTypeID, libraryID, key) VALUES
+    (3, 1, 'GONE0001'), (1, 1, 'COLL0001'), (3, 2, 'GROUPGON');
+"""
+
+
+class FixtureLibrary:
+    """Helper inserting Zotero items into a fixture database."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._next_id = 1
+
+    def add_item(self, key, type_id, version=10, synced=1, library_id=1, **fields):
+        item_id = self._next_id
+        self._next_id += 1
+        self.conn.execute(
+            "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (item_id, type_id, f"2023-01-{item_id:02d} 10:00:00",
+             f"2023-02-{item_id:02d} 11:30:00", library_id, key, version, synced),
+        )  # fmt: skip
+        for field_id, name in ((1, "title"), (2, "date"), (3, "publicationTitle")):
+            if name in fields:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO itemDataValues (value) VALUES (?)", (fields[name],)
+                )
+                self.conn.execute(
+                    "INSERT INTO itemData SELECT ?, ?, valueID FROM itemDataValues WHERE value = ?",
+                    (item_id, field_id, fields[name]),
+                )
+        return item_id
+
+    def add_tags(self, item_id, *names):
+        for name in names:
+            self.conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
+            self.conn.execute(
+                "INSERT INTO itemTags SELECT ?, tagID, 0 FROM tags WHERE name = ?",
+                (item_id, name),
+            )
+
+    def add_creator(self, item_id, first, last, order=0, field_mode=0):
+        creator_id = self.conn.execute(
+            "INSERT INTO creators (firstName, lastName, fieldMode) VALUES (?, ?, ?)",
+            (first, last, field_mode),
+        ).lastrowid
+        self.conn.execute(
+            "INSERT INTO itemCreators VALUES (?, ?, 1, ?)", (item_id, creator_id, order)
+        )
+
+    def add_attachment(self, key, parent_id, content_type="application/pdf", **kwargs):
+        item_id = self.add_item(key, 2, **kwargs)
+        self.conn.execute(
+            "INSERT INTO itemAttachments VALUES (?, ?, 2, ?, 'storage:paper.pdf')",
+            (item_id, parent_id, content_type),
+        )
+        return item_id
+
+    def add_annotation(self, key, attachment_id, text="Highlighted text", ann_type=1, **kwargs):
+        item_id = self.add_item(key, 1, **kwargs)
+        self.conn.execute(
+            "INSERT INTO itemAnnotations VALUES (?, ?, ?, '', ?, 'A comment', '#ffd400', "
+            "'3', '00002|000120|00340', '{}', 0)",
+            (item_id, attachment_id, ann_type, text),
+        )
+        return item_id
+
+    def add_note(self, key, parent_id, note, **kwargs):
+        item_id = self.add_item(key, 3, **kwargs)
+        self.conn.execute("INSERT INTO itemNotes VALUES (?, ?, ?, '')", (item_id, parent_id, note))
+        return item_id
+
+    def delete(self, item_id):
+        self.conn.execute("INSERT INTO deletedItems (itemID) VALUES (?)", (item_id,))
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+@pytest.fixture
+def library_path(tmp_path):
+    """Create a fixture zotero.sqlite with two documents, annotations and a note."""
+    path = tmp_path / "zotero.sqlite"
+    lib = FixtureLibrary(path)
+    article = lib.add_item("ARTICLE1", 4, title="Deep Learning", date="2015")
+    lib.add_creator(article, "Yann", "LeCun")
+    lib.add_creator(article, "Yoshua", "Bengio", order=1)
+    lib.add_tags(article, "ml")
+    pdf = lib.add_attachment("PDF00001", article)
+    lib.add_attachment("PDF00002", article)  # a second PDF; the oldest one is linked
+    highlight = lib.add_annotation("ANNOT001", pdf, version=100)
+    lib.add_tags(highlight, "important")
+    lib.add_annotation("ANNOT002", pdf, text="", ann_type=2, version=50)
+    lib.add_annotation("ANNOT003", pdf, ann_type=4, version=60)
+    unsynced = lib.add_annotation("ANNOT004", pdf, text="Local edit", version=5, synced=0)
+    lib.conn.execute("INSERT INTO itemRelations VALUES (?, 1, 'http://zotero.org/x')", (unsynced,))
+    trashed = lib.add_annotation("ANNOT005", pdf, text="Trashed")
+    lib.delete(trashed)
+    standalone_pdf = lib.add_attachment("PDF00003", None, title="Standalone.pdf")
+    lib.add_annotation("ANNOT006", standalone_pdf, text="From a standalone PDF")
+    book = lib.add_item("BOOK0001", 5, title="A Book")
+    lib.add_creator(book, None, "World Health Organization", field_mode=1)
+    lib.add_note("NOTE0001", book, "<p>Book note</p>", version=110)
+    group_doc = lib.add_item("GROUPDOC", 4, library_id=2, title="Group paper")
+    group_pdf = lib.add_attachment("GROUPPDF", group_doc, library_id=2)
+    lib.add_annotation("GROUPANN", group_pdf, library_id=2)
+    lib.close()
+    return path
+
+
+class TestZoteroSQLiteClient:
+    """Tests for ZoteroSQLiteClient."""
+
+    def test_annotations_are_shaped_like_web_api_items(self, library_path):
+        """Test that annotations carry the fields and links format_item uses."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        annot = zot.item("ANNOT001")
+
+        assert annot["key"] == "ANNOT001"
+        assert annot["version"] == 100
+        assert annot["links"]["alternate"]["href"] == (
+            "https://www.zotero.org/users/123/items/ANNOT001"
+        )
+        data = annot["data"]
+        assert data["itemType"] == "annotation"
+        assert data["annotationType"] == "highlight"
+        assert data["annotationText"] == "Highlighted text"
+        assert data["annotationComment"] == "A comment"
+        assert data["annotationColor"] == "#ffd400"
+        assert data["annotationPageLabel"] == "3"
+        assert data["parentItem"] == "PDF00001"
+        assert data["tags"] == [{"tag": "important"}]
+        assert data["dateModified"].endswith("Z") and "T" in data["dateModified"]
+
+    def test_top_level_item_metadata(self, library_path):
+        """Test fields, creators and the PDF attachment link of a top-level item."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        article = zot.item("ARTICLE1")
+
+        assert article["data"]["title"] == "Deep Learning"
+        assert article["data"]["date"] == "2015"
+        assert [c["lastName"] for c in article["data"]["creators"]] == ["LeCun", "Bengio"]
+        assert article["links"]["attachment"]["attachmentType"] == "application/pdf"
+        assert article["links"]["attachment"]["href"].endswith("/items/PDF00001")
+        assert zot.item("BOOK0001")["data"]["creators"] == [
+            {"creatorType": "author", "name": "World Health Organization"}
+        ]
+
+    def test_items_filters_type_and_excludes_trash(self, library_path):
+        """Test listing by item type; trashed and other-library items are excluded."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        keys = [item["key"] for item in zot.items(itemType="annotation")]
+
+        assert sorted(keys) == ["ANNOT001", "ANNOT002", "ANNOT003", "ANNOT004", "ANNOT006"]
+        assert zot.request.headers["Total-Results"] == "5"
+        assert zot.request.headers["Last-Modified-Version"] == "120"
+
+    def test_items_since_includes_unsynced_changes(self, library_path):
+        """Test that `since` keeps newer and locally modified (unsynced) items."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        keys = {item["key"] for item in zot.items(itemType="annotation", since=55)}
+
+        assert keys == {"ANNOT001", "ANNOT003", "ANNOT004"}
+        assert set(zot.item_versions(since=55)) >= keys
+
+    def test_items_paging_and_item_keys(self, library_path):
+        """Test `start`/`limit` paging and multi-key lookups."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        first = zot.items(itemType="annotation", start=0, limit=2)
+        rest = zot.items(itemType="annotation", start=2, limit=10)
+        by_key = zot.items(itemKey="PDF00001,MISSING,ARTICLE1")
+
+        assert len(first) == 2 and len(rest) == 3
+        assert zot.request.headers["Total-Results"] == "2"
+        assert [item["key"] for item in by_key] == ["PDF00001", "ARTICLE1"]
+
+    def test_group_library(self, library_path):
+        """Test reading a group library by its group ID."""
+        zot = ZoteroSQLiteClient(library_path, library_id="9876", library_type="group")
+
+        assert [i["key"] for i in zot.items(itemType="annotation")] == ["GROUPANN"]
+        assert zot.last_modified_version() == 40
+        assert zot.item("GROUPANN")["links"]["alternate"]["href"].startswith(
+            "https://www.zotero.org/groups/9876/"
+        )
+
+    def test_deleted_items(self, library_path):
+        """Test that unsynced local deletions of the library's items are reported."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        assert zot.deleted(since=100) == {"items": ["GONE0001"]}
+
+    def test_unknown_item_raises(self, library_path):
+        """Test that unknown keys raise like a 404 from the Web API."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+
+        with pytest.raises(KeyError):
+            zot.item("MISSING")
+        assert zot.request.status_code == 404
+
+    def test_reads_snapshot_while_database_is_locked(self, library_path):
+        """Test that a database locked by Zotero desktop can still be read."""
+        conn = sqlite3.connect(library_path)
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        conn.execute("BEGIN EXCLUSIVE")
+        try:
+            zot = ZoteroSQLiteClient(library_path, library_id="123")
+        finally:
+            conn.rollback()
+            conn.close()
+
+        assert zot.item("ANNOT001")["data"]["annotationText"] == "Highlighted text"
+
+    def test_missing_database(self, tmp_path):
+        """Test that a missing database file raises a clear error."""
+        with pytest.raises(Zotero2ReadwiseError, match="does not exist"):
+            ZoteroSQLiteClient(tmp_path / "zotero.sqlite", library_id="123")
+
+    def test_unknown_group(self, library_path):
+        """Test that an unknown group library raises a clear error."""
+        with pytest.raises(Zotero2ReadwiseError, match="No group library 1"):
+            ZoteroSQLiteClient(library_path, library_id="1", library_type="group")
+
+
+class TestSQLiteBackendFormatting:
+    """Tests for formatting and syncing items read from a local database."""
+
+    def test_format_items(self, library_path):
+        """Test that local items format like Web API items, without network access."""
+        zot = ZoteroSQLiteClient(library_path, library_id="123")
+        zan = ZoteroAnnotationsNotes(zot, filter_colors=(), filter_tags=())
+        items = zot.items(itemType="annotation") + zot.items(itemType="note")
+
+        zan.prefetch_metadata(items)
+        formatted = {item.key: item for item in zan.format_items(items)}
+
+        assert set(formatted) == {"ANNOT001", "ANNOT002", "ANNOT004", "ANNOT006", "NOTE0001"}
+        annot = formatted["ANNOT001"]
+        assert annot.title == "Deep Learning"
+        assert annot.creators == "Yann LeCun, Yoshua Bengio"
+        assert annot.document_tags == ["ml"]
+        assert annot.attachment_url.endswith("/items/PDF00001")
+        assert formatted["ANNOT006"].title == "Standalone.pdf"
+        assert formatted["NOTE0001"].creators == "World Health Organization"
+        assert formatted["ANNOT002"].annotation_type == "note"
+        # Ink annotations have no text and fail as with the Web API
+        assert {f["item"]["key"] for f in zan.failed_items} == {"ANNOT003"}
+
+    def test_sync_from_local_database(self, library_path):
+        """Test a full sync from a local database to a Readwise stand-in."""
+        zt_rw = Zotero2Readwise(
+            readwise_token="token",
+            zotero_key=None,
+            zotero_library_id="123",
+            include_notes=True,
+            write_failures=False,
+            zotero_sqlite_path=str(library_path),
+        )
+        with ReadwiseStandIn() as server:
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{server.url}/highlights/")
+            zt_rw.run()
+
+        assert sorted(h["text"] for h in server.highlights) == [
+            "<p>Book note</p>",
+            "A comment",
+            "From a standalone PDF",
+            "Highlighted text",
+            "Local edit",
+        ]
+        highlight = next(h for h in server.highlights if h["text"] == "Highlighted text")
+        assert highlight["highlight_url"].startswith(
+            "zotero://open-pdf/library/items/PDF00001?page=3"
+        )
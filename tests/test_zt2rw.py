@@ -1,9 +1,13 @@
 """Tests for Zotero2Readwise main module."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
 
 import pytest
 
+from tests.stand_in import ReadwiseStandIn, ZoteroStandIn, make_annotation, make_document
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded
+from zotero2readwise.readwise import ReadwiseAPI
 from zotero2readwise.zotero import ZoteroItem
 from zotero2readwise.zt2rw import Zotero2Readwise
 
@@ -40,7 +44,18 @@ class TestZotero2Readwise:
             library_type=zotero_credentials["library_type"],
             api_key=zotero_credentials["key"],
         )
-        mock_rw_class.assert_called_once_with(readwise_token, custom_tag=None)
+        mock_rw_class.assert_called_once_with(
+            readwise_token,
+            custom_tag=None,
+            batch_size=500,
+            max_batch_bytes=2_000_000,
+            upload_workers=1,
+            retry_policy=zt_rw.retry_policy,
+            ledger=None,
+            session=zt_rw.sessions.session,
+            timeout=(10.0, 60.0),
+            checkpoint=None,
+        )
         assert zt_rw.include_annots is True
         assert zt_rw.include_notes is False
 
@@ -98,13 +113,14 @@ class TestZotero2Readwise:
         )
 
         mock_annotations = [{"key": "ANN1"}, {"key": "ANN2"}]
-        mock_client.items.return_value = Mock()
-        mock_client.everything.return_value = mock_annotations
+        mock_client.items.return_value = mock_annotations
 
         items = zt_rw.get_all_zotero_items()
 
         assert len(items) == 2
-        mock_client.items.assert_called_once_with(itemType="annotation", since=0)
+        mock_client.items.assert_called_once_with(
+            itemType="annotation", since=0, start=0, limit=100
+        )
 
     @patch("zotero2readwise.zt2rw.get_zotero_client")
     @patch("zotero2readwise.zt2rw.Readwise")
@@ -130,13 +146,12 @@ class TestZotero2Readwise:
         )
 
         mock_notes = [{"key": "NOTE1"}]
-        mock_client.items.return_value = Mock()
-        mock_client.everything.return_value = mock_notes
+        mock_client.items.return_value = mock_notes
 
         items = zt_rw.get_all_zotero_items()
 
         assert len(items) == 1
-        mock_client.items.assert_called_once_with(itemType="note", since=0)
+        mock_client.items.assert_called_once_with(itemType="note", since=0, start=0, limit=100)
 
     @patch("zotero2readwise.zt2rw.get_zotero_client")
     @patch("zotero2readwise.zt2rw.Readwise")
@@ -164,20 +179,46 @@ class TestZotero2Readwise:
         mock_annotations = [{"key": "ANN1"}, {"key": "ANN2"}]
         mock_notes = [{"key": "NOTE1"}]
 
-        def mock_everything(query):
-            # Return different data based on the query type
-            if hasattr(query, "itemType"):
-                return mock_annotations if query.itemType == "annotation" else mock_notes
-            return []
-
-        mock_client.items.return_value = Mock()
-        mock_client.everything.side_effect = [mock_annotations, mock_notes]
+        mock_client.items.side_effect = [mock_annotations, mock_notes]
 
         items = zt_rw.get_all_zotero_items()
 
         assert len(items) == 3
         assert mock_client.items.call_count == 2
 
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_get_all_zotero_items_with_since_per_item_type(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that each item type is retrieved since its own version."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        mock_client.items.return_value = []
+        mock_client.deleted.return_value = {"items": []}
+
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            include_notes=True,
+            since={"annotation": 500, "note": 200},
+        )
+        zt_rw.get_all_zotero_items()
+
+        assert mock_client.items.call_args_list == [
+            call(itemType="annotation", since=500, start=0, limit=100),
+            call(itemType="note", since=200, start=0, limit=100),
+        ]
+        mock_client.deleted.assert_called_once_with(since=200)
+        assert zt_rw.since_for("attachment") == 0
+
     @patch("zotero2readwise.zt2rw.get_zotero_client")
     @patch("zotero2readwise.zt2rw.Readwise")
     @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
@@ -202,12 +243,16 @@ class TestZotero2Readwise:
             since=1234567890,
         )
 
-        mock_client.items.return_value = Mock()
-        mock_client.everything.return_value = []
+        mock_client.items.return_value = []
+        mock_client.deleted.return_value = {"items": ["GONE1"], "collections": []}
 
         zt_rw.get_all_zotero_items()
 
-        mock_client.items.assert_called_once_with(itemType="annotation", since=1234567890)
+        mock_client.items.assert_called_once_with(
+            itemType="annotation", since=1234567890, start=0, limit=100
+        )
+        mock_client.deleted.assert_called_once_with(since=1234567890)
+        assert zt_rw.deleted_keys == ["GONE1"]
 
     @patch("zotero2readwise.zt2rw.get_zotero_client")
     @patch("zotero2readwise.zt2rw.Readwise")
@@ -264,8 +309,7 @@ class TestZotero2Readwise:
 
         # Mock the retrieval
         mock_items = [{"key": "ITEM1"}]
-        mock_client.items.return_value = Mock()
-        mock_client.everything.return_value = mock_items
+        mock_client.items.return_value = mock_items
 
         # Mock formatting
         mock_formatted = [
@@ -473,14 +517,25 @@ class TestZotero2Readwise:
         mock_client = Mock()
         mock_get_client.return_value = mock_client
 
-        Zotero2Readwise(
+        zt_rw = Zotero2Readwise(
             readwise_token=readwise_token,
             zotero_key=zotero_credentials["key"],
             zotero_library_id=zotero_credentials["library_id"],
             custom_tag="zotero",
         )
 
-        mock_rw_class.assert_called_once_with(readwise_token, custom_tag="zotero")
+        mock_rw_class.assert_called_once_with(
+            readwise_token,
+            custom_tag="zotero",
+            batch_size=500,
+            max_batch_bytes=2_000_000,
+            upload_workers=1,
+            retry_policy=zt_rw.retry_policy,
+            ledger=None,
+            session=zt_rw.sessions.session,
+            timeout=(10.0, 60.0),
+            checkpoint=None,
+        )
 
     @patch("zotero2readwise.zt2rw.get_zotero_client")
     @patch("zotero2readwise.zt2rw.Readwise")
@@ -609,3 +664,481 @@ class TestZotero2Readwise:
 
         mock_zotero.format_items.assert_called_once_with([])
         mock_readwise.post_zotero_annotations_to_readwise.assert_called_once_with([])
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_iter_pages_uses_offsets(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that pages are requested by offset until a short page is returned."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            page_size=2,
+        )
+
+        mock_client.items.side_effect = [
+            [{"key": "ANN1"}, {"key": "ANN2"}],
+            [{"key": "ANN3"}],
+        ]
+
+        pages = list(zt_rw.iter_pages("annotation", since=7))
+
+        assert pages == [[{"key": "ANN1"}, {"key": "ANN2"}], [{"key": "ANN3"}]]
+        assert mock_client.items.call_args_list[0][1] == {
+            "itemType": "annotation",
+            "since": 7,
+            "start": 0,
+            "limit": 2,
+        }
+        assert mock_client.items.call_args_list[1][1]["start"] == 2
+        mock_client.everything.assert_not_called()
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_iter_all_zotero_items_is_lazy(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that items are yielded before later pages are requested."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            include_annotations=True,
+            include_notes=True,
+            page_size=1,
+        )
+
+        mock_client.items.side_effect = [[{"key": "ANN1"}], [], [{"key": "NOTE1"}], []]
+
+        items = zt_rw.iter_all_zotero_items()
+        assert next(items) == {"key": "ANN1"}
+        assert mock_client.items.call_count == 1
+        assert list(items) == [{"key": "NOTE1"}]
+        assert mock_client.items.call_count == 4
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_run_with_stream(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that streaming mode hands a lazy iterator to the formatter."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+
+        mock_zotero = Mock()
+        mock_zan_class.return_value = mock_zotero
+        mock_zotero.failed_items = []
+        consumed = []
+        mock_zotero.format_items.side_effect = lambda annots: consumed.extend(annots) or []
+
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            stream=True,
+        )
+        mock_client.items.return_value = [{"key": "ANN1"}]
+
+        zt_rw.run()
+
+        assert consumed == [{"key": "ANN1"}]
+        mock_client.everything.assert_not_called()
+
+    @patch("zotero2readwise.zt2rw.ZoteroPageFetcher")
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_retrieve_all_with_fetch_workers(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        mock_fetcher_class,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that fetch_workers > 1 routes retrieval through the concurrent fetcher."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        mock_fetcher_class.return_value.iter_pages.return_value = iter(
+            [[{"key": "ANN1"}, {"key": "ANN2"}], [{"key": "ANN3"}]]
+        )
+
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            fetch_workers=8,
+        )
+
+        items = zt_rw.retrieve_all("annotation", since=5)
+
+        assert [item["key"] for item in items] == ["ANN1", "ANN2", "ANN3"]
+        mock_fetcher_class.assert_called_once_with(
+            mock_client,
+            page_size=100,
+            max_workers=8,
+            retry_policy=zt_rw.retry_policy,
+            sessions=zt_rw.sessions,
+        )
+        mock_fetcher_class.return_value.iter_pages.assert_called_once_with(
+            start=0, itemType="annotation", since=5
+        )
+        mock_client.everything.assert_not_called()
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_run_prefetches_metadata_before_formatting(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that parent metadata is prefetched before items are formatted."""
+        mock_zotero = Mock()
+        mock_zan_class.return_value = mock_zotero
+        mock_zotero.format_items.return_value = []
+        mock_zotero.failed_items = []
+
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+        )
+        provided_items = [{"key": "PROVIDED1"}]
+
+        zt_rw.run(provided_items)
+
+        assert [call[0] for call in mock_zotero.method_calls[:2]] == [
+            "prefetch_metadata",
+            "format_items",
+        ]
+        mock_zotero.prefetch_metadata.assert_called_once_with(provided_items)
+
+    @patch("zotero2readwise.zt2rw.MetadataCache")
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_initialization_with_metadata_cache(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        mock_cache_class,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that a metadata cache path creates a persistent cache for the formatter."""
+        _zt_rw = Zotero2Readwise(  # noqa: F841
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            metadata_cache_path="metadata.sqlite",
+            metadata_cache_size=50,
+        )
+
+        mock_cache_class.assert_called_once_with("metadata.sqlite", max_entries=50)
+        assert mock_zan_class.call_args[1]["metadata_cache"] is mock_cache_class.return_value
+
+    @patch("zotero2readwise.zt2rw.UploadLedger")
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_initialization_with_upload_ledger(
+        self,
+        mock_zan_class,
+        mock_rw_class,
+        mock_get_client,
+        mock_ledger_class,
+        zotero_credentials,
+        readwise_token,
+    ):
+        """Test that an upload ledger path creates a ledger for the Readwise client."""
+        _zt_rw = Zotero2Readwise(  # noqa: F841
+            readwise_token=readwise_token,
+            zotero_key=zotero_credentials["key"],
+            zotero_library_id=zotero_credentials["library_id"],
+            upload_ledger_path="uploads.sqlite",
+        )
+
+        mock_ledger_class.assert_called_once_with("uploads.sqlite")
+        assert mock_rw_class.call_args[1]["ledger"] is mock_ledger_class.return_value
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_initialization_with_local_api(
+        self, mock_zan_class, mock_rw_class, mock_get_client, readwise_token
+    ):
+        """Test that the local API needs no Zotero key and fetches pages concurrently."""
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key=None,
+            zotero_library_id="0",
+            zotero_local_api_url="http://localhost:23119/api",
+        )
+
+        mock_get_client.assert_called_once_with(
+            library_id="0", library_type="user", local_api_url="http://localhost:23119/api"
+        )
+        assert zt_rw.fetch_workers == 4
+
+    def test_sync_from_local_api(self, readwise_token):
+        """Test a full sync from a Zotero local API stand-in to a Readwise stand-in."""
+        library = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+        library += [make_annotation(f"A{i}", "PDF1") for i in range(30)]
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key=None,
+                zotero_library_id="0",
+                write_failures=False,
+                page_size=10,
+                zotero_local_api_url=f"{zotero_server.url}/api",
+            )
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+            zt_rw.run()
+
+        assert len(readwise_server.highlights) == 30
+        assert {h["title"] for h in readwise_server.highlights} == {"Document DOC1"}
+
+    def test_columnar_sync_uploads_the_same_highlights(self, readwise_token):
+        """Test that a columnar sync uploads what a sync with a list of items does."""
+        library = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+        library += [make_annotation(f"A{i:02d}", "PDF1") for i in range(30)]
+
+        def sync(columnar):
+            with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+                zt_rw = Zotero2Readwise(
+                    readwise_token=readwise_token,
+                    zotero_key="key",
+                    zotero_library_id="1",
+                    write_failures=False,
+                    page_size=10,
+                    columnar=columnar,
+                )
+                zt_rw.zotero_client.endpoint = zotero_server.url
+                zt_rw.readwise.endpoints = ReadwiseAPI(
+                    highlights=f"{readwise_server.url}/highlights/"
+                )
+                zt_rw.run()
+            return readwise_server.highlights
+
+        highlights = sync(columnar=True)
+
+        assert len(highlights) == 30
+        assert highlights == sync(columnar=False)
+
+    def test_columnar_rejects_pipeline(self, readwise_token):
+        """Test that columnar and pipeline cannot be combined."""
+        with pytest.raises(ValueError, match="columnar"):
+            Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                columnar=True,
+                pipeline=True,
+            )
+
+    @pytest.mark.parametrize("page_size", [0, 101])
+    def test_rejects_page_size_outside_api_limits(self, readwise_token, page_size):
+        """Test that a page size the Zotero API would cap is rejected."""
+        with pytest.raises(ValueError, match="page_size must be between 1 and 100"):
+            Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                page_size=page_size,
+            )
+
+    def test_incremental_sync_deletes_removed_highlights(self, readwise_token, tmp_path):
+        """Test that items deleted in Zotero are deleted from Readwise on the next sync."""
+        library = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+        library += [make_annotation(f"A{i}", "PDF1", version=2) for i in range(3)]
+        ledger_path = str(tmp_path / "uploads.sqlite")
+
+        def sync(zotero_server, readwise_server, since):
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                since=since,
+                write_failures=False,
+                upload_ledger_path=ledger_path,
+            )
+            zt_rw.zotero_client.endpoint = zotero_server.url
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+            zt_rw.run()
+            return zt_rw
+
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            sync(zotero_server, readwise_server, since=0)
+            del zotero_server.items["A1"]
+            zotero_server.deleted = {"items": ["A1"], "collections": []}
+            zt_rw = sync(zotero_server, readwise_server, since=2)
+
+        assert zt_rw.deleted_keys == ["A1"]
+        assert sorted(h["text"] for h in readwise_server.stored.values()) == [
+            "Highlight A0",
+            "Highlight A2",
+        ]
+        assert len(readwise_server.deleted_ids) == 1
+
+    @pytest.mark.parametrize("pipeline", [False, True])
+    def test_run_stopped_by_deadline_resumes(
+        self, readwise_token, tmp_path, expiring_deadline, pipeline
+    ):
+        """Test that a run stopped at its deadline is completed by the next run."""
+        library = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+        library += [make_annotation(f"A{i:02d}", "PDF1") for i in range(60)]
+        ledger_path = str(tmp_path / "uploads.sqlite")
+
+        def make_zt_rw(zotero_server, readwise_server):
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                write_failures=False,
+                readwise_batch_size=10,
+                upload_ledger_path=ledger_path,
+                pipeline=pipeline,
+            )
+            zt_rw.zotero_client.endpoint = zotero_server.url
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+            return zt_rw
+
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = make_zt_rw(zotero_server, readwise_server)
+            # Listing, two metadata lookups and two chunks (two checks per chunk)
+            with pytest.raises(DeadlineExceeded):
+                zt_rw.run(deadline=expiring_deadline(7))
+            n_first_run = len(readwise_server.highlights)
+
+            make_zt_rw(zotero_server, readwise_server).run()
+
+        assert 0 < n_first_run < 60
+        assert sorted(h["text"] for h in readwise_server.highlights) == sorted(
+            f"Highlight A{i:02d}" for i in range(60)
+        )
+
+    def test_run_with_expired_deadline_sends_no_request(self, readwise_token):
+        """Test that an already expired deadline stops the run before any request."""
+        with ZoteroStandIn([make_document("DOC1")]) as zotero_server:
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                write_failures=False,
+            )
+            zt_rw.zotero_client.endpoint = zotero_server.url
+
+            with pytest.raises(DeadlineExceeded):
+                zt_rw.run(deadline=Deadline(expires_at=0.0))
+
+        assert zotero_server.requests == []
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_retrieve_all_pushes_tag_filter_down(
+        self, mock_zan_class, mock_rw_class, mock_get_client, readwise_token
+    ):
+        """Test that tag filters become an OR `tag` query parameter."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        mock_client.items.return_value = []
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key="key",
+            zotero_library_id="1",
+            filter_tags=("important", "to read"),
+        )
+
+        zt_rw.retrieve_all("annotation", since=5)
+
+        mock_client.items.assert_called_once_with(
+            itemType="annotation", since=5, tag="important || to read", start=0, limit=100
+        )
+
+    @patch("zotero2readwise.zt2rw.get_zotero_client")
+    @patch("zotero2readwise.zt2rw.Readwise")
+    @patch("zotero2readwise.zt2rw.ZoteroAnnotationsNotes")
+    def test_negation_like_tags_are_filtered_client_side(
+        self, mock_zan_class, mock_rw_class, mock_get_client, readwise_token
+    ):
+        """Test that tags the Zotero query syntax would misread are not pushed down."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        mock_client.items.return_value = []
+        zt_rw = Zotero2Readwise(
+            readwise_token=readwise_token,
+            zotero_key="key",
+            zotero_library_id="1",
+            filter_tags=("important", "-draft"),
+        )
+
+        zt_rw.retrieve_all("annotation")
+
+        mock_client.items.assert_called_once_with(
+            itemType="annotation", since=0, start=0, limit=100
+        )
+
+    @pytest.mark.parametrize("fetch_workers", [1, 4])
+    def test_tag_filter_downloads_only_tagged_items(self, readwise_token, fetch_workers):
+        """Test that only tagged annotations are requested from Zotero, in every mode."""
+        library = [make_document("DOC1"), make_document("PDF1", parent_key="DOC1")]
+        for i in range(40):
+            tags = [{"tag": "important"}] if i % 10 == 0 else [{"tag": "other"}]
+            library.append(make_annotation(f"A{i}", "PDF1", tags=tags))
+
+        with ZoteroStandIn(library) as zotero_server, ReadwiseStandIn() as readwise_server:
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key="key",
+                zotero_library_id="1",
+                filter_tags=("important",),
+                include_filter_tags=True,
+                write_failures=False,
+                page_size=10,
+                fetch_workers=fetch_workers,
+                stream=True,
+            )
+            zt_rw.zotero_client.endpoint = zotero_server.url
+            zt_rw.readwise.endpoints = ReadwiseAPI(highlights=f"{readwise_server.url}/highlights/")
+            zt_rw.run()
+
+        assert sorted(h["text"] for h in readwise_server.highlights) == [
+            f"Highlight A{i}" for i in (0, 10, 20, 30)
+        ]
+        listings = [p for p in zotero_server.requests if "itemType=annotation" in p]
+        assert len(listings) == 1
+        assert "tag=important" in listings[0]
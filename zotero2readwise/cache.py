@@ -0,0 +1,183 @@
+"""Persistent on-disk cache for Zotero document metadata.
+
+This module provides a single-file SQLite store for the document metadata
+built by `ZoteroAnnotationsNotes.get_item_metadata`, so that repeated runs do
+not re-download metadata for documents that have not changed.
+
+Classes:
+    MetadataCache: SQLite-backed metadata cache keyed by top-level item key.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from pyzotero.zotero import Zotero
+
+from zotero2readwise.retry import RetryPolicy
+
+
+class MetadataCache:
+    """SQLite-backed cache of document metadata keyed by top-level item key.
+
+    Each entry records the Zotero version of the item it was built from. Before
+    the cache is used, `validate` asks Zotero which items changed since the
+    library version the cache was last validated against, and drops the entries
+    (and attachment-to-parent mappings) of those items. The cache holds at most
+    `max_entries` documents; the least recently used ones are evicted first.
+
+    Attributes:
+        path: Location of the SQLite database file.
+        max_entries: Maximum number of cached documents.
+
+    Example:
+        >>> cache = MetadataCache("zotero_metadata.sqlite")
+        >>> cache.validate(zotero_client)
+        >>> cache.get("T5YAS63A")
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 10_000):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite database file.
+            max_entries: Maximum number of cached documents.
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS metadata (
+                    key TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    metadata TEXT NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS metadata_accessed_at ON metadata (accessed_at);
+                CREATE TABLE IF NOT EXISTS parents (
+                    parent_key TEXT PRIMARY KEY,
+                    top_key TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS state (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+
+    @property
+    def library_version(self) -> int:
+        """Zotero library version the cache was last validated against (0 if never)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE name = 'library_version'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def validate(self, zotero_client: Zotero, retry_policy: RetryPolicy | None = None) -> None:
+        """Drop entries for items that changed in Zotero since the last validation.
+
+        Args:
+            zotero_client: Pyzotero client for the cached library.
+            retry_policy: Optional retry policy for the version requests.
+
+        Raises:
+            Exception: If a version request fails; the cache is left unvalidated.
+        """
+        policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries=0)
+        current_version = policy.call_zotero(zotero_client, zotero_client.last_modified_version)
+        since = self.library_version
+        if since == current_version:
+            return
+        if since:
+            changed = policy.call_zotero(zotero_client, zotero_client.item_versions, since=since)
+            self.invalidate(changed)
+        else:
+            # Entries of unknown provenance cannot be validated incrementally
+            self.clear()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (name, value) VALUES ('library_version', ?)",
+                (current_version,),
+            )
+
+    def invalidate(self, versions: dict[str, int]) -> None:
+        """Drop entries whose cached version differs from the given item versions.
+
+        Args:
+            versions: Mapping of Zotero item key to its current version.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM metadata WHERE key = ? AND version != ?", versions.items()
+            )
+            self._conn.executemany(
+                "DELETE FROM parents WHERE parent_key = ?", ((key,) for key in versions)
+            )
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM metadata")
+            self._conn.execute("DELETE FROM parents")
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached metadata of a top-level item, or None if not cached."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM metadata WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE metadata SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, version: int, metadata: dict) -> None:
+        """Store the metadata of a top-level item built from the given item version."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (key, version, metadata, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, version, json.dumps(metadata, ensure_ascii=False), time.time()),
+            )
+
+    def get_parent_mapping(self) -> dict[str, str]:
+        """Return the cached mapping of parent (attachment) keys to top-level item keys."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT parent_key, top_key FROM parents"))
+
+    def put_parent_mapping(self, mapping: Iterable[tuple[str, str]]) -> None:
+        """Store (parent key, top-level item key) pairs."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parents (parent_key, top_key) VALUES (?, ?)", mapping
+            )
+
+    def flush(self) -> None:
+        """Evict the least recently used entries beyond `max_entries` and commit."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM metadata WHERE key IN ("
+                "SELECT key FROM metadata ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.execute(
+                "DELETE FROM parents WHERE top_key NOT IN (SELECT key FROM metadata)"
+            )
+
+    def close(self) -> None:
+        """Flush pending changes and close the database."""
+        self.flush()
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
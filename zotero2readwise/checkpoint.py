@@ -0,0 +1,266 @@
+"""Resumable checkpoints of a synchronization.
+
+A full sync of a large library fetches thousands of Zotero pages, formats every
+item and uploads it to Readwise in chunks. If the run dies part-way (a crash, a
+lost connection, `--max_runtime`), the synced versions in the state store
+(`SyncState`) are left unchanged and the next run would start over. This module
+records the progress of each phase in a single-file SQLite store so that a
+restarted run resumes where the last one stopped:
+
+* fetching: the raw items of every fetched page and the offset of the next page,
+  per item type;
+* uploading: the formatted items that were not yet acknowledged by Readwise.
+  Items are removed as soon as the chunk containing them is uploaded.
+
+Every step is written in one transaction, so a checkpoint is never left
+half-updated.
+
+Classes:
+    SyncCheckpoint: SQLite-backed progress record of one sync.
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict, fields
+from pathlib import Path
+
+from zotero2readwise.zotero import ZoteroItem
+
+# Stages of a checkpointed sync
+FETCHING = "fetching"
+UPLOADING = "uploading"
+
+# ZoteroItem fields without defaults, passed to the constructor on restore
+_REQUIRED_FIELDS = ("key", "version", "item_type", "text", "annotated_at", "annotation_url")
+
+
+class SyncCheckpoint:
+    """SQLite-backed progress record of one sync.
+
+    A checkpoint belongs to the sync described by its `signature` (library,
+    `since` and filters); `begin` discards a checkpoint left by a different sync.
+    It also records the Zotero library version the sync started at, which is the
+    version the next incremental sync must start from once this one completes.
+
+    Attributes:
+        path: Location of the SQLite database file.
+
+    Example:
+        >>> checkpoint = SyncCheckpoint("sync_checkpoint.sqlite")
+        >>> checkpoint.begin(signature, zotero_client.last_modified_version())
+        >>> items, start = checkpoint.fetch_progress("annotation")
+    """
+
+    def __init__(self, path: str | Path):
+        """Open (or create) the checkpoint database.
+
+        Args:
+            path: Location of the SQLite database file.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sync (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    signature TEXT NOT NULL,
+                    library_version INTEGER NOT NULL,
+                    stage TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fetch_progress (
+                    item_type TEXT PRIMARY KEY,
+                    next_start INTEGER NOT NULL,
+                    done INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fetched_items (
+                    item_type TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    item TEXT NOT NULL,
+                    PRIMARY KEY (item_type, position)
+                );
+                CREATE TABLE IF NOT EXISTS pending_items (
+                    position INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    item TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS pending_items_key ON pending_items (key);
+                """
+            )
+
+    def begin(self, signature: str, library_version: int) -> bool:
+        """Start a sync, or resume the one recorded in the checkpoint.
+
+        A checkpoint of another sync is discarded. Fetched pages are discarded as
+        well if the library changed since they were fetched, because offsets into
+        the item listing are then no longer valid. Formatted items that are
+        waiting for upload are kept either way.
+
+        Args:
+            signature: Description of the sync, e.g. from `sync_signature`.
+            library_version: Current version of the Zotero library.
+
+        Returns:
+            True if progress of an earlier run is resumed, False if the sync starts
+            from scratch.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT signature, library_version, stage FROM sync WHERE id = 0"
+            ).fetchone()
+            if row is not None and row[0] == signature:
+                _, saved_version, stage = row
+                if stage == UPLOADING or saved_version == library_version:
+                    return True
+            self._reset()
+            self._conn.execute(
+                "INSERT INTO sync (id, signature, library_version, stage) VALUES (0, ?, ?, ?)",
+                (signature, library_version, FETCHING),
+            )
+            return False
+
+    @property
+    def stage(self) -> str | None:
+        """Stage of the recorded sync (`FETCHING` or `UPLOADING`), None if there is none."""
+        with self._lock:
+            row = self._conn.execute("SELECT stage FROM sync WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    @property
+    def library_version(self) -> int | None:
+        """Zotero library version the recorded sync started at, None if there is none."""
+        with self._lock:
+            row = self._conn.execute("SELECT library_version FROM sync WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    def fetch_progress(self, item_type: str) -> tuple[list[dict], int | None]:
+        """Return the items of a type fetched so far and the offset to continue from.
+
+        Args:
+            item_type: Zotero item type, e.g. "annotation".
+
+        Returns:
+            The fetched raw items in listing order, and the `start` offset of the
+            next page to fetch (0 if nothing was fetched yet), or None if all items
+            of the type were fetched.
+        """
+        with self._lock:
+            progress = self._conn.execute(
+                "SELECT next_start, done FROM fetch_progress WHERE item_type = ?", (item_type,)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT item FROM fetched_items WHERE item_type = ? ORDER BY position",
+                (item_type,),
+            ).fetchall()
+        items = [json.loads(item) for (item,) in rows]
+        if progress is None:
+            return items, 0
+        next_start, done = progress
+        return items, None if done else next_start
+
+    def save_page(self, item_type: str, start: int, page: list[dict]) -> None:
+        """Record a fetched page and advance the offset past it, atomically.
+
+        Args:
+            item_type: Zotero item type of the page.
+            start: Offset of the page in the item listing.
+            page: Raw Zotero items of the page.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fetched_items (item_type, position, item) VALUES (?, ?, ?)",
+                ((item_type, start + i, json.dumps(item)) for i, item in enumerate(page)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetch_progress (item_type, next_start, done) "
+                "VALUES (?, ?, 0)",
+                (item_type, start + len(page)),
+            )
+
+    def finish_fetch(self, item_type: str) -> None:
+        """Mark all items of a type as fetched."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO fetch_progress (item_type, next_start, done) VALUES (?, 0, 1) "
+                "ON CONFLICT (item_type) DO UPDATE SET done = 1",
+                (item_type,),
+            )
+
+    def save_formatted(self, items: Iterable[ZoteroItem]) -> None:
+        """Record the formatted items to upload and drop the fetched pages, atomically.
+
+        Moves the checkpoint to the `UPLOADING` stage.
+
+        Args:
+            items: Formatted Zotero items, in upload order.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_items")
+            self._conn.executemany(
+                "INSERT INTO pending_items (position, key, item) VALUES (?, ?, ?)",
+                (
+                    (position, item.key, json.dumps(asdict(item)))
+                    for position, item in enumerate(items)
+                ),
+            )
+            self._conn.execute("DELETE FROM fetched_items")
+            self._conn.execute("DELETE FROM fetch_progress")
+            self._conn.execute("UPDATE sync SET stage = ? WHERE id = 0", (UPLOADING,))
+
+    def pending_items(self) -> list[ZoteroItem]:
+        """Return the formatted items not yet acknowledged by Readwise, in upload order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT item FROM pending_items ORDER BY position").fetchall()
+        return [_restore_item(json.loads(item)) for (item,) in rows]
+
+    def acknowledge(self, keys: Iterable[str]) -> None:
+        """Remove the items with the given keys from the pending items.
+
+        Args:
+            keys: Zotero keys of items whose highlights Readwise accepted.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM pending_items WHERE key = ?", ((key,) for key in keys)
+            )
+
+    def clear(self) -> None:
+        """Forget the recorded sync, e.g. once it completed."""
+        with self._lock, self._conn:
+            self._reset()
+
+    def _reset(self) -> None:
+        for table in ("sync", "fetch_progress", "fetched_items", "pending_items"):
+            self._conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_items").fetchone()[0]
+
+
+def sync_signature(**settings) -> str:
+    """Describe a sync by the settings that determine which items it uploads.
+
+    Args:
+        **settings: JSON-serializable settings, e.g. library ID, `since` and filters.
+
+    Returns:
+        A canonical JSON string of the settings.
+    """
+    return json.dumps(settings, sort_keys=True, default=list)
+
+
+def _restore_item(data: dict) -> ZoteroItem:
+    """Rebuild a formatted `ZoteroItem` from `asdict` output without re-normalizing it."""
+    item = ZoteroItem(**{name: data[name] for name in _REQUIRED_FIELDS})
+    for f in fields(ZoteroItem):
+        if f.name not in _REQUIRED_FIELDS:
+            setattr(item, f.name, data.get(f.name))
+    return item
@@ -0,0 +1,276 @@
+"""Columnar, array-backed storage of formatted Zotero items.
+
+A sync that formats a whole library at once holds one `ZoteroItem` object per
+annotation, each with its own strings, until the upload finishes. For libraries
+with hundreds of thousands of annotations, `AnnotationStore` keeps the same
+data in a handful of compact columns instead:
+
+* strings (key, text, comment, dates, URLs, sort index) as UTF-8 bytes in one
+  buffer per column, with an array of end offsets;
+* the version as a 64-bit integer array;
+* the parent document as an index into a table of documents, whose fields
+  (title, authors, tags, URLs) are stored once;
+* repeated values (item and annotation type, color, page label, tags) as small
+  integer codes into a table of distinct values.
+
+`ZoteroItem`s are materialized one at a time when the store is read, e.g. by
+`Readwise.post_zotero_annotations_to_readwise`, so only the items of the chunk
+being uploaded exist as objects at any time.
+
+Classes:
+    AnnotationStore: Columnar store of formatted Zotero items.
+"""
+
+from array import array
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from typing import Any, overload
+
+from zotero2readwise.zotero import ZoteroItem
+
+# Fields of the parent document, stored once per document
+_DOCUMENT_FIELDS = (
+    "title",
+    "document_tags",
+    "document_type",
+    "creators",
+    "source_url",
+    "attachment_url",
+)
+
+# Fields stored as UTF-8 text
+_STRING_FIELDS = ("key", "text", "annotated_at", "annotation_url", "comment", "sort_index")
+
+# Fields stored as codes into a table of their distinct values
+_CODED_FIELDS = ("item_type", "annotation_type", "color", "page_label")
+
+
+class _StringColumn:
+    """Strings (or None) stored as UTF-8 in one buffer with an array of end offsets."""
+
+    __slots__ = ("_buffer", "_ends", "_nulls")
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._ends = array("Q")
+        self._nulls = bytearray()
+
+    def append(self, value: str | None) -> None:
+        if value is not None:
+            self._buffer += value.encode("utf-8", "surrogatepass")
+        self._ends.append(len(self._buffer))
+        self._nulls.append(value is None)
+
+    def __getitem__(self, row: int) -> str | None:
+        if self._nulls[row]:
+            return None
+        start = self._ends[row - 1] if row else 0
+        return self._buffer[start : self._ends[row]].decode("utf-8", "surrogatepass")
+
+
+class _CodedColumn:
+    """Repeated values stored as integer codes into a table of distinct values."""
+
+    __slots__ = ("_codes", "_values", "_index")
+
+    def __init__(self):
+        self._codes = array("l")
+        self._values: list[Hashable] = []
+        self._index: dict[Hashable, int] = {}
+
+    def code(self, value: Hashable) -> int:
+        """Return the code of a value, adding it to the table if it is new."""
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def append(self, value: Hashable) -> None:
+        self._codes.append(self.code(value))
+
+    def __getitem__(self, row: int) -> Any:
+        return self._values[self._codes[row]]
+
+
+class _TagColumn:
+    """Per-row tag lists (or None) stored as codes of distinct tags with end offsets."""
+
+    __slots__ = ("_tags", "_ends", "_nulls")
+
+    def __init__(self):
+        self._tags = _CodedColumn()
+        self._ends = array("Q")
+        self._nulls = bytearray()
+
+    def append(self, tags: list[str] | None) -> None:
+        for tag in tags or ():
+            self._tags.append(tag)
+        self._ends.append(len(self._tags._codes))
+        self._nulls.append(tags is None)
+
+    def __getitem__(self, row: int) -> list[str] | None:
+        if self._nulls[row]:
+            return None
+        start = self._ends[row - 1] if row else 0
+        return [self._tags[i] for i in range(start, self._ends[row])]
+
+
+class _Row:
+    """Read-only view of one row, reading fields from the columns on access."""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "AnnotationStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getattr__(self, name: str) -> Any:
+        return self._store._field(name, self._row)
+
+
+class AnnotationStore(Sequence[ZoteroItem]):
+    """Columnar store of formatted Zotero items.
+
+    Items are appended as `ZoteroItem`s (e.g. by
+    `ZoteroAnnotationsNotes.format_items`) and read back as equal `ZoteroItem`s,
+    created on access. Items of the same document share its field values, as
+    formatted items do (see `ZoteroAnnotationsNotes.format_item`).
+
+    Example:
+        >>> store = AnnotationStore()
+        >>> zotero.format_items(raw_items, into=store)
+        >>> readwise.post_zotero_annotations_to_readwise(store)
+    """
+
+    def __init__(self, items: Iterable[ZoteroItem] = ()):
+        """Create a store, optionally filled with `items`.
+
+        Args:
+            items: Formatted Zotero items to append.
+        """
+        self._strings = {name: _StringColumn() for name in _STRING_FIELDS}
+        self._coded = {name: _CodedColumn() for name in _CODED_FIELDS}
+        self._versions = array("q")
+        self._documents = _CodedColumn()
+        self._tags = _TagColumn()
+        self._relations: dict[int, Any] = {}
+        self._document_fields: dict[int, dict[str, Any]] = {}
+        self._order: array | None = None
+        self.extend(items)
+
+    def append(self, item: ZoteroItem) -> None:
+        """Store a formatted Zotero item at the end of the store."""
+        row = len(self._versions)
+        for name, column in self._strings.items():
+            column.append(getattr(item, name))
+        for name, column in self._coded.items():
+            column.append(getattr(item, name))
+        self._versions.append(item.version)
+        self._documents.append(self._document_key(item))
+        self._tags.append(item.tags)
+        if item.relations is not None:
+            self._relations[row] = item.relations
+        if self._order is not None:
+            self._order.append(row)
+
+    def extend(self, items: Iterable[ZoteroItem]) -> None:
+        """Store formatted Zotero items at the end of the store."""
+        for item in items:
+            self.append(item)
+
+    def _document_key(self, item: ZoteroItem) -> tuple:
+        """Return the hashable document fields of an item, shared with earlier items."""
+        tags = item.document_tags
+        return (
+            item.title,
+            tuple(tags) if isinstance(tags, list) else tags,
+            item.document_type,
+            item.creators,
+            item.source_url,
+            item.attachment_url,
+        )
+
+    def sort(self, key: Callable[[Any], Any]) -> None:
+        """Reorder the items by `key`, like `list.sort` (stable).
+
+        `key` is called with a read-only view of each item that has the
+        attributes of `ZoteroItem` but only reads the fields `key` uses.
+        """
+        rows = self._order if self._order is not None else range(len(self._versions))
+        self._order = array("l", sorted(rows, key=lambda row: key(_Row(self, row))))
+
+    def _field(self, name: str, row: int) -> Any:
+        """Read one field of a row (in storage order)."""
+        if name in self._strings:
+            return self._strings[name][row]
+        if name in self._coded:
+            return self._coded[name][row]
+        if name == "version":
+            return self._versions[row]
+        if name == "tags":
+            return self._tags[row]
+        if name == "relations":
+            return self._relations.get(row)
+        if name in _DOCUMENT_FIELDS:
+            return self._document(row)[name]
+        raise AttributeError(name)
+
+    def _document(self, row: int) -> dict[str, Any]:
+        """Return the fields of a row's document, converted once per document."""
+        code = self._documents._codes[row]
+        document = self._document_fields.get(code)
+        if document is None:
+            document = dict(zip(_DOCUMENT_FIELDS, self._documents._values[code], strict=True))
+            if isinstance(document["document_tags"], tuple):
+                document["document_tags"] = list(document["document_tags"])
+            self._document_fields[code] = document
+        return document
+
+    def _materialize(self, row: int) -> ZoteroItem:
+        strings = {name: column[row] for name, column in self._strings.items()}
+        item = ZoteroItem(
+            key=strings["key"],
+            version=self._versions[row],
+            item_type=self._coded["item_type"][row],
+            text=strings["text"],
+            annotated_at=strings["annotated_at"],
+            annotation_url=strings["annotation_url"],
+        )
+        item.comment = strings["comment"]
+        item.sort_index = strings["sort_index"]
+        item.annotation_type = self._coded["annotation_type"][row]
+        item.color = self._coded["color"][row]
+        item.page_label = self._coded["page_label"][row]
+        item.tags = self._tags[row]
+        item.relations = self._relations.get(row)
+        # Set directly, as the stored values are already formatted
+        for name, value in self._document(row).items():
+            setattr(item, name, value)
+        return item
+
+    def _row(self, index: int) -> int:
+        return self._order[index] if self._order is not None else index
+
+    @overload
+    def __getitem__(self, index: int) -> ZoteroItem: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ZoteroItem]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("AnnotationStore index out of range")
+        return self._materialize(self._row(index))
+
+    def __iter__(self) -> Iterator[ZoteroItem]:
+        rows = self._order if self._order is not None else range(len(self._versions))
+        for row in rows:
+            yield self._materialize(row)
+
+    def __len__(self) -> int:
+        return len(self._versions)
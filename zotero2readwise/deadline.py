@@ -0,0 +1,56 @@
+"""Run-wide deadline for a synchronization.
+
+A `Deadline` is attached to the `RetryPolicy` shared by all Readwise and Zotero
+requests of a run, which checks it before every request and every retry delay.
+Together with the per-request connect/read timeouts (see `HTTPSessions`), a run
+ends at most one request timeout after its deadline instead of hanging.
+
+Classes:
+    Deadline: Point in time by which a run must stop making requests.
+"""
+
+import time
+from dataclasses import dataclass
+
+from zotero2readwise.exception import DeadlineExceeded
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Point in time by which a run must stop making requests.
+
+    Attributes:
+        expires_at: Expiry time on the `time.monotonic()` clock.
+
+    Example:
+        >>> deadline = Deadline.after(15 * 60)
+        >>> deadline.check("uploading to Readwise")
+    """
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Create a deadline `seconds` from now."""
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Return the number of seconds left, 0 if the deadline has passed."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return time.monotonic() >= self.expires_at
+
+    def check(self, action: str = "sending a request") -> None:
+        """Raise `DeadlineExceeded` if the deadline has passed.
+
+        Args:
+            action: What was about to be done, for the error message.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"The run deadline was reached before {action}.")
@@ -28,3 +28,14 @@ class Zotero2ReadwiseError(Exception):
         self.message = message
 
         super().__init__(self.message)
+
+
+class DeadlineExceeded(Zotero2ReadwiseError):
+    """Raised when a run reaches its deadline before it finished.
+
+    Requests are no longer sent once the deadline has passed; work that was
+    acknowledged before (e.g. upload chunks recorded in the upload ledger) is kept.
+
+    Example:
+        >>> raise DeadlineExceeded("The run deadline was reached before uploading.")
+    """
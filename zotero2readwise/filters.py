@@ -0,0 +1,256 @@
+"""Filter expressions selecting the Zotero annotations and notes to sync.
+
+A filter expression combines criteria on raw Zotero items with `and`, `or`,
+`not` and parentheses, e.g.:
+
+    color:yellow,red and (tag:important or not tag:"to read") and after:2024-01-01
+
+Criteria:
+
+* `color:` highlight colors, as hex codes or names (yellow, red, green, blue,
+  purple, magenta, orange, gray);
+* `tag:` tags of the annotation or note;
+* `type:` Zotero item types (annotation, note);
+* `doctype:` item types of the parent document (book, journalArticle, ...);
+* `after:` / `before:` modification date, on or after / strictly before an ISO
+  date or date-time.
+
+A criterion with several comma-separated values matches any of them; values
+containing spaces, commas or parentheses are quoted. `not` binds tightest, then
+`and`, then `or`; keywords are case-insensitive.
+
+An expression is compiled once into a predicate: values become frozensets
+(membership tests are constant-time) and the expression a tree of closures that
+evaluates operands lazily, so the parent document metadata `doctype:` needs is
+only looked up for items that reach that criterion.
+
+Functions:
+    compile_filter: Compile filter criteria into a predicate on raw Zotero items.
+"""
+
+import re
+from collections.abc import Callable, Iterable, Sequence
+from datetime import datetime, timedelta
+
+Predicate = Callable[[dict], bool]
+
+# Zotero's highlight colors, by the names used in its color picker
+COLOR_NAMES = {
+    "yellow": "#ffd400",
+    "red": "#ff6666",
+    "green": "#5fb236",
+    "blue": "#2ea8e5",
+    "purple": "#a28ae5",
+    "magenta": "#e56eee",
+    "orange": "#f19837",
+    "gray": "#aaaaaa",
+}
+
+_KEYWORDS = ("and", "or", "not")
+
+# One token: a parenthesis, a `field:value[,value...]` criterion or a bare word
+_VALUE = r'(?:"[^"]*"|[^\s(),"]+)'
+_TOKEN = re.compile(
+    rf"\s*(?:(?P<paren>[()])|(?P<field>\w+):(?P<values>{_VALUE}(?:,{_VALUE})*)|(?P<word>[^\s()]+))"
+)
+_VALUE_PART = re.compile(r'"([^"]*)"|([^\s(),"]+)')
+
+
+def compile_filter(
+    expression: str | None = None,
+    colors: Iterable[str] = (),
+    tags: Iterable[str] = (),
+    document_metadata: Callable[[dict], dict] | None = None,
+) -> Predicate | None:
+    """Compile filter criteria into a predicate on raw Zotero items.
+
+    `colors` and `tags` are the simple filters of `ZoteroAnnotationsNotes`; all
+    given criteria must match.
+
+    Args:
+        expression: Optional filter expression (see the module documentation).
+        colors: Only match annotations with any of these highlight colors.
+        tags: Only match items with any of these tags.
+        document_metadata: Function returning the metadata of an item's parent
+            document (see `ZoteroAnnotationsNotes.get_item_metadata`), required
+            by `doctype:` criteria.
+
+    Returns:
+        A function telling whether a raw Zotero item matches, or None if there
+        are no criteria (every item matches).
+
+    Raises:
+        ValueError: If the expression is malformed or uses an unknown criterion.
+
+    Example:
+        >>> matches = compile_filter("color:yellow and not tag:skip")
+        >>> matches({"data": {"annotationColor": "#ffd400", "tags": []}})
+        True
+    """
+    predicates = []
+    colors = tuple(colors)
+    if colors:
+        predicates.append(_criterion("color", colors, document_metadata))
+    tags = tuple(tags)
+    if tags:
+        predicates.append(_criterion("tag", tags, document_metadata))
+    if expression is not None and expression.strip():
+        predicates.append(_Parser(expression, document_metadata).parse())
+    if not predicates:
+        return None
+    return predicates[0] if len(predicates) == 1 else _all_of(predicates)
+
+
+class _Parser:
+    """Recursive-descent parser building the predicate of a filter expression."""
+
+    def __init__(self, expression: str, document_metadata: Callable[[dict], dict] | None):
+        self.expression = expression
+        self.document_metadata = document_metadata
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+
+    @staticmethod
+    def _tokenize(expression: str) -> list[re.Match]:
+        tokens = []
+        end = len(expression.rstrip())
+        position = 0
+        while position < end:
+            match = _TOKEN.match(expression, position)
+            tokens.append(match)
+            position = match.end()
+        return tokens
+
+    def parse(self) -> Predicate:
+        predicate = self._or()
+        if self.position < len(self.tokens):
+            raise self._error("expected 'and', 'or' or the end of the expression")
+        return predicate
+
+    def _peek_keyword(self) -> str | None:
+        if self.position < len(self.tokens):
+            word = self.tokens[self.position]["word"]
+            if word is not None and word.lower() in _KEYWORDS:
+                return word.lower()
+        return None
+
+    def _or(self) -> Predicate:
+        operands = [self._and()]
+        while self._peek_keyword() == "or":
+            self.position += 1
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else _any_of(operands)
+
+    def _and(self) -> Predicate:
+        operands = [self._not()]
+        while self._peek_keyword() == "and":
+            self.position += 1
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else _all_of(operands)
+
+    def _not(self) -> Predicate:
+        if self._peek_keyword() == "not":
+            self.position += 1
+            operand = self._not()
+            return lambda annot: not operand(annot)
+        return self._operand()
+
+    def _operand(self) -> Predicate:
+        if self.position >= len(self.tokens):
+            raise self._error("unexpected end of the expression")
+        token = self.tokens[self.position]
+        if token["paren"] == "(":
+            self.position += 1
+            predicate = self._or()
+            if self.position >= len(self.tokens) or self.tokens[self.position]["paren"] != ")":
+                raise self._error("expected ')'")
+            self.position += 1
+            return predicate
+        if token["field"] is None:
+            raise self._error("expected a criterion such as 'tag:important', 'not' or '('")
+        self.position += 1
+        values = [quoted or bare for quoted, bare in _VALUE_PART.findall(token["values"])]
+        try:
+            return _criterion(token["field"].lower(), values, self.document_metadata)
+        except ValueError as e:
+            self.position -= 1
+            raise self._error(str(e)) from None
+
+    def _error(self, message: str) -> ValueError:
+        """Describe a syntax error at the current token."""
+        if self.position < len(self.tokens):
+            where = f"at {self.tokens[self.position].group().strip()!r}"
+        else:
+            where = "at the end"
+        return ValueError(f"Invalid filter expression {self.expression!r} {where}: {message}")
+
+
+def _criterion(
+    field: str, values: Sequence[str], document_metadata: Callable[[dict], dict] | None
+) -> Predicate:
+    """Build the predicate of one `field:values` criterion."""
+    if field == "color":
+        colors = frozenset(COLOR_NAMES.get(value.lower(), value.lower()) for value in values)
+        # Notes have no color, so they never match a color criterion
+        return lambda annot: annot["data"].get("annotationColor") in colors
+    if field == "tag":
+        tags = frozenset(values)
+
+        def has_tag(annot: dict) -> bool:
+            for tag in annot["data"]["tags"]:
+                if tag["tag"] in tags:
+                    return True
+            return False
+
+        return has_tag
+    if field == "type":
+        item_types = frozenset(values)
+        return lambda annot: annot["data"]["itemType"] in item_types
+    if field == "doctype":
+        if document_metadata is None:
+            raise ValueError("'doctype:' needs the metadata of parent documents")
+        document_types = frozenset(values)
+        return lambda annot: document_metadata(annot)["document_type"] in document_types
+    if field in ("after", "before"):
+        if len(values) != 1:
+            raise ValueError(f"'{field}:' takes a single date")
+        bound = _iso_date(values[0])
+        if field == "after":
+            return lambda annot: annot["data"]["dateModified"] >= bound
+        return lambda annot: annot["data"]["dateModified"] < bound
+    raise ValueError(
+        f"unknown criterion '{field}:' (use color, tag, type, doctype, after or before)"
+    )
+
+
+def _iso_date(value: str) -> str:
+    """Validate an ISO date or UTC date-time, returned as comparable with Zotero dates."""
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{value!r} is not an ISO date such as 2024-01-31") from None
+    if date.utcoffset() not in (None, timedelta(0)):
+        raise ValueError(f"{value!r} is not in UTC, as Zotero dates are")
+    if date.microsecond:
+        # Zotero dates have whole seconds: on or after (or strictly before) a fraction
+        # of a second is the same as on or after (strictly before) the next second
+        date = date.replace(microsecond=0) + timedelta(seconds=1)
+    # Zotero dates are UTC date-times like "2024-01-31T12:00:00Z", which sort as strings
+    return date.replace(tzinfo=None).isoformat(timespec="seconds") + "Z"
+
+
+def _all_of(predicates: Sequence[Predicate]) -> Predicate:
+    # Nested two-operand closures call fewer functions per item than all() over a generator
+    first, *rest = predicates
+    if not rest:
+        return first
+    second = _all_of(rest)
+    return lambda annot: first(annot) and second(annot)
+
+
+def _any_of(predicates: Sequence[Predicate]) -> Predicate:
+    first, *rest = predicates
+    if not rest:
+        return first
+    second = _any_of(rest)
+    return lambda annot: first(annot) or second(annot)
@@ -53,5 +53,14 @@ def write_library_version(zotero_client: Zotero) -> None:
     Args:
         zotero_client: A Pyzotero Zotero client instance.
     """
+    save_library_version(zotero_client.last_modified_version())
+
+
+def save_library_version(version: int) -> None:
+    """Write the given library version to the 'since' file.
+
+    Args:
+        version: Zotero library version the next incremental sync starts from.
+    """
     with open("since", "w", encoding="utf-8") as file:
-        file.write(str(zotero_client.last_modified_version()))
+        file.write(str(version))
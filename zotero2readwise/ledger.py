@@ -0,0 +1,142 @@
+"""Persistent ledger of highlights already uploaded to Readwise.
+
+This module provides a single-file SQLite store mapping each Zotero annotation
+or note key to a fingerprint of the Readwise highlight last uploaded for it, so
+that repeated runs only post highlights that are new or changed, and to the
+Readwise highlight ID, so that items deleted in Zotero can be deleted in Readwise.
+
+Classes:
+    UploadLedger: SQLite-backed ledger of uploaded highlight fingerprints.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+
+class UploadLedger:
+    """SQLite-backed ledger of uploaded highlights keyed by Zotero item key.
+
+    The fingerprint of a highlight is a hash of its Readwise API payload, so any
+    change that would alter the uploaded highlight (text, comment, tags, custom
+    tag, title, ...) makes it eligible for upload again. Entries are only recorded
+    after Readwise accepted the request containing the highlight, together with
+    the Readwise highlight ID when it is known.
+
+    Attributes:
+        path: Location of the SQLite database file.
+
+    Example:
+        >>> ledger = UploadLedger("readwise_uploads.sqlite")
+        >>> fingerprint = UploadLedger.fingerprint({"text": "Sample highlight"})
+        >>> ledger.is_uploaded("ABC123", fingerprint)
+        False
+    """
+
+    def __init__(self, path: str | Path):
+        """Open (or create) the ledger database.
+
+        Args:
+            path: Location of the SQLite database file.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS uploads (
+                    key TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    uploaded_at REAL NOT NULL,
+                    highlight_id INTEGER
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(uploads)")}
+            if "highlight_id" not in columns:
+                # Ledgers created before highlight IDs were recorded
+                self._conn.execute("ALTER TABLE uploads ADD COLUMN highlight_id INTEGER")
+
+    @staticmethod
+    def fingerprint(highlight: dict) -> str:
+        """Return a stable content fingerprint of a Readwise highlight payload."""
+        payload = json.dumps(highlight, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the fingerprint last uploaded for a Zotero item, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM uploads WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_uploaded(self, key: str, fingerprint: str) -> bool:
+        """Whether a highlight with this fingerprint was already uploaded for the key."""
+        return self.get(key) == fingerprint
+
+    def record(
+        self,
+        entries: Iterable[tuple[str, str]],
+        highlight_ids: Iterable[int | None] | None = None,
+    ) -> None:
+        """Record (Zotero item key, fingerprint) pairs of successfully uploaded highlights.
+
+        Args:
+            entries: (Zotero item key, fingerprint) pairs.
+            highlight_ids: Optional Readwise highlight IDs, one per entry. An unknown
+                (None) ID keeps the ID previously recorded for the key.
+        """
+        entries = list(entries)
+        ids = list(highlight_ids) if highlight_ids is not None else [None] * len(entries)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO uploads (key, fingerprint, uploaded_at, highlight_id)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    uploaded_at = excluded.uploaded_at,
+                    highlight_id = COALESCE(excluded.highlight_id, uploads.highlight_id)
+                """,
+                (
+                    (key, fingerprint, now, highlight_id)
+                    for (key, fingerprint), highlight_id in zip(entries, ids, strict=True)
+                ),
+            )
+
+    def highlight_ids(self, keys: Iterable[str]) -> dict[str, int]:
+        """Return the known Readwise highlight IDs of the given Zotero item keys."""
+        keys = list(keys)
+        found: dict[str, int] = {}
+        with self._lock:
+            # Stay below SQLite's limit on the number of query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                found.update(
+                    self._conn.execute(
+                        f"SELECT key, highlight_id FROM uploads WHERE highlight_id IS NOT NULL "
+                        f"AND key IN ({', '.join('?' * len(batch))})",
+                        batch,
+                    ).fetchall()
+                )
+        return found
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Forget the given Zotero item keys, e.g. after their highlights were deleted."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM uploads WHERE key = ?", ((key,) for key in keys))
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
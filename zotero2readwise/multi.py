@@ -0,0 +1,305 @@
+"""Synchronization of several Zotero libraries in one process.
+
+A Zotero API key usually gives access to the user's own library and to the
+group libraries the user is a member of. `MultiLibrarySync` syncs any number of
+them concurrently, one `Zotero2Readwise` per library, sharing:
+
+* one pool of keep-alive HTTP connections (`HTTPSessions`);
+* one `FairScheduler`, which admits a bounded number of requests at a time in
+  round-robin order between libraries, so a large group with many pages to
+  fetch cannot starve the others, and which holds `Retry-After`/`Backoff`
+  pauses for all libraries, since rate limits apply to the API key.
+
+Each library keeps its own synced versions and runs in the `SyncState` store
+and its own metadata cache, upload ledger and checkpoint files.
+
+Classes:
+    Library: A Zotero user or group library.
+    LibrarySyncResult: Outcome of the sync of one library.
+    MultiLibrarySync: Concurrent synchronization of several libraries.
+
+Functions:
+    discover_group_libraries: List the group libraries the API key can access.
+"""
+
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pyzotero.zotero import Zotero
+
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
+from zotero2readwise.retry import RetryPolicy
+from zotero2readwise.scheduler import FairScheduler
+from zotero2readwise.session import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    HTTPSessions,
+)
+from zotero2readwise.state import SyncState, library_key
+from zotero2readwise.zotero import is_library_modified
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+# Zotero2Readwise options that are set per library or not supported here
+_PER_LIBRARY_OPTIONS = frozenset(
+    {
+        "zotero_library_id",
+        "zotero_library_type",
+        "since",
+        "zotero_sqlite_path",
+        "zotero_local_api_url",
+        "retry_policy",
+        "sessions",
+    }
+)
+
+
+@dataclass(frozen=True)
+class Library:
+    """A Zotero user or group library.
+
+    Attributes:
+        library_type: "user" or "group".
+        library_id: The user or group ID.
+        name: Optional display name, e.g. the group name. Not compared, so a
+            library listed by ID and discovered by name is the same library.
+    """
+
+    library_type: str
+    library_id: str
+    name: str | None = field(default=None, compare=False)
+
+    @property
+    def key(self) -> str:
+        """Library key used in the state store, e.g. "groups/12345"."""
+        return library_key(self.library_type, self.library_id)
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.name})" if self.name else self.key
+
+
+@dataclass
+class LibrarySyncResult:
+    """Outcome of the sync of one library.
+
+    Attributes:
+        library: The synced library.
+        library_version: Library version the sync started at, None if it did not
+            get that far or the library was skipped.
+        skipped: Whether the library was unchanged since its last sync.
+        error: The exception that stopped the sync, None if it completed.
+    """
+
+    library: Library
+    library_version: int | None = None
+    skipped: bool = False
+    error: Exception | None = None
+
+
+def discover_group_libraries(
+    zotero_client: Zotero, retry_policy: RetryPolicy | None = None
+) -> list[Library]:
+    """List the group libraries of the user a Zotero API key belongs to.
+
+    Args:
+        zotero_client: Pyzotero client of the user's own library.
+        retry_policy: Optional retry policy for rate-limited or transient failures.
+
+    Returns:
+        The user's group libraries, with their names.
+    """
+    retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+    groups = retry_policy.call_zotero(
+        zotero_client, lambda: zotero_client.everything(zotero_client.groups())
+    )
+    return [Library("group", str(group["id"]), group["data"].get("name")) for group in groups]
+
+
+class MultiLibrarySync:
+    """Concurrent synchronization of several Zotero libraries to one Readwise account.
+
+    Up to `max_concurrent_libraries` libraries are synced at once. All requests
+    go through one connection pool and one `FairScheduler` admitting as many
+    requests at a time as the pool has connections. With a `state` store, every
+    library is synced incrementally from its own versions, skipped if unchanged,
+    and its run is recorded. A library that fails does not stop the others.
+
+    File options (`metadata_cache_path`, `upload_ledger_path`, `checkpoint_path`)
+    name one file per library: "uploads.sqlite" becomes e.g.
+    "uploads.users-12345.sqlite" and "uploads.groups-678.sqlite".
+
+    Attributes:
+        libraries: The libraries to sync.
+        max_concurrent_libraries: Maximum number of libraries synced at once.
+        state: Optional store of synced versions and runs.
+        sessions: HTTP sessions shared by all libraries.
+        scheduler: Request scheduler shared by all libraries.
+        syncs: The synchronizer of each library, by library key.
+
+    Example:
+        >>> libraries = [Library("user", "12345"), *discover_group_libraries(zot)]
+        >>> multi = MultiLibrarySync(libraries, readwise_token, zotero_key, state=state)
+        >>> results = multi.run()
+    """
+
+    def __init__(
+        self,
+        libraries: Sequence[Library],
+        readwise_token: str,
+        zotero_key: str,
+        max_concurrent_libraries: int = 4,
+        state: SyncState | None = None,
+        max_retries: int = 5,
+        http_pool_size: int | None = None,
+        http_keepalive: float = DEFAULT_KEEPALIVE_EXPIRY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        **sync_options,
+    ):
+        """Initialize the synchronizers of all libraries.
+
+        Args:
+            libraries: The libraries to sync; duplicates are synced once.
+            readwise_token: Readwise API access token.
+            zotero_key: Zotero API key with access to all libraries.
+            max_concurrent_libraries: Maximum number of libraries synced at once.
+            state: Optional store of synced versions and runs. Without it, every
+                library is synced in full.
+            max_retries: Maximum number of retries of a failing request.
+            http_pool_size: Maximum number of connections kept open per host, which
+                is also the number of requests in flight at once. Defaults to enough
+                connections for the workers of all concurrently synced libraries.
+            http_keepalive: Seconds an idle Zotero connection is kept open.
+            connect_timeout: Seconds to wait for a connection to Readwise or Zotero.
+            read_timeout: Seconds to wait for data from Readwise or Zotero.
+            **sync_options: Other `Zotero2Readwise` options, applied to every library.
+
+        Raises:
+            ValueError: If no library is given, or `sync_options` contain options
+                that are set per library or need a single library (`since`,
+                `zotero_sqlite_path`, `zotero_local_api_url`, ...).
+        """
+        if not libraries:
+            raise ValueError("No Zotero library to sync")
+        unsupported = _PER_LIBRARY_OPTIONS.intersection(sync_options)
+        if unsupported:
+            raise ValueError(f"Options not supported for several libraries: {sorted(unsupported)}")
+
+        self.libraries = list(dict.fromkeys(libraries))
+        self.max_concurrent_libraries = max(1, min(max_concurrent_libraries, len(self.libraries)))
+        self.state = state
+        if http_pool_size is None:
+            workers = max(
+                sync_options.get("fetch_workers") or 1,
+                sync_options.get("readwise_upload_workers", 1),
+            )
+            http_pool_size = max(DEFAULT_POOL_SIZE, self.max_concurrent_libraries * workers)
+        self.sessions = HTTPSessions(
+            pool_size=http_pool_size,
+            keepalive_expiry=http_keepalive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.scheduler = FairScheduler(max_in_flight=self.sessions.pool_size)
+        self._item_types = [
+            item_type
+            for item_type, included in (
+                ("annotation", sync_options.get("include_annotations", True)),
+                ("note", sync_options.get("include_notes", False)),
+            )
+            if included
+        ]
+
+        self.syncs: dict[str, Zotero2Readwise] = {}
+        for library in self.libraries:
+            options = dict(sync_options)
+            for path_option in ("metadata_cache_path", "upload_ledger_path", "checkpoint_path"):
+                options[path_option] = _library_path(options.get(path_option), library)
+            zt_rw = Zotero2Readwise(
+                readwise_token=readwise_token,
+                zotero_key=zotero_key,
+                zotero_library_id=library.library_id,
+                zotero_library_type=library.library_type,
+                retry_policy=RetryPolicy(
+                    max_retries=max_retries, scheduler=self.scheduler, tenant=library.key
+                ),
+                sessions=self.sessions,
+                **options,
+            )
+            zt_rw.failed_items_path = _library_path("failed_zotero_items.json", library)
+            self.syncs[library.key] = zt_rw
+
+    def run(self, deadline: Deadline | None = None) -> list[LibrarySyncResult]:
+        """Sync all libraries concurrently.
+
+        Args:
+            deadline: Optional deadline shared by all libraries.
+
+        Returns:
+            The result of each library, in the order of `libraries`.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed before all libraries were synced.
+            Zotero2ReadwiseError: If the sync of any library failed. The other
+                libraries are synced (and their versions saved) regardless.
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrent_libraries, thread_name_prefix="library"
+        ) as pool:
+            results = list(pool.map(lambda library: self._sync(library, deadline), self.libraries))
+
+        failed = [result for result in results if result.error is not None]
+        for result in failed:
+            if isinstance(result.error, DeadlineExceeded):
+                raise result.error
+        if failed:
+            summary = "; ".join(
+                f"{result.library}: {type(result.error).__name__}: {result.error}"
+                for result in failed
+            )
+            raise Zotero2ReadwiseError(
+                f"{len(failed)} of {len(results)} Zotero libraries failed to sync: {summary}"
+            )
+        return results
+
+    def _sync(self, library: Library, deadline: Deadline | None) -> LibrarySyncResult:
+        """Sync one library and record its run, returning errors instead of raising them."""
+        zt_rw = self.syncs[library.key]
+        zt_rw.retry_policy.deadline = deadline
+        run_id = None
+        try:
+            if self.state is not None:
+                zt_rw.since = self.state.versions(library.key, self._item_types)
+                since = min(zt_rw.since.values(), default=0)
+                if since and not is_library_modified(
+                    zt_rw.zotero_client,
+                    since,
+                    retry_policy=zt_rw.retry_policy,
+                    session=self.sessions.session,
+                    timeout=self.sessions.timeout,
+                ):
+                    print(f"Zotero library {library} is unchanged since version {since}.")
+                    return LibrarySyncResult(library, skipped=True)
+                run_id = self.state.start_run(library.key, self._item_types)
+            print(f"Syncing Zotero library {library}.")
+            zt_rw.run(deadline=deadline)
+        except Exception as e:
+            if run_id is not None:
+                self.state.finish_run(run_id, error=f"{type(e).__name__}: {e}")
+            print(f"Sync of Zotero library {library} failed: {type(e).__name__}: {e}")
+            return LibrarySyncResult(library, zt_rw.library_version, error=e)
+        if run_id is not None:
+            self.state.finish_run(run_id, library_version=zt_rw.library_version)
+        return LibrarySyncResult(library, zt_rw.library_version)
+
+
+def _library_path(path: str | None, library: Library) -> str | None:
+    """Name a per-library file after `path`, e.g. "uploads.sqlite" -> "uploads.users-1.sqlite"."""
+    if path is None:
+        return None
+    path = Path(path)
+    return str(path.with_name(f"{path.stem}.{library.key.replace('/', '-')}{path.suffix}"))
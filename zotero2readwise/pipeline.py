@@ -0,0 +1,152 @@
+"""Thread-based pipeline of stages connected by bounded queues.
+
+This module lets the fetch, format and upload phases of a sync overlap: each
+stage runs on its own thread, consumes its upstream stage lazily and hands its
+output downstream through a bounded queue, so memory use is bounded by the
+queue sizes and the total run time approaches that of the slowest stage.
+
+Classes:
+    Pipeline: Runs iterables on background threads behind bounded queues.
+    StageOutput: Iterator over the items produced by a pipeline stage.
+"""
+
+import threading
+from collections.abc import Iterable, Iterator
+from queue import Empty, Full, Queue
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Seconds between checks of the stop flag while blocked on a queue
+_POLL_INTERVAL = 0.1
+
+
+class _Done:
+    """Marker put on a stage's queue after its last output."""
+
+
+class _Failed:
+    """Wrapper for an exception raised by a stage, re-raised by its consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline:
+    """Runs iterables on background threads behind bounded queues.
+
+    Each call to `stage` starts a thread that iterates the given iterable and
+    puts its items on a queue holding at most `queue_size` items; the returned
+    iterator yields them in order. Stages are chained by passing the iterator of
+    one stage into the iterable of the next. An exception raised by a stage is
+    re-raised where its output is consumed. Leaving the `with` block stops all
+    stages that are still running.
+
+    Attributes:
+        queue_size: Maximum number of items buffered between two stages.
+
+    Example:
+        >>> with Pipeline(queue_size=4) as pipeline:
+        ...     pages = pipeline.stage(fetch_pages())
+        ...     formatted = pipeline.stage(format(page) for page in pages)
+        ...     upload(formatted)
+    """
+
+    def __init__(self, queue_size: int = 4):
+        """Initialize the pipeline.
+
+        Args:
+            queue_size: Maximum number of items buffered between two stages.
+        """
+        self.queue_size = max(1, queue_size)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def stage(self, iterable: Iterable[T], name: str | None = None) -> "StageOutput[T]":
+        """Start iterating `iterable` on a background thread.
+
+        Args:
+            iterable: The stage's work; typically a generator over an upstream stage.
+            name: Optional thread name, for debugging.
+
+        Returns:
+            A `StageOutput` iterator over the items produced by the stage.
+        """
+        queue: Queue = Queue(maxsize=self.queue_size)
+        thread = threading.Thread(
+            target=self._produce, args=(iterable, queue), name=name, daemon=True
+        )
+        self._threads.append(thread)
+        thread.start()
+        return StageOutput(queue, self._stop)
+
+    def _produce(self, iterable: Iterable, queue: Queue) -> None:
+        try:
+            for item in iterable:
+                if not self._put(queue, item):
+                    return
+        except BaseException as e:
+            self._put(queue, _Failed(e))
+        else:
+            self._put(queue, _Done())
+
+    def _put(self, queue: Queue, item) -> bool:
+        """Put an item on a queue, giving up if the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+
+class StageOutput(Iterator[T]):
+    """Iterator over the items produced by a pipeline stage.
+
+    Besides blocking iteration, `ready` returns the items already waiting in the
+    stage's queue, so a consumer can process a backlog in one go.
+    """
+
+    def __init__(self, queue: Queue, stop: threading.Event):
+        self._queue = queue
+        self._stop = stop
+        self._end: _Done | _Failed | None = None
+
+    def __next__(self) -> T:
+        while self._end is None:
+            try:
+                item = self._queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                if self._stop.is_set():
+                    raise StopIteration from None
+                continue
+            if isinstance(item, _Done | _Failed):
+                self._end = item
+                break
+            return item
+        if isinstance(self._end, _Failed):
+            raise self._end.error
+        raise StopIteration
+
+    def ready(self) -> list[T]:
+        """Return the items already produced and queued, without blocking."""
+        items = []
+        while self._end is None:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                break
+            if isinstance(item, _Done | _Failed):
+                self._end = item
+            else:
+                items.append(item)
+        return items
@@ -7,18 +7,26 @@ Classes:
     ReadwiseAPI: Dataclass containing Readwise API endpoint URLs.
     Category: Enum for Readwise highlight categories.
     ReadwiseHighlight: Dataclass representing a Readwise highlight.
+    UploadChunkResult: Dataclass recording the outcome of one upload request.
     Readwise: Main client class for Readwise API operations.
 """
 
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence, Sized
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from json import dump
+from json import dump, dumps
 
 import requests
 
 from zotero2readwise import FAILED_ITEMS_DIR
-from zotero2readwise.exception import Zotero2ReadwiseError
+from zotero2readwise.checkpoint import SyncCheckpoint
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
 from zotero2readwise.helper import sanitize_tag
+from zotero2readwise.ledger import UploadLedger
+from zotero2readwise.retry import RetryPolicy
+from zotero2readwise.session import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
 from zotero2readwise.zotero import ZoteroItem
 
 
@@ -53,12 +61,13 @@ class Category(Enum):
     podcasts = 4
 
 
-@dataclass
+@dataclass(slots=True)
 class ReadwiseHighlight:
     """Dataclass representing a Readwise highlight.
 
     This class maps to the Readwise API highlight format and is used
     as an intermediate representation before uploading to Readwise.
+    Fields are stored in `__slots__`, without a per-instance `__dict__`.
 
     Attributes:
         text: The highlighted text content (required).
@@ -100,51 +109,140 @@ class ReadwiseHighlight:
             Dictionary containing only attributes with truthy values,
             suitable for JSON serialization to Readwise API.
         """
-        return {k: v for k, v in self.__dict__.items() if v}
+        return {k: v for k in self.__slots__ if (v := getattr(self, k))}
+
+
+@dataclass
+class UploadChunkResult:
+    """Dataclass recording the outcome of uploading one chunk of highlights.
+
+    Attributes:
+        index: Position of the chunk within the upload (0-based).
+        n_highlights: Number of highlights in the chunk.
+        n_bytes: Size of the serialized highlights in the chunk.
+        error: Error message if the upload failed, None on success.
+        error_type: Name of the exception that failed the upload.
+        highlight_ids: Readwise IDs of the chunk's highlights, in chunk order (None
+            where Readwise's response did not identify a highlight).
+    """
+
+    index: int
+    n_highlights: int
+    n_bytes: int
+    error: str | None = None
+    error_type: str = "Zotero2ReadwiseError"
+    highlight_ids: list[int | None] | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the chunk was uploaded successfully."""
+        return self.error is None
 
 
 class Readwise:
     """Client class for Readwise API operations.
 
     Handles authentication, formatting, and uploading of highlights
-    to the Readwise service.
+    to the Readwise service. Highlights are uploaded in chunks bounded by
+    both count and serialized size, so a single failed request only affects
+    its own chunk. Up to `upload_workers` chunks can be in flight at once.
 
     Attributes:
         endpoints: ReadwiseAPI instance with endpoint URLs.
-        failed_highlights: List of highlights that failed to upload.
+        failed_highlights: Highlights that failed to upload in the last upload.
         custom_tag: Optional custom tag to add to all highlights.
+        batch_size: Maximum number of highlights per upload request.
+        max_batch_bytes: Maximum serialized size of the highlights in one request.
+        upload_workers: Maximum number of concurrent upload requests.
+        upload_results: Outcome of each chunk of the last upload, in chunk order.
+        retry_policy: Retry policy applied to upload requests.
+        ledger: Optional ledger of highlights already uploaded, used to skip
+            unchanged highlights.
+        session: HTTP session all Readwise requests are sent with, so consecutive
+            and concurrent requests reuse its pooled keep-alive connections.
+        timeout: (connect, read) timeout in seconds of every Readwise request.
+        checkpoint: Optional sync checkpoint whose pending items are acknowledged
+            as their chunks are uploaded.
 
     Example:
         >>> rw = Readwise("your_token")
         >>> rw.create_highlights([{"text": "Sample highlight", "title": "Book"}])
     """
 
-    def __init__(self, readwise_token: str, custom_tag: str | None = None):
+    def __init__(
+        self,
+        readwise_token: str,
+        custom_tag: str | None = None,
+        batch_size: int = 500,
+        max_batch_bytes: int = 2_000_000,
+        upload_workers: int = 1,
+        retry_policy: RetryPolicy | None = None,
+        ledger: UploadLedger | None = None,
+        session: requests.Session | None = None,
+        timeout: tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        checkpoint: SyncCheckpoint | None = None,
+    ):
         """Initialize the Readwise client.
 
         Args:
             readwise_token: Readwise API access token.
             custom_tag: Optional tag to add to all uploaded highlights.
+            batch_size: Maximum number of highlights per upload request.
+            max_batch_bytes: Maximum serialized (JSON) size of the highlights in one
+                upload request. A single larger highlight is still sent on its own.
+            upload_workers: Maximum number of upload requests in flight at once.
+                With 1 (default), chunks are uploaded sequentially.
+            retry_policy: Retry policy for rate-limited (429) and transient upload
+                failures. Defaults to a new `RetryPolicy`.
+            ledger: Optional upload ledger. Highlights whose payload is unchanged
+                since their last successful upload are skipped, and the ledger is
+                updated after every successfully uploaded chunk.
+            session: Optional `requests.Session` to send requests with, e.g. the
+                `session` of `HTTPSessions`. Defaults to a new session.
+            timeout: Seconds to wait for a connection and for response data,
+                e.g. the `timeout` of `HTTPSessions`.
+            checkpoint: Optional sync checkpoint. The Zotero items of every
+                successfully uploaded chunk are removed from its pending items.
         """
         self._token = readwise_token
         self._header = {"Authorization": f"Token {self._token}"}
         self.endpoints = ReadwiseAPI
         self.failed_highlights: list = []
         self.custom_tag = custom_tag
-
-    def create_highlights(self, highlights: list[dict]) -> None:
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.upload_workers = max(1, upload_workers)
+        self.upload_results: list[UploadChunkResult] = []
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.ledger = ledger
+        self.session = session if session is not None else requests.Session()
+        self.timeout = timeout
+        self.checkpoint = checkpoint
+
+    def create_highlights(self, highlights: list[dict]) -> list[dict]:
         """Upload highlights to Readwise API.
 
         Args:
             highlights: List of highlight dictionaries to upload.
 
+        Rate-limited and transient failures are retried according to `retry_policy`;
+        Readwise deduplicates highlights, so re-sending a chunk is safe.
+
+        Returns:
+            The books Readwise reports as modified, each with the IDs of its created
+            or updated highlights (`modified_highlights`). Empty if the response
+            body is not a JSON list.
+
         Raises:
-            Zotero2ReadwiseError: If the API request fails (non-200 status).
+            Zotero2ReadwiseError: If the API request fails (non-200 status) after retries.
         """
-        resp = requests.post(
-            url=self.endpoints.highlights,
-            headers=self._header,
-            json={"highlights": highlights},
+        resp = self.retry_policy.send(
+            lambda: self.session.post(
+                url=self.endpoints.highlights,
+                headers=self._header,
+                json={"highlights": highlights},
+                timeout=self.timeout,
+            )
         )
         if resp.status_code != 200:
             error_log_file = f"error_log_{resp.status_code}_failed_post_request_to_readwise.json"
@@ -165,6 +263,238 @@ class Readwise:
                 f"POST request Status Code={resp.status_code} ({resp.reason})\n"
                 f"Error log is saved to {error_log_file} file."
             )
+        try:
+            books = resp.json()
+        except ValueError:
+            return []
+        return books if isinstance(books, list) else []
+
+    @staticmethod
+    def match_highlight_ids(highlights: list[dict], books: list[dict]) -> list[int | None]:
+        """Match the highlight IDs of a create-highlights response to the request.
+
+        Readwise groups the response by book and lists the IDs of each book's
+        highlights in request order. A book whose number of IDs differs from the
+        number of highlights sent for it (e.g. because Readwise merged duplicates)
+        is left unmatched.
+
+        Args:
+            highlights: The highlight payloads of the request, in order.
+            books: The response of `create_highlights`.
+
+        Returns:
+            One Readwise highlight ID (or None if unknown) per highlight.
+        """
+        indices_by_title: dict[str | None, list[int]] = {}
+        for i, highlight in enumerate(highlights):
+            indices_by_title.setdefault(highlight.get("title"), []).append(i)
+        ids: list[int | None] = [None] * len(highlights)
+        for book in books:
+            if not isinstance(book, dict):
+                continue
+            indices = indices_by_title.get(book.get("title"), [])
+            modified = book.get("modified_highlights") or []
+            if len(indices) == len(modified):
+                for i, highlight_id in zip(indices, modified, strict=True):
+                    ids[i] = highlight_id
+        return ids
+
+    def delete_highlights(self, zotero_keys: Iterable[str]) -> int:
+        """Delete the Readwise highlights of Zotero items that were deleted in Zotero.
+
+        Highlight IDs are looked up in the upload `ledger`; keys without a known
+        ID (never uploaded, or uploaded without a ledger) are skipped. Highlights
+        that are already gone in Readwise count as deleted. Failures (and reaching
+        the run deadline) are reported but do not raise, so they are retried by the
+        next full sync at the latest.
+
+        Args:
+            zotero_keys: Keys of the deleted Zotero annotations and notes.
+
+        Returns:
+            The number of highlights deleted from Readwise.
+        """
+        if self.ledger is None:
+            return 0
+        highlight_ids = self.ledger.highlight_ids(zotero_keys)
+        deleted = []
+        for key, highlight_id in highlight_ids.items():
+            try:
+                resp = self.retry_policy.send(
+                    lambda highlight_id=highlight_id: self.session.delete(
+                        url=f"{self.endpoints.highlights}{highlight_id}/",
+                        headers=self._header,
+                        timeout=self.timeout,
+                    )
+                )
+            except DeadlineExceeded:
+                print("Warning: The run deadline was reached; remaining deletions are skipped.")
+                break
+            except requests.RequestException as e:
+                print(f"Warning: Could not delete highlight {highlight_id} ({key}): {e}")
+                continue
+            if resp.status_code in (200, 204, 404):
+                deleted.append(key)
+            else:
+                print(
+                    f"Warning: Deleting highlight {highlight_id} ({key}) failed with "
+                    f"status code {resp.status_code}."
+                )
+        self.ledger.remove(deleted)
+        if deleted:
+            print(
+                f"{len(deleted)} highlights of items deleted in Zotero were deleted from Readwise."
+            )
+        return len(deleted)
+
+    def iter_highlight_batches(
+        self, highlights: Iterable[dict]
+    ) -> Iterator[tuple[list[dict], int]]:
+        """Split highlights into chunks bounded by `batch_size` and `max_batch_bytes`.
+
+        Args:
+            highlights: Highlight dictionaries in upload order.
+
+        Yields:
+            Tuples of (chunk of highlights, serialized size of the chunk in bytes).
+        """
+        batch: list[dict] = []
+        batch_bytes = 0
+        for highlight in highlights:
+            # requests serializes with ASCII escapes, so len() equals the byte count
+            n_bytes = len(dumps(highlight)) + 2  # separator between list elements
+            if batch and (
+                len(batch) >= self.batch_size or batch_bytes + n_bytes > self.max_batch_bytes
+            ):
+                yield batch, batch_bytes
+                batch, batch_bytes = [], 0
+            batch.append(highlight)
+            batch_bytes += n_bytes
+        if batch:
+            yield batch, batch_bytes
+
+    def upload_highlights(
+        self,
+        highlights: Iterable[dict],
+        ledger_entries: Sequence[tuple[str, str]] | None = None,
+    ) -> list[UploadChunkResult]:
+        """Upload highlights chunk by chunk, continuing past failed chunks.
+
+        With `upload_workers` > 1, up to that many chunks are uploaded concurrently;
+        results are still collected in chunk order. Highlights of a failed chunk are
+        added to `failed_highlights`; the outcome of every chunk is recorded in
+        `upload_results`. Once the run deadline of `retry_policy` has passed, no
+        further chunk is started; chunks already in flight are still recorded.
+
+        Args:
+            highlights: Highlight dictionaries to upload.
+            ledger_entries: Optional (Zotero item key, fingerprint) pairs, one per
+                highlight in the same order, recorded in `ledger` (and acknowledged
+                in `checkpoint`) once the chunk containing the highlight is uploaded
+                successfully. When `highlights` is lazy, the sequence may grow as
+                highlights are consumed.
+
+        Returns:
+            The results of the chunks that failed to upload.
+
+        Raises:
+            DeadlineExceeded: If the run deadline passed before all chunks were uploaded.
+        """
+        self.upload_results = []
+        batches = self._iter_indexed_batches(
+            highlights, ledger_entries if ledger_entries is not None else ()
+        )
+        if self.upload_workers == 1:
+            for index, batch, n_bytes, entries in batches:
+                self._check_deadline(index)
+                self._collect_upload(batch, self._upload_chunk(index, batch, n_bytes), entries)
+        else:
+            with ThreadPoolExecutor(max_workers=self.upload_workers) as pool:
+                in_flight: deque[tuple[int, list[dict], int, Sequence, Future]] = deque()
+                try:
+                    for index, batch, n_bytes, entries in batches:
+                        if len(in_flight) >= self.upload_workers:
+                            self._collect_future(*in_flight.popleft())
+                        self._check_deadline(index)
+                        future = pool.submit(self._upload_chunk, index, batch, n_bytes)
+                        in_flight.append((index, batch, n_bytes, entries, future))
+                finally:
+                    # Record chunks already sent even if the run stops early
+                    while in_flight:
+                        self._collect_future(*in_flight.popleft())
+        return [result for result in self.upload_results if not result.succeeded]
+
+    def _check_deadline(self, index: int) -> None:
+        """Raise `DeadlineExceeded` if the run deadline passed before chunk `index`."""
+        if self.retry_policy.deadline is not None:
+            self.retry_policy.deadline.check(f"uploading chunk {index}")
+
+    def _iter_indexed_batches(
+        self, highlights: Iterable[dict], ledger_entries: Sequence[tuple[str, str]]
+    ) -> Iterator[tuple[int, list[dict], int, Sequence[tuple[str, str]]]]:
+        """Yield (index, chunk, size in bytes, ledger entries of the chunk) tuples."""
+        start = 0
+        for index, (batch, n_bytes) in enumerate(self.iter_highlight_batches(highlights)):
+            yield index, batch, n_bytes, ledger_entries[start : start + len(batch)]
+            start += len(batch)
+
+    def _upload_chunk(self, index: int, batch: list[dict], n_bytes: int) -> UploadChunkResult:
+        """Upload one chunk and return its outcome instead of raising."""
+        result = UploadChunkResult(index=index, n_highlights=len(batch), n_bytes=n_bytes)
+        try:
+            books = self.create_highlights(batch)
+        except Zotero2ReadwiseError as e:  # Including a deadline reached while retrying
+            result.error = e.message
+        except requests.RequestException as e:  # A network error that outlasted the retries
+            result.error = str(e)
+            result.error_type = type(e).__name__
+        else:
+            result.highlight_ids = self.match_highlight_ids(batch, books)
+        return result
+
+    def _collect_future(
+        self,
+        index: int,
+        batch: list[dict],
+        n_bytes: int,
+        ledger_entries: Sequence[tuple[str, str]],
+        future: Future,
+    ) -> None:
+        """Record the outcome of a chunk uploaded on the pool, even if its upload raised.
+
+        An unexpected error only fails its own chunk, so the results of the other
+        chunks in flight (which Readwise may have accepted) are still recorded.
+        """
+        try:
+            result = future.result()
+        except Exception as e:
+            result = UploadChunkResult(
+                index=index,
+                n_highlights=len(batch),
+                n_bytes=n_bytes,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+        self._collect_upload(batch, result, ledger_entries)
+
+    def _collect_upload(
+        self,
+        batch: list[dict],
+        result: UploadChunkResult,
+        ledger_entries: Sequence[tuple[str, str]] = (),
+    ) -> None:
+        """Record the outcome of an uploaded chunk (and, on success, its ledger entries)."""
+        if result.succeeded and self.ledger is not None and ledger_entries:
+            self.ledger.record(ledger_entries, result.highlight_ids)
+        if result.succeeded and self.checkpoint is not None and ledger_entries:
+            self.checkpoint.acknowledge(key for key, _ in ledger_entries)
+        if not result.succeeded:
+            print(f"Warning: Upload of chunk {result.index} ({len(batch)} highlights) failed.")
+            self.failed_highlights.extend(
+                {**highlight, "error_type": result.error_type, "error_message": result.error}
+                for highlight in batch
+            )
+        self.upload_results.append(result)
 
     @staticmethod
     def convert_tags_to_readwise_format(tags: list[str] | None) -> str:
@@ -243,26 +573,88 @@ class Readwise:
             location=location,
         )
 
-    def post_zotero_annotations_to_readwise(self, zotero_annotations: list[ZoteroItem]) -> None:
+    def post_zotero_annotations_to_readwise(self, zotero_annotations: Iterable[ZoteroItem]) -> None:
         """Upload Zotero annotations to Readwise.
 
         Converts each ZoteroItem to a ReadwiseHighlight and uploads them
-        in batch. Handles errors gracefully, storing failed items.
+        in chunks. Handles errors gracefully, storing failed items. If an upload
+        ledger is set, highlights already uploaded with identical content are skipped.
+        `zotero_annotations` may be a lazy iterator; chunks are then uploaded as
+        soon as enough annotations have arrived to fill them.
 
         Args:
-            zotero_annotations: List of ZoteroItem instances to upload.
+            zotero_annotations: Iterable of ZoteroItem instances to upload.
+
+        Raises:
+            Zotero2ReadwiseError: If any chunk failed to upload. All chunks are
+                attempted before the error is raised.
+            DeadlineExceeded: If the run deadline passed before all chunks were
+                uploaded. The chunks uploaded until then are kept (and recorded in
+                the ledger).
 
         Note:
             Annotations with text exceeding 8191 characters are skipped
-            and added to failed_highlights.
+            and added to failed_highlights, which is reset at the start of
+            every call.
         """
+        self.failed_highlights = []
+        n_annots = f"{len(zotero_annotations)} " if isinstance(zotero_annotations, Sized) else ""
         print(
-            f"\nReadwise: Push {len(zotero_annotations)} Zotero annotations/notes to Readwise...\n"
+            f"\nReadwise: Push {n_annots}Zotero annotations/notes to Readwise...\n"
             f"It may take some time depending on the number of highlights...\n"
             f"A complete message will show up once it's done!\n"
         )
-        rw_highlights = []
+        ledger_entries: list[tuple[str, str]] = []
+        counts = {"annotations": 0, "unchanged": 0}
+        highlights = self._iter_readwise_highlights(zotero_annotations, ledger_entries, counts)
+        try:
+            failed_chunks = self.upload_highlights(highlights, ledger_entries)
+        except DeadlineExceeded:
+            n_uploaded = sum(r.n_highlights for r in self.upload_results if r.succeeded)
+            print(
+                f"\nThe run deadline was reached: {n_uploaded} highlights were uploaded to "
+                f"Readwise before stopping.\n"
+            )
+            raise
+        n_uploaded = sum(r.n_highlights for r in self.upload_results if r.succeeded)
+
+        finished_msg = ""
+        if counts["unchanged"]:
+            finished_msg += (
+                f"\n{counts['unchanged']} highlights are unchanged since their last upload "
+                f"and were skipped.\n"
+            )
+        if self.failed_highlights:
+            finished_msg += (
+                f"\nNOTE: {len(self.failed_highlights)} highlights (out of {counts['annotations']}) failed "
+                f"to upload to Readwise.\n"
+            )
+
+        finished_msg += f"\n{n_uploaded} highlights were successfully uploaded to Readwise.\n\n"
+        print(finished_msg)
+
+        if failed_chunks:
+            raise Zotero2ReadwiseError(
+                f"{len(failed_chunks)} of {len(self.upload_results)} upload chunks failed "
+                f"(chunks {', '.join(str(r.index) for r in failed_chunks)}).\n"
+                f"First error: {failed_chunks[0].error}"
+            )
+
+    def _iter_readwise_highlights(
+        self,
+        zotero_annotations: Iterable[ZoteroItem],
+        ledger_entries: list[tuple[str, str]],
+        counts: dict[str, int],
+    ) -> Iterator[dict]:
+        """Convert Zotero annotations to Readwise highlight payloads, one at a time.
+
+        Annotations that cannot be converted are added to `failed_highlights`.
+        With a ledger, unchanged highlights are skipped and the (key, fingerprint)
+        pair of every yielded highlight is appended to `ledger_entries` first. With
+        only a checkpoint, the pairs are appended with an empty fingerprint.
+        """
         for annot in zotero_annotations:
+            counts["annotations"] += 1
             try:
                 if len(annot.text) >= 8191:
                     print(
@@ -286,20 +678,16 @@ class Readwise:
                 self.failed_highlights.append(failed_item)
                 print(f"Warning: Failed to convert item {annot.key}: {type(e).__name__}: {e}")
                 continue  # Go to next annot
-            rw_highlights.append(rw_highlight.get_nonempty_params())
-        self.create_highlights(rw_highlights)
-
-        finished_msg = ""
-        if self.failed_highlights:
-            finished_msg = (
-                f"\nNOTE: {len(self.failed_highlights)} highlights (out of {len(self.failed_highlights)}) failed "
-                f"to upload to Readwise.\n"
-            )
-
-        finished_msg += (
-            f"\n{len(rw_highlights)} highlights were successfully uploaded to Readwise.\n\n"
-        )
-        print(finished_msg)
+            params = rw_highlight.get_nonempty_params()
+            if self.ledger is not None:
+                fingerprint = UploadLedger.fingerprint(params)
+                if self.ledger.is_uploaded(annot.key, fingerprint):
+                    counts["unchanged"] += 1
+                    continue  # Already uploaded with the same content
+                ledger_entries.append((annot.key, fingerprint))
+            elif self.checkpoint is not None:
+                ledger_entries.append((annot.key, ""))
+            yield params
 
     def save_failed_items_to_json(self, json_filepath_failed_items: str | None = None) -> None:
         """Save failed highlights to a JSON file for debugging.
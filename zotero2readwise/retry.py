@@ -0,0 +1,236 @@
+"""Retry policy shared by the Readwise and Zotero HTTP calls.
+
+This module provides a thread-safe retry policy that honours the server's
+`Retry-After` and Zotero's `Backoff` headers, falls back to jittered
+exponential backoff for transient failures, stops at the run's `Deadline`, and
+keeps counters of how often it retried and how long it slept.
+
+Classes:
+    RetryPolicy: Retry and backoff policy for idempotent HTTP requests.
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable, Mapping
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+import requests
+from pyzotero.zotero import Zotero
+
+try:
+    import httpx2 as httpx  # Fork of httpx used by recent Pyzotero releases
+except ImportError:
+    import httpx
+
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded
+from zotero2readwise.scheduler import FairScheduler
+
+T = TypeVar("T")
+
+# Network-level failures worth retrying, raised by `requests` (Readwise) or httpx (Pyzotero)
+TRANSIENT_ERRORS: tuple[type[Exception], ...] = (
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.TransportError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """Return the delay requested by a `Retry-After` or `Backoff` header, if any.
+
+    Args:
+        headers: Response headers. `Retry-After` may be a number of seconds or an
+            HTTP date; Zotero's `Backoff` is a number of seconds.
+
+    Returns:
+        The requested delay in seconds, or None if neither header is present.
+    """
+    if not headers:
+        return None
+    delays = []
+    for name in ("Retry-After", "Backoff"):
+        value = headers.get(name)
+        if not isinstance(value, str | int | float):
+            continue
+        try:
+            delays.append(float(value))
+        except (TypeError, ValueError):
+            try:
+                delays.append(parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                continue
+    return max(0.0, *delays) if delays else None
+
+
+@dataclass
+class RetryPolicy:
+    """Retry and backoff policy for idempotent HTTP requests.
+
+    A response with a status in `retry_statuses`, or a network-level error, is
+    retried up to `max_retries` times. The delay before a retry is the one
+    requested by the server (`Retry-After` or `Backoff`), otherwise a random delay
+    between 0 and `base_delay * 2 ** attempt` capped at `max_delay` ("full jitter").
+    A `Backoff` header on a successful response delays the next request made
+    through the policy. One policy can be shared by several clients and threads.
+    If a `deadline` is set, no request is sent and no delay started after it.
+    With a `scheduler`, every attempt waits for a request slot granted to
+    `tenant`, and `Retry-After` and `Backoff` delays apply to all policies
+    sharing the scheduler.
+
+    Attributes:
+        max_retries: Maximum number of retries per request (0 disables retrying).
+        base_delay: Initial backoff delay in seconds.
+        max_delay: Upper bound of the exponential backoff delay in seconds.
+        retry_statuses: HTTP status codes that are retried.
+        deadline: Optional deadline of the run; see `Deadline`.
+        scheduler: Optional scheduler sharing request slots between libraries.
+        tenant: Name the policy's requests are scheduled under, e.g. a library key.
+        retries: Number of retries made so far.
+        sleep_seconds: Total time spent sleeping before retries or for `Backoff`.
+
+    Example:
+        >>> policy = RetryPolicy(max_retries=3)
+        >>> resp = policy.send(lambda: requests.get(url))
+        >>> policy.retries, policy.sleep_seconds
+    """
+
+    max_retries: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    deadline: Deadline | None = None
+    scheduler: FairScheduler | None = None
+    tenant: str = ""
+    retries: int = field(default=0, init=False)
+    sleep_seconds: float = field(default=0.0, init=False)
+    _resume_at: float = field(default=0.0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return a jittered exponential backoff delay for the given retry attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def send(self, request: Callable[[], requests.Response]) -> requests.Response:
+        """Send an HTTP request with `requests`, retrying transient failures.
+
+        Args:
+            request: Callable sending the request and returning its response.
+
+        Returns:
+            The first response that is not retried (which may still be an error).
+
+        Raises:
+            requests.RequestException: If a network error persists after all retries.
+            DeadlineExceeded: If the deadline passed, or would pass while waiting.
+        """
+        attempt = 0
+        while True:
+            self._check_deadline()
+            self._wait_for_backoff()
+            try:
+                with self._slot():
+                    resp = request()
+            except TRANSIENT_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                self._retry(attempt, None)
+            else:
+                if resp.status_code not in self.retry_statuses or attempt >= self.max_retries:
+                    self._note_backoff(resp.headers)
+                    return resp
+                self._retry(attempt, resp.headers)
+            attempt += 1
+
+    def call_zotero(self, zotero_client: Zotero, func: Callable[..., T], *args, **kwargs) -> T:
+        """Call a Pyzotero method, retrying transient failures.
+
+        Pyzotero raises its own exceptions on HTTP errors, so the status code and
+        headers are read from the client's last response (`zotero_client.request`).
+
+        Args:
+            zotero_client: The Pyzotero client `func` uses.
+            func: Callable making one or more requests with `zotero_client`.
+            *args: Positional arguments for `func`.
+            **kwargs: Keyword arguments for `func`.
+
+        Returns:
+            The return value of `func`.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed, or would pass while waiting.
+        """
+        attempt = 0
+        while True:
+            self._check_deadline()
+            self._wait_for_backoff()
+            try:
+                with self._slot():
+                    return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                if isinstance(e, TRANSIENT_ERRORS):
+                    headers = None
+                else:
+                    resp = getattr(zotero_client, "request", None)
+                    if getattr(resp, "status_code", None) not in self.retry_statuses:
+                        raise
+                    headers = resp.headers
+                self._retry(attempt, headers)
+            attempt += 1
+
+    def _retry(self, attempt: int, headers: Mapping[str, str] | None) -> None:
+        """Count a retry and sleep for the server-requested or backoff delay."""
+        delay = parse_retry_after(headers)
+        if delay is None:
+            delay = self.backoff_delay(attempt)
+        elif self.scheduler is not None:
+            # A server-requested delay applies to the credentials, not only this library
+            self.scheduler.pause(delay)
+        with self._lock:
+            self.retries += 1
+        self._sleep(delay)
+
+    def _note_backoff(self, headers: Mapping[str, str] | None) -> None:
+        """Delay subsequent requests if the server sent a `Backoff` header."""
+        delay = parse_retry_after({"Backoff": headers.get("Backoff")} if headers else None)
+        if delay:
+            with self._lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            if self.scheduler is not None:
+                self.scheduler.pause(delay)
+
+    def _slot(self) -> AbstractContextManager:
+        """Return a context holding a request slot of the scheduler, if any."""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(self.tenant)
+
+    def _check_deadline(self) -> None:
+        if self.deadline is not None:
+            self.deadline.check()
+
+    def _wait_for_backoff(self) -> None:
+        with self._lock:
+            resume_at = self._resume_at
+        if self.scheduler is not None:
+            resume_at = max(resume_at, self.scheduler.resume_at)
+        delay = resume_at - time.monotonic()
+        if delay > 0:
+            self._sleep(delay)
+
+    def _sleep(self, seconds: float) -> None:
+        if self.deadline is not None and seconds >= self.deadline.remaining():
+            raise DeadlineExceeded(
+                f"The run deadline would be reached while waiting {seconds:.1f}s to retry."
+            )
+        with self._lock:
+            self.sleep_seconds += seconds
+        time.sleep(seconds)
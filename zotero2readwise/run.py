@@ -6,6 +6,8 @@ synchronization from the command line.
 Example:
     $ zotero2readwise <readwise_token> <zotero_key> <zotero_library_id>
     $ zotero2readwise --include_notes y --filter_color "#ffd400"
+    $ zotero2readwise watch <readwise_token> <zotero_key> <zotero_library_id>
+    $ zotero2readwise --all_groups --use_since
 
 Environment Variables:
     READWISE_TOKEN: Readwise API access token
@@ -14,12 +16,34 @@ Environment Variables:
     ZOTERO_LIBRARY_TYPE: Library type ("user" or "group")
 """
 
+import sys
 from argparse import ArgumentParser
 from os import environ
+from typing import NoReturn
 
-from zotero2readwise.helper import read_library_version, write_library_version
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded
+from zotero2readwise.filters import compile_filter
+from zotero2readwise.multi import Library, MultiLibrarySync, discover_group_libraries
+from zotero2readwise.retry import RetryPolicy
+from zotero2readwise.session import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+)
+from zotero2readwise.state import DEFAULT_STATE_PATH, SyncState, library_key
+from zotero2readwise.watch import ZoteroWatcher
+from zotero2readwise.zotero import (
+    ZOTERO_LOCAL_API_URL,
+    get_zotero_client,
+    is_library_modified,
+)
 from zotero2readwise.zt2rw import Zotero2Readwise
 
+# Exit status of a run stopped by --max_runtime (as for the `timeout` command)
+EXIT_DEADLINE = 124
+
 
 def strtobool(val: str) -> int:
     """Convert a string representation of truth to 1 or 0.
@@ -52,13 +76,26 @@ def strtobool(val: str) -> int:
         raise ValueError(f"invalid truth value {val}")
 
 
+def _exit_at_deadline(e: DeadlineExceeded, max_runtime: float) -> NoReturn:
+    """Report a run stopped by --max_runtime and exit with `EXIT_DEADLINE`."""
+    print(f"{e.message} Stopped after --max_runtime {max_runtime:g}s.")
+    sys.exit(EXIT_DEADLINE)
+
+
 def main() -> None:
     """Main entry point for the Zotero2Readwise CLI.
 
     Parses command-line arguments and environment variables, then runs
     the synchronization process. Credentials can be provided either as
-    positional arguments or via environment variables.
+    positional arguments or via environment variables. With `watch` as the
+    first argument, the process keeps running and syncs whenever the Zotero
+    streaming API reports changes to the library.
     """
+    argv = sys.argv[1:]
+    watch = argv[:1] == ["watch"]
+    if watch:
+        argv = argv[1:]
+
     parser = ArgumentParser(
         description="Sync Zotero annotations and notes to Readwise",
         epilog="Credentials can be provided via arguments or environment variables "
@@ -87,6 +124,25 @@ def main() -> None:
         default=environ.get("ZOTERO_LIBRARY_TYPE", "user"),
         help="Zotero Library type ('user': for personal library (default), 'group': for shared library)",
     )
+    parser.add_argument(
+        "--group",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="Also sync this Zotero group library (can be repeated)",
+    )
+    parser.add_argument(
+        "--all_groups",
+        action="store_true",
+        help="Also sync all group libraries of the user the Zotero API key belongs to",
+    )
+    parser.add_argument(
+        "--library_workers",
+        type=int,
+        default=4,
+        help="Number of Zotero libraries synced concurrently with --group/--all_groups "
+        "(default: 4)",
+    )
     parser.add_argument(
         "--include_annotations",
         type=str,
@@ -126,9 +182,28 @@ def main() -> None:
         action="store_true",
         help="Include the tags used for --filter_tags in the Zotero annotations.",
     )
+    parser.add_argument(
+        "--filter",
+        type=str,
+        default=None,
+        metavar="EXPRESSION",
+        help="Only sync Zotero items matching this expression of color:, tag:, type:, doctype:, "
+        "after: and before: criteria combined with and, or, not and parentheses, e.g. "
+        "'color:yellow,red and not tag:\"to read\" and after:2024-01-01' "
+        "(in addition to --filter_color and --filter_tags)",
+    )
     parser.add_argument(
         "--use_since", action="store_true", help="Include Zotero items since last run"
     )
+    parser.add_argument(
+        "--state",
+        type=str,
+        default=DEFAULT_STATE_PATH,
+        metavar="PATH",
+        help="SQLite file recording the synced library versions and runs, used by --use_since "
+        "and watch; a legacy 'since' file is imported on first use "
+        f"(default: {DEFAULT_STATE_PATH})",
+    )
     parser.add_argument(
         "--suppress_failures",
         action="store_true",
@@ -140,16 +215,185 @@ def main() -> None:
         default=None,
         help="Add a custom tag to all highlights (e.g., 'zotero' will add '.zotero' tag to all highlights)",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Retrieve Zotero items page by page and format them as they arrive (lower memory usage)",
+    )
+    parser.add_argument(
+        "--fetch_workers",
+        type=int,
+        default=None,
+        help="Number of Zotero API pages to fetch concurrently "
+        "(default: 1, sequential; 4 with --zotero_local)",
+    )
+    parser.add_argument(
+        "--metadata_cache",
+        type=str,
+        default=None,
+        help="Path of a SQLite file caching Zotero document metadata between runs (default: disabled)",
+    )
+    parser.add_argument(
+        "--metadata_cache_size",
+        type=int,
+        default=10_000,
+        help="Maximum number of documents kept in the metadata cache (default: 10000)",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=500,
+        help="Maximum number of highlights per Readwise upload request (default: 500)",
+    )
+    parser.add_argument(
+        "--max_batch_bytes",
+        type=int,
+        default=2_000_000,
+        help="Maximum size in bytes of one Readwise upload request (default: 2000000)",
+    )
+    parser.add_argument(
+        "--upload_workers",
+        type=int,
+        default=1,
+        help="Number of Readwise upload requests in flight at once (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--max_retries",
+        type=int,
+        default=5,
+        help="Maximum number of retries of a rate-limited or failing Readwise/Zotero request (default: 5)",
+    )
+    parser.add_argument(
+        "--upload_ledger",
+        type=str,
+        default=None,
+        help="Path of a SQLite file recording uploaded highlights, so unchanged ones are skipped "
+        "and highlights of items deleted in Zotero are deleted with --use_since (default: disabled)",
+    )
+    parser.add_argument(
+        "--http_pool_size",
+        type=int,
+        default=None,
+        help="Maximum number of HTTP connections kept open per host "
+        f"(default: {DEFAULT_POOL_SIZE}, or the number of fetch/upload workers if larger)",
+    )
+    parser.add_argument(
+        "--http_keepalive",
+        type=float,
+        default=DEFAULT_KEEPALIVE_EXPIRY,
+        help="Seconds an idle Zotero connection is kept open for reuse "
+        f"(default: {DEFAULT_KEEPALIVE_EXPIRY:.0f})",
+    )
+    parser.add_argument(
+        "--connect_timeout",
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        help="Seconds to wait for a connection to Readwise or Zotero "
+        f"(default: {DEFAULT_CONNECT_TIMEOUT:.0f})",
+    )
+    parser.add_argument(
+        "--read_timeout",
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        help="Seconds to wait for data from Readwise or Zotero before a request fails "
+        f"(default: {DEFAULT_READ_TIMEOUT:.0f})",
+    )
+    parser.add_argument(
+        "--max_runtime",
+        type=float,
+        default=None,
+        help="Stop sending requests after this many seconds and exit with status "
+        f"{EXIT_DEADLINE}; uploaded chunks are kept in the upload ledger and the synced "
+        "version is not updated (default: no limit)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Path of a SQLite file recording the progress of the sync, so that an interrupted "
+        "run resumes where it stopped (not with --stream or --pipeline; default: disabled)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Fetch, format and upload concurrently as overlapping stages (bounded memory)",
+    )
+    parser.add_argument(
+        "--pipeline_queue_size",
+        type=int,
+        default=4,
+        help="Number of pages buffered between two pipeline stages (default: 4)",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Keep formatted items in a compact columnar store until they are uploaded "
+        "(lower memory usage for very large libraries; not with --pipeline)",
+    )
+    parser.add_argument(
+        "--zotero_sqlite",
+        type=str,
+        default=None,
+        help="Read Zotero items from this local zotero.sqlite database instead of the Web API "
+        "(no Zotero API key needed)",
+    )
+    parser.add_argument(
+        "--zotero_local",
+        nargs="?",
+        const=ZOTERO_LOCAL_API_URL,
+        default=None,
+        metavar="URL",
+        help="Read Zotero items from the local API of the running Zotero 7 desktop app "
+        f"(default URL: {ZOTERO_LOCAL_API_URL}; no Zotero API key needed)",
+    )
+
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=5.0,
+        help="watch: seconds without new Zotero changes before a sync starts (default: 5)",
+    )
+    parser.add_argument(
+        "--max_wait",
+        type=float,
+        default=60.0,
+        help="watch: maximum seconds a continuous burst of changes delays a sync (default: 60)",
+    )
 
-    args = vars(parser.parse_args())
+    args = vars(parser.parse_args(argv))
+    deadline = Deadline.after(args["max_runtime"]) if args["max_runtime"] else None
 
     # Validate required credentials
     if not args["readwise_token"]:
         parser.error(
             "readwise_token is required (provide as argument or set READWISE_TOKEN env var)"
         )
-    if not args["zotero_key"]:
+    if not args["zotero_key"] and not (args["zotero_sqlite"] or args["zotero_local"]):
         parser.error("zotero_key is required (provide as argument or set ZOTERO_KEY env var)")
+    if watch and (args["zotero_sqlite"] or args["zotero_local"]):
+        parser.error("watch requires the Zotero Web API (not --zotero_sqlite or --zotero_local)")
+    if args["checkpoint"] and (args["stream"] or args["pipeline"] or watch):
+        parser.error("--checkpoint cannot be combined with --stream, --pipeline or watch")
+    if args["filter"] is not None:
+        try:
+            # Only checks the expression; the sync looks up the metadata doctype: uses
+            compile_filter(args["filter"], document_metadata=lambda annot: {})
+        except ValueError as e:
+            parser.error(f"--filter: {e}")
+    if args["columnar"] and args["pipeline"]:
+        parser.error("--columnar cannot be combined with --pipeline")
+    multi_library = bool(args["group"] or args["all_groups"])
+    if multi_library and (watch or args["zotero_sqlite"] or args["zotero_local"]):
+        parser.error(
+            "--group and --all_groups cannot be combined with watch, --zotero_sqlite or "
+            "--zotero_local"
+        )
+    if args["all_groups"] and args["library_type"] != "user":
+        parser.error("--all_groups requires a user library (--library_type user)")
+    if not args["zotero_library_id"] and args["zotero_local"]:
+        # The local API serves the desktop user's own library as user 0
+        args["zotero_library_id"] = "0"
     if not args["zotero_library_id"]:
         parser.error(
             "zotero_library_id is required (provide as argument or set ZOTERO_LIBRARY_ID env var)"
@@ -162,24 +406,139 @@ def main() -> None:
         except ValueError:
             raise ValueError(f"Invalid value for --{bool_arg}. Use 'n' or 'y' (default).") from None
 
-    since = read_library_version() if args["use_since"] else 0
+    library = library_key(args["library_type"], args["zotero_library_id"])
+    item_types = [
+        item_type
+        for item_type, included in (
+            ("annotation", args["include_annotations"]),
+            ("note", args["include_notes"]),
+        )
+        if included
+    ]
+    state = SyncState(args["state"]) if args["use_since"] or watch else None
+    since_versions: dict[str, int] = {}
+    if state is not None:
+        state.import_since_file(library, item_types)
+        since_versions = state.versions(library, item_types)
+    sync_options = {
+        "include_annotations": args["include_annotations"],
+        "include_notes": args["include_notes"],
+        "filter_colors": tuple(args["filter_color"]),
+        "filter_tags": tuple(args["filter_tags"]),
+        "include_filter_tags": args["include_filter_tags"],
+        "filter_expression": args["filter"],
+        "write_failures": not args["suppress_failures"],
+        "custom_tag": args["custom_tag"],
+        "stream": args["stream"],
+        "fetch_workers": args["fetch_workers"],
+        "metadata_cache_path": args["metadata_cache"],
+        "metadata_cache_size": args["metadata_cache_size"],
+        "readwise_batch_size": args["batch_size"],
+        "readwise_max_batch_bytes": args["max_batch_bytes"],
+        "readwise_upload_workers": args["upload_workers"],
+        "upload_ledger_path": args["upload_ledger"],
+        "pipeline": args["pipeline"],
+        "pipeline_queue_size": args["pipeline_queue_size"],
+        "checkpoint_path": args["checkpoint"],
+        "columnar": args["columnar"],
+    }
+    http_options = {
+        "max_retries": args["max_retries"],
+        "http_pool_size": args["http_pool_size"],
+        "http_keepalive": args["http_keepalive"],
+        "connect_timeout": args["connect_timeout"],
+        "read_timeout": args["read_timeout"],
+    }
+
+    if multi_library:
+        libraries = [Library(args["library_type"], args["zotero_library_id"])]
+        libraries += [Library("group", group_id) for group_id in args["group"]]
+        if args["all_groups"]:
+            zotero_client = get_zotero_client(
+                library_id=args["zotero_library_id"], api_key=args["zotero_key"]
+            )
+            try:
+                libraries += discover_group_libraries(
+                    zotero_client,
+                    retry_policy=RetryPolicy(max_retries=args["max_retries"], deadline=deadline),
+                )
+            except DeadlineExceeded as e:
+                _exit_at_deadline(e, args["max_runtime"])
+        multi = MultiLibrarySync(
+            libraries,
+            readwise_token=args["readwise_token"],
+            zotero_key=args["zotero_key"],
+            max_concurrent_libraries=args["library_workers"],
+            state=state,
+            **http_options,
+            **sync_options,
+        )
+        try:
+            multi.run(deadline=deadline)
+        except DeadlineExceeded as e:
+            _exit_at_deadline(e, args["max_runtime"])
+        return
+
+    since = min(since_versions.values(), default=0)
+    # A local database is read in full anyway, so only check the Web API up front
+    if since and not args["zotero_sqlite"] and not watch:
+        zotero_client = get_zotero_client(
+            library_id=args["zotero_library_id"],
+            api_key=args["zotero_key"],
+            library_type=args["library_type"],
+            local_api_url=args["zotero_local"],
+        )
+        try:
+            modified = is_library_modified(
+                zotero_client,
+                since,
+                retry_policy=RetryPolicy(max_retries=args["max_retries"], deadline=deadline),
+                timeout=(args["connect_timeout"], args["read_timeout"]),
+            )
+        except DeadlineExceeded as e:
+            _exit_at_deadline(e, args["max_runtime"])
+        if not modified:
+            print(f"Zotero library is unchanged since version {since}. Nothing to sync.")
+            return
+
     zt2rw = Zotero2Readwise(
         readwise_token=args["readwise_token"],
         zotero_key=args["zotero_key"],
         zotero_library_id=args["zotero_library_id"],
         zotero_library_type=args["library_type"],
-        include_annotations=args["include_annotations"],
-        include_notes=args["include_notes"],
-        filter_colors=tuple(args["filter_color"]),
-        filter_tags=tuple(args["filter_tags"]),
-        include_filter_tags=args["include_filter_tags"],
-        since=since,
-        write_failures=not args["suppress_failures"],
-        custom_tag=args["custom_tag"],
-    )
-    zt2rw.run()
-    if args["use_since"]:
-        write_library_version(zt2rw.zotero_client)
+        # The watcher advances a single version; a run starts each item type from its own
+        since=since if watch or not since_versions else since_versions,
+        zotero_sqlite_path=args["zotero_sqlite"],
+        zotero_local_api_url=args["zotero_local"],
+        **http_options,
+        **sync_options,
+    )
+    if watch:
+        watcher = ZoteroWatcher(
+            zt2rw,
+            api_key=args["zotero_key"],
+            debounce=args["debounce"],
+            max_wait=args["max_wait"],
+            state=state,
+        )
+        try:
+            watcher.run_forever()
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+        return
+
+    run_id = state.start_run(library, item_types) if state is not None else None
+    try:
+        zt2rw.run(deadline=deadline)
+    except BaseException as e:
+        if run_id is not None:
+            state.finish_run(run_id, error=f"{type(e).__name__}: {e}")
+        if isinstance(e, DeadlineExceeded):
+            _exit_at_deadline(e, args["max_runtime"])
+        raise
+    if run_id is not None:
+        # The version captured before fetching, so items changed mid-run are synced next time
+        state.finish_run(run_id, library_version=zt2rw.library_version)
 
 
 if __name__ == "__main__":
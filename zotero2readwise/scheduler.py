@@ -0,0 +1,107 @@
+"""Fair sharing of HTTP request slots between concurrently synced libraries.
+
+When several libraries are synced at once over one connection pool, a large
+library with many fetch and upload workers would otherwise keep the pool busy
+and make the requests of small libraries wait behind all of its own. The
+`FairScheduler` admits at most `max_in_flight` requests at a time and, whenever
+a slot frees up, grants it to the next library in round-robin order among those
+with waiting requests.
+
+Classes:
+    FairScheduler: Round-robin admission of requests from several libraries.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class FairScheduler:
+    """Round-robin admission of requests from several libraries to a shared pool.
+
+    Every request of a library (its `tenant`) is sent inside `slot(tenant)`.
+    Waiting requests of one library are admitted in arrival order; between
+    libraries, slots are granted in turn, so each library with waiting requests
+    gets a slot before any library gets a second one.
+
+    The scheduler also holds the pause requested by a Zotero `Backoff` header,
+    which applies to the API key and therefore to all libraries (see
+    `RetryPolicy`).
+
+    Attributes:
+        max_in_flight: Maximum number of requests admitted at once.
+        granted: Number of slots granted so far, per tenant.
+
+    Example:
+        >>> scheduler = FairScheduler(max_in_flight=10)
+        >>> with scheduler.slot("groups/12345"):
+        ...     send_request()
+    """
+
+    def __init__(self, max_in_flight: int):
+        """Initialize the scheduler.
+
+        Args:
+            max_in_flight: Maximum number of requests admitted at once, typically
+                the size of the shared connection pool.
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.granted: Counter[str] = Counter()
+        self._in_flight = 0
+        self._waiting: dict[str, deque[list[bool]]] = {}
+        self._turns: deque[str] = deque()
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, tenant: str) -> Iterator[None]:
+        """Wait for the tenant's turn, then hold one request slot.
+
+        Args:
+            tenant: Name of the library the request is for.
+        """
+        ticket = [False]
+        with self._cond:
+            if tenant not in self._waiting:
+                self._waiting[tenant] = deque()
+                self._turns.append(tenant)
+            self._waiting[tenant].append(ticket)
+            self._dispatch()
+            while not ticket[0]:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting requests, one tenant at a time."""
+        granted = False
+        while self._in_flight < self.max_in_flight and self._turns:
+            tenant = self._turns.popleft()
+            waiting = self._waiting[tenant]
+            waiting.popleft()[0] = True
+            self._in_flight += 1
+            self.granted[tenant] += 1
+            granted = True
+            if waiting:
+                self._turns.append(tenant)
+            else:
+                del self._waiting[tenant]
+        if granted:
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Ask all tenants not to send requests for the next `seconds` seconds."""
+        with self._cond:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    @property
+    def resume_at(self) -> float:
+        """`time.monotonic()` time before which no request should be sent."""
+        with self._cond:
+            return self._resume_at
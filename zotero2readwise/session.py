@@ -0,0 +1,155 @@
+"""HTTP connection pools shared by the Readwise and Zotero clients.
+
+Without a shared session every Readwise upload (`requests.post`) and every
+Pyzotero client (including the per-thread clones of concurrent fetches) opens
+its own connections, so chunked and concurrent request patterns pay a TCP and
+TLS handshake per request or per clone. This module keeps one pooled session
+per HTTP library for the whole sync.
+
+Classes:
+    HTTPSessions: Pooled, keep-alive HTTP sessions for Readwise and Zotero requests.
+"""
+
+import importlib
+import threading
+
+import requests
+from pyzotero.zotero import Zotero
+from requests.adapters import HTTPAdapter
+
+# Default maximum number of connections kept open per host
+DEFAULT_POOL_SIZE = 10
+
+# Default number of seconds an idle Zotero connection is kept open
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# Default seconds to wait for a connection to be established
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+# Default seconds to wait for data (or to send data) on an open connection
+DEFAULT_READ_TIMEOUT = 60.0
+
+
+class HTTPSessions:
+    """Pooled, keep-alive HTTP sessions for Readwise and Zotero requests.
+
+    Readwise requests go through `session`, a `requests.Session` with up to
+    `pool_size` connections per host and `max_hosts` host pools. Pyzotero sends
+    its requests with an HTTPX client; `attach_zotero_client` replaces the
+    client of a Pyzotero instance by one shared client of the same HTTPX
+    library, limited to `pool_size` connections and closing idle connections
+    after `keepalive_expiry` seconds. Every request of either library times out
+    after `connect_timeout` seconds without a connection or `read_timeout`
+    seconds without data, so a stalled socket cannot hang a run. HTTPX and
+    `requests` sessions are safe to share between threads, so concurrent uploads
+    and the per-thread clones of concurrent fetches (see `clone_zotero_client`)
+    reuse the same connections.
+
+    Attributes:
+        pool_size: Maximum number of connections kept open per host.
+        max_hosts: Maximum number of hosts whose connections are kept open.
+        keepalive_expiry: Seconds an idle Zotero connection is kept open.
+        timeout: (connect, read) timeout in seconds, in the format `requests` takes.
+        session: The `requests.Session` used for Readwise requests.
+
+    Example:
+        >>> sessions = HTTPSessions(pool_size=8)
+        >>> rw = Readwise(readwise_token, session=sessions.session)
+        >>> zot = sessions.attach_zotero_client(get_zotero_client())
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_hosts: int = 4,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
+        """Initialize the sessions.
+
+        Args:
+            pool_size: Maximum number of connections kept open per host. Should be
+                at least the number of concurrent requests to one host.
+            max_hosts: Maximum number of hosts whose connection pools are kept.
+            keepalive_expiry: Seconds an idle Zotero connection is kept open.
+            connect_timeout: Seconds to wait for a connection to be established.
+            read_timeout: Seconds to wait for data on an open connection.
+        """
+        self.pool_size = max(1, pool_size)
+        self.max_hosts = max(1, max_hosts)
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_hosts, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._zotero_http_client = None
+        self._lock = threading.Lock()
+
+    def attach_zotero_client(self, zotero_client: Zotero) -> Zotero:
+        """Make a Pyzotero client send its requests through the shared Zotero pool.
+
+        The shared HTTPX client is created from the first attached client, keeping
+        its headers, redirect and proxy settings, with the sessions' `timeout`.
+        Other clients (e.g. a `ZoteroSQLiteClient`) are returned unchanged.
+
+        Args:
+            zotero_client: The Pyzotero client to attach.
+
+        Returns:
+            The same client, now using the shared connection pool.
+        """
+        own_client = getattr(zotero_client, "client", None)
+        if not isinstance(zotero_client, Zotero) or own_client is None:
+            return zotero_client
+        with self._lock:
+            if self._zotero_http_client is None:
+                self._zotero_http_client = self._create_http_client(own_client)
+            shared = self._zotero_http_client
+        if own_client is not shared:
+            own_client.close()
+            zotero_client.client = shared
+        return zotero_client
+
+    def _create_http_client(self, template):
+        """Create a pooled client of the HTTPX library Pyzotero uses."""
+        # Pyzotero uses `httpx` or its fork `httpx2` depending on its version
+        httpx = importlib.import_module(type(template).__module__.partition(".")[0])
+        timeout = httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+
+        class SharedClient(httpx.Client):
+            """HTTPX client shared by Pyzotero clients and their clones."""
+
+            def build_request(self, *args, **kwargs):
+                # Pyzotero passes its own fixed timeout with every request
+                kwargs["timeout"] = timeout
+                return super().build_request(*args, **kwargs)
+
+            def close(self) -> None:
+                # Pyzotero closes its client when a Zotero instance is garbage
+                # collected, but the pool must outlive the instances using it
+                pass
+
+            def close_pool(self) -> None:
+                super().close()
+
+        return SharedClient(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            headers=template.headers,
+            timeout=timeout,
+            follow_redirects=template.follow_redirects,
+            trust_env=template.trust_env,
+        )
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+        with self._lock:
+            client, self._zotero_http_client = self._zotero_http_client, None
+        if client is not None:
+            client.close_pool()
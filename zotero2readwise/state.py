@@ -0,0 +1,233 @@
+"""Durable record of what was synced, replacing the `since` file.
+
+The `since` file holds a single library version for whatever library was
+synced last, and is rewritten in place. This module keeps a single-file SQLite
+store instead, with one synced version per library and item type (annotations
+and notes can be synced from different versions, e.g. after notes were enabled)
+and one row per run, so that a run that crashed or was stopped is visible as
+such. All updates are transactional.
+
+Classes:
+    SyncState: SQLite-backed store of synced library versions and runs.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from zotero2readwise.helper import read_library_version
+
+# Default location of the state store, in the working directory like the `since` file
+DEFAULT_STATE_PATH = "zotero2readwise_state.sqlite"
+
+# Run statuses
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def library_key(library_type: str, library_id: str | int) -> str:
+    """Identify a Zotero library like its API path, e.g. "users/12345".
+
+    Args:
+        library_type: "user" or "group" (Pyzotero's "users"/"groups" also work).
+        library_id: The user or group ID.
+
+    Returns:
+        The library key used by `SyncState`.
+    """
+    return f"{library_type.removesuffix('s')}s/{library_id}"
+
+
+class SyncState:
+    """SQLite-backed store of synced library versions and runs.
+
+    A version is saved for a library and item type only when a run completes,
+    together with the run's status, in one transaction. The version saved is
+    the one captured when the run started fetching, so items modified while the
+    run was in progress are retrieved again by the next incremental run.
+
+    Attributes:
+        path: Location of the SQLite database file.
+
+    Example:
+        >>> state = SyncState("zotero2readwise_state.sqlite")
+        >>> since = state.versions("users/12345", ["annotation", "note"])
+        >>> run_id = state.start_run("users/12345", ["annotation", "note"])
+        >>> state.finish_run(run_id, library_version=zt_rw.library_version)
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_STATE_PATH):
+        """Open (or create) the state database.
+
+        Args:
+            path: Location of the SQLite database file.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS versions (
+                    library TEXT NOT NULL,
+                    item_type TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (library, item_type)
+                );
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    library TEXT NOT NULL,
+                    item_types TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    library_version INTEGER,
+                    error TEXT
+                );
+                """
+            )
+
+    def versions(self, library: str, item_types: Iterable[str]) -> dict[str, int]:
+        """Return the library version each item type was last synced at.
+
+        Args:
+            library: Library key, see `library_key`.
+            item_types: Zotero item types, e.g. "annotation" and "note".
+
+        Returns:
+            A mapping of every given item type to its synced version, 0 for item
+            types never synced.
+        """
+        item_types = list(item_types)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_type, version FROM versions WHERE library = ?", (library,)
+            ).fetchall()
+        synced = dict(rows)
+        return {item_type: synced.get(item_type, 0) for item_type in item_types}
+
+    def save_versions(self, library: str, versions: Mapping[str, int]) -> None:
+        """Record the library version each item type is synced at, atomically.
+
+        Args:
+            library: Library key, see `library_key`.
+            versions: Mapping of item type to library version.
+        """
+        with self._lock, self._conn:
+            self._save_versions(library, versions)
+
+    def _save_versions(self, library: str, versions: Mapping[str, int]) -> None:
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO versions (library, item_type, version, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            ((library, item_type, version, now) for item_type, version in versions.items()),
+        )
+
+    def import_since_file(self, library: str, item_types: Iterable[str]) -> bool:
+        """Import the version of a legacy `since` file for a library synced for the first time.
+
+        Args:
+            library: Library key the `since` file in the working directory was written for.
+            item_types: Item types the `since` file was written for.
+
+        Returns:
+            True if a version was imported, False if the library already has
+            versions or there is no valid `since` file.
+        """
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM versions WHERE library = ? LIMIT 1", (library,)
+            ).fetchone()
+        version = 0 if known else read_library_version()
+        if not version:
+            return False
+        self.save_versions(library, dict.fromkeys(item_types, version))
+        return True
+
+    def start_run(self, library: str, item_types: Iterable[str]) -> int:
+        """Record the start of a run.
+
+        Args:
+            library: Library key, see `library_key`.
+            item_types: Item types the run syncs.
+
+        Returns:
+            The ID of the run, to pass to `finish_run`.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (library, item_types, status, started_at) VALUES (?, ?, ?, ?)",
+                (library, json.dumps(list(item_types)), RUNNING, time.time()),
+            )
+        return cursor.lastrowid
+
+    def finish_run(
+        self, run_id: int, library_version: int | None = None, error: str | None = None
+    ) -> None:
+        """Record the end of a run and, if it completed, its synced version.
+
+        The run's status and the versions of its item types are updated in one
+        transaction.
+
+        Args:
+            run_id: ID returned by `start_run`.
+            library_version: Library version captured when the run started fetching.
+                Saved for the run's library and item types unless the run failed.
+            error: Error message if the run failed or was stopped.
+        """
+        with self._lock, self._conn:
+            library, item_types = self._conn.execute(
+                "SELECT library, item_types FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+            if error is None and library_version is not None:
+                self._save_versions(library, dict.fromkeys(json.loads(item_types), library_version))
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, library_version = ?, error = ? "
+                "WHERE id = ?",
+                (
+                    COMPLETED if error is None else FAILED,
+                    time.time(),
+                    library_version,
+                    error,
+                    run_id,
+                ),
+            )
+
+    def last_run(self, library: str) -> dict | None:
+        """Return the most recent run of a library, None if it was never synced.
+
+        Returns:
+            A dictionary with the run's `id`, `item_types`, `status` (`RUNNING`,
+            `COMPLETED` or `FAILED`), `started_at`, `finished_at`,
+            `library_version` and `error`.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, item_types, status, started_at, finished_at, library_version, error "
+                "FROM runs WHERE library = ? ORDER BY id DESC LIMIT 1",
+                (library,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = (
+            "id",
+            "item_types",
+            "status",
+            "started_at",
+            "finished_at",
+            "library_version",
+            "error",
+        )
+        run = dict(zip(keys, row, strict=True))
+        run["item_types"] = json.loads(run["item_types"])
+        return run
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
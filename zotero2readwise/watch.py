@@ -0,0 +1,230 @@
+"""Long-running sync driven by the Zotero streaming API.
+
+This module keeps one `Zotero2Readwise` instance alive and runs an incremental
+sync whenever Zotero reports that the library changed, instead of re-creating
+clients and re-listing the library from a scheduler every few minutes.
+
+Requires the optional `websockets` package (`pip install zotero2readwise[watch]`).
+
+Classes:
+    ZoteroWatcher: Runs incremental syncs on Zotero streaming API topic updates.
+"""
+
+import json
+import threading
+import time
+
+from zotero2readwise.exception import Zotero2ReadwiseError
+from zotero2readwise.state import SyncState, library_key
+from zotero2readwise.zt2rw import Zotero2Readwise
+
+try:
+    from websockets.exceptions import ConnectionClosed, InvalidHandshake
+    from websockets.sync.client import connect
+except ImportError:  # pragma: no cover - optional dependency
+    connect = None
+
+ZOTERO_STREAM_URL = "wss://stream.zotero.org"
+
+# Seconds to wait before reconnecting if the server did not send a `retry` hint
+DEFAULT_RECONNECT_DELAY = 10.0
+
+# Seconds between checks of the stop flag while waiting for stream events
+_POLL_INTERVAL = 0.5
+
+
+class ZoteroWatcher:
+    """Runs incremental syncs whenever the Zotero streaming API reports changes.
+
+    The watcher subscribes to the `topicUpdated` events of the synced library.
+    Bursts of events (e.g. while highlighting a paper) are debounced: a sync
+    starts once no new event arrived for `debounce` seconds, but at most
+    `max_wait` seconds after the first pending event. Each sync starts from the
+    library version reached by the previous one, which is also saved to the
+    `state` store, if any. The `Zotero2Readwise` instance is reused, so the document
+    metadata caches stay warm; entries of items that changed are dropped before
+    each sync. After a lost connection the watcher reconnects and catches up.
+
+    Attributes:
+        zt2rw: The synchronizer used for every sync.
+        topic: Streaming API topic of the library, e.g. "/users/12345".
+        debounce: Seconds without new events before a pending sync starts.
+        max_wait: Maximum seconds a sync is delayed by a continuous burst of events.
+        version: Library version the next sync starts from.
+        syncs: Number of syncs run so far.
+        state: Optional store the synced library version and every sync are recorded in.
+
+    Example:
+        >>> zt_rw = Zotero2Readwise(readwise_token, zotero_key, zotero_library_id)
+        >>> ZoteroWatcher(zt_rw, api_key=zotero_key).run_forever()
+    """
+
+    def __init__(
+        self,
+        zt2rw: Zotero2Readwise,
+        api_key: str,
+        debounce: float = 5.0,
+        max_wait: float = 60.0,
+        stream_url: str = ZOTERO_STREAM_URL,
+        state: SyncState | None = None,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            zt2rw: The synchronizer to run on changes; its `since` is the starting
+                library version.
+            api_key: Zotero API key used to subscribe to the library's topic.
+            debounce: Seconds without new events before a pending sync starts.
+            max_wait: Maximum seconds a sync is delayed by a continuous burst of events.
+            stream_url: URL of the Zotero streaming API.
+            state: Optional state store. Every sync is recorded in it, and the
+                library version reached is saved after each successful sync.
+
+        Raises:
+            Zotero2ReadwiseError: If the `websockets` package is not installed.
+        """
+        if connect is None:
+            raise Zotero2ReadwiseError(
+                "Watch mode requires the 'websockets' package. "
+                "Install it with `pip install zotero2readwise[watch]`."
+            )
+        self.zt2rw = zt2rw
+        self.api_key = api_key
+        zot = zt2rw.zotero_client
+        self.topic = f"/{zot.library_type}/{zot.library_id}"
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.stream_url = stream_url
+        self.state = state
+        self._library = library_key(zot.library_type, zot.library_id)
+        self._item_types = [
+            item_type
+            for item_type, included in (
+                ("annotation", zt2rw.include_annots),
+                ("note", zt2rw.include_notes),
+            )
+            if included
+        ]
+        self.version = zt2rw.since
+        self.syncs = 0
+        self._reconnect_delay = DEFAULT_RECONNECT_DELAY
+        self._first_event: float | None = None
+        self._deadline: float | None = None
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Ask `run_forever` to return after the current event or sync."""
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        """Subscribe to the library's updates and sync on changes until stopped.
+
+        A catch-up sync runs after every (re)connection, so changes made while
+        the watcher was not connected are not missed.
+
+        Raises:
+            Zotero2ReadwiseError: If Zotero rejects the subscription.
+        """
+        while not self._stop.is_set():
+            try:
+                with connect(self.stream_url) as websocket:
+                    self._subscribe(websocket)
+                    self._schedule(delay=0)
+                    self._listen(websocket)
+            except (ConnectionClosed, InvalidHandshake, OSError) as e:
+                print(
+                    f"Lost connection to the Zotero streaming API ({type(e).__name__}); "
+                    f"reconnecting in {self._reconnect_delay:.0f}s."
+                )
+                self._stop.wait(self._reconnect_delay)
+
+    def _subscribe(self, websocket) -> None:
+        """Subscribe to the library's topic and wait for the confirmation."""
+        websocket.send(
+            json.dumps(
+                {
+                    "action": "createSubscriptions",
+                    "subscriptions": [{"apiKey": self.api_key, "topics": [self.topic]}],
+                }
+            )
+        )
+        while True:
+            message = json.loads(websocket.recv())
+            if message.get("event") == "connected":
+                self._note_retry(message)
+            elif message.get("event") == "subscriptionsCreated":
+                break
+        if message.get("errors"):
+            error = message["errors"][0]
+            raise Zotero2ReadwiseError(
+                f"Zotero rejected the subscription to {error.get('topic', self.topic)}: "
+                f"{error.get('error', 'unknown error')}"
+            )
+        print(f"Watching {self.topic} for changes...")
+
+    def _listen(self, websocket) -> None:
+        """Handle stream events and run due syncs until stopped."""
+        while not self._stop.is_set():
+            timeout = _POLL_INTERVAL
+            if self._deadline is not None:
+                timeout = min(timeout, max(0.0, self._deadline - time.monotonic()))
+            try:
+                message = websocket.recv(timeout=timeout)
+            except TimeoutError:
+                message = None
+            if message is not None:
+                self._handle_event(json.loads(message))
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                self._sync()
+
+    def _handle_event(self, message: dict) -> None:
+        """Schedule a sync for an update of the watched topic."""
+        event = message.get("event")
+        if event == "connected":
+            self._note_retry(message)
+        elif event == "topicUpdated" and message.get("topic") == self.topic:
+            if message.get("version", self.version + 1) > self.version:
+                self._schedule(delay=self.debounce)
+        elif event == "topicRemoved" and message.get("topic") == self.topic:
+            print(f"Warning: Access to {self.topic} was removed from the Zotero API key.")
+
+    def _note_retry(self, message: dict) -> None:
+        """Use the server's reconnect delay hint (in milliseconds), if any."""
+        if isinstance(message.get("retry"), int | float):
+            self._reconnect_delay = message["retry"] / 1000
+
+    def _schedule(self, delay: float) -> None:
+        """Move the pending sync `delay` seconds into the future, up to `max_wait`."""
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        self._deadline = min(now + delay, self._first_event + self.max_wait)
+
+    def _sync(self) -> None:
+        """Run one incremental sync from `version`, keeping the caches warm."""
+        self._first_event = self._deadline = None
+        zt2rw = self.zt2rw
+        zot = zt2rw.zotero_client
+        run_id = None
+        try:
+            target = zt2rw.retry_policy.call_zotero(zot, zot.last_modified_version)
+            if target == self.version:
+                return
+            if self.state is not None:
+                run_id = self.state.start_run(self._library, self._item_types)
+            if self.syncs:
+                changed = zt2rw.retry_policy.call_zotero(zot, zot.item_versions, since=self.version)
+                zt2rw.zotero.invalidate_metadata(changed)
+            zt2rw.zotero.failed_items = []
+            zt2rw.since = self.version
+            zt2rw.run()
+        except Exception as e:
+            if run_id is not None:
+                self.state.finish_run(run_id, error=f"{type(e).__name__}: {e}")
+            print(f"Sync failed: {type(e).__name__}: {e}; retrying in {self.max_wait:.0f}s.")
+            self._schedule(delay=self.max_wait)
+            return
+        self.syncs += 1
+        self.version = target
+        if run_id is not None:
+            self.state.finish_run(run_id, library_version=target)
@@ -5,28 +5,62 @@ to retrieve and format annotations and notes.
 
 Classes:
     ZoteroItem: Dataclass representing a formatted Zotero annotation or note.
+    ZoteroPageFetcher: Concurrent, offset-based fetcher for Zotero item listings.
     ZoteroAnnotationsNotes: Handler for retrieving and formatting Zotero items.
 
 Functions:
-    get_zotero_client: Create a Pyzotero client instance.
+    get_zotero_client: Create a Pyzotero client instance (Web or local API).
+    clone_zotero_client: Create an independent copy of a Pyzotero client.
+    is_library_modified: Check whether a library changed since a given version.
 """
 
-from collections.abc import Sequence
+import sys
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence, Sized
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import islice
 from json import dump
 from os import environ
+from typing import TYPE_CHECKING
 
+import requests
 from pyzotero.zotero import Zotero
 
 from zotero2readwise import FAILED_ITEMS_DIR
+from zotero2readwise.cache import MetadataCache
+from zotero2readwise.exception import DeadlineExceeded
+from zotero2readwise.filters import compile_filter
+from zotero2readwise.retry import RetryPolicy
+from zotero2readwise.session import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, HTTPSessions
+from zotero2readwise.zotero_sqlite import ZoteroSQLiteClient
 
+if TYPE_CHECKING:
+    from zotero2readwise.columnar import AnnotationStore
 
-@dataclass
+# The Zotero API accepts at most 50 keys in a single `itemKey` query.
+ZOTERO_MAX_ITEM_KEYS = 50
+
+# The Zotero API returns at most 100 items per page, whatever `limit` asks for.
+ZOTERO_MAX_PAGE_SIZE = 100
+
+# Base URL of the Web-API-compatible local server of Zotero 7 desktop
+ZOTERO_LOCAL_API_URL = "http://localhost:23119/api"
+
+# Concurrent page requests for the local API: it has no rate limits and
+# sub-millisecond latency, so a few workers saturate the desktop app
+LOCAL_FETCH_WORKERS = 4
+
+
+@dataclass(slots=True)
 class ZoteroItem:
     """Dataclass representing a formatted Zotero annotation or note.
 
     This class standardizes the representation of Zotero items for processing
-    and conversion to Readwise highlights.
+    and conversion to Readwise highlights. Instances store their fields in
+    `__slots__` rather than a per-instance `__dict__`, since a sync may hold
+    hundreds of thousands of them.
 
     Attributes:
         key: Unique Zotero item key.
@@ -72,11 +106,12 @@ class ZoteroItem:
 
     def __post_init__(self):
         # Convert [{'tag': 'abc'}, {'tag': 'def'}] -->  ['abc', 'def']
+        # Tag strings repeat across items, so keep one instance of each
         if self.tags:
-            self.tags = [d_["tag"] for d_ in self.tags]
+            self.tags = [sys.intern(d_["tag"]) for d_ in self.tags]
 
         if self.document_tags:
-            self.document_tags = [d_["tag"] for d_ in self.document_tags]
+            self.document_tags = [sys.intern(d_["tag"]) for d_ in self.document_tags]
 
         # Sample {'dc:relation': ['http://zotero.org/users/123/items/ABC', 'http://zotero.org/users/123/items/DEF']}
         if self.relations:
@@ -129,13 +164,52 @@ class ZoteroItem:
         Returns:
             Dictionary containing only attributes with truthy values.
         """
-        return {k: v for k, v in self.__dict__.items() if v}
+        return {k: v for k in self.__slots__ if (v := getattr(self, k))}
+
+
+@dataclass(slots=True, frozen=True)
+class _DocumentFields:
+    """Formatted fields of a document, shared by all its `ZoteroItem`s.
+
+    Built once per document from its metadata (see
+    `ZoteroAnnotationsNotes.get_item_metadata`), so the items of a document
+    reference one title, tag list and author string instead of each holding a
+    copy. The `tags` list is shared and must not be modified in place.
+    """
+
+    metadata: dict
+    title: str | None
+    tags: list[str] | None
+    document_type: str | None
+    creators: str | None
+    source_url: str | None
+    attachment_url: str | None
+
+    @classmethod
+    def from_metadata(cls, metadata: dict) -> "_DocumentFields":
+        tags = metadata["tags"]
+        creators = metadata.get("creators")
+        return cls(
+            metadata=metadata,
+            title=metadata["title"],
+            tags=[sys.intern(d_["tag"]) for d_ in tags] if tags else tags,
+            document_type=_intern(metadata["document_type"]),
+            creators=ZoteroItem.format_author_list(creators) if creators else creators,
+            source_url=metadata["source_url"],
+            attachment_url=metadata["attachment_url"],
+        )
+
+
+def _intern(value: str | None) -> str | None:
+    """Return the canonical instance of a repeated string such as a color."""
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 def get_zotero_client(
     library_id: str | None = None,
     api_key: str | None = None,
     library_type: str = "user",
+    local_api_url: str | None = None,
 ) -> Zotero:
     """Create a Zotero client object from Pyzotero library
 
@@ -150,6 +224,10 @@ def get_zotero_client(
     library_type: str ['user', 'group']
         'user': to access your Zotero library
         'group': to access a shared group library
+    local_api_url: str
+        Base URL of the Zotero 7 local API (e.g. `ZOTERO_LOCAL_API_URL`). If passed,
+        requests go to the running Zotero desktop app instead of the Web API, no
+        api_key is needed, and library_id defaults to "0" (the local user library).
 
     Returns
     -------
@@ -157,6 +235,9 @@ def get_zotero_client(
         a Zotero client object
     """
 
+    if local_api_url is not None:
+        return _get_local_zotero_client(local_api_url, library_id, library_type)
+
     if library_id is None:
         try:
             library_id = environ["ZOTERO_LIBRARY_ID"]
@@ -187,12 +268,214 @@ def get_zotero_client(
     )
 
 
+def _get_local_zotero_client(
+    local_api_url: str, library_id: str | None, library_type: str | None
+) -> Zotero:
+    """Create a Pyzotero client for the Zotero 7 local API at `local_api_url`."""
+    if library_id is None:
+        library_id = environ.get("ZOTERO_LIBRARY_ID", "0")
+    if library_type is None:
+        library_type = environ.get("LIBRARY_TYPE", "user")
+    elif library_type not in ["user", "group"]:
+        raise ValueError("library_type value can either be 'user' or 'group'.")
+
+    client = Zotero(library_id=library_id, library_type=library_type, local=True)
+    client.endpoint = local_api_url.rstrip("/")
+    return client
+
+
+def clone_zotero_client(zotero_client: Zotero, sessions: HTTPSessions | None = None) -> Zotero:
+    """Create an independent Zotero client for the same library and endpoint.
+
+    Pyzotero clients keep per-request state (last response, pagination links and
+    URL parameters), so they must not be shared between threads. Each worker of
+    a concurrent fetch uses its own clone instead.
+
+    Args:
+        zotero_client: The Pyzotero client to copy.
+        sessions: Optional shared HTTP sessions. If given, the clone sends its
+            requests through their Zotero connection pool instead of opening its
+            own connections.
+
+    Returns:
+        A new Zotero client with the same credentials and endpoint. A
+        `ZoteroSQLiteClient` only serves in-memory data and is returned as is.
+    """
+    if isinstance(zotero_client, ZoteroSQLiteClient):
+        return zotero_client
+    clone = Zotero(
+        library_id=zotero_client.library_id,
+        # Pyzotero stores the pluralised form, e.g. "users" or "groups"
+        library_type=zotero_client.library_type.removesuffix("s"),
+        api_key=zotero_client.api_key,
+        local=zotero_client.local,
+    )
+    clone.endpoint = zotero_client.endpoint
+    if sessions is not None:
+        sessions.attach_zotero_client(clone)
+    return clone
+
+
+def is_library_modified(
+    zotero_client: Zotero,
+    since: int,
+    retry_policy: RetryPolicy | None = None,
+    session: requests.Session | None = None,
+    timeout: tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+) -> bool:
+    """Check whether a Zotero library changed since the given library version.
+
+    Sends a single conditional request (`limit=1`, `format=versions` and
+    `If-Modified-Since-Version`), to which Zotero answers `304 Not Modified` with
+    an empty body when nothing changed.
+
+    Args:
+        zotero_client: Pyzotero client of the library to check.
+        since: Library version from the previous sync.
+        retry_policy: Optional retry policy for rate-limited or transient failures.
+        session: Optional `requests.Session` to send the request with.
+        timeout: (connect, read) timeout of the request in seconds.
+
+    Returns:
+        False if the library is unchanged since `since`, True otherwise (including
+        when the check itself fails, so that a regular sync surfaces the error).
+    """
+    headers = {"Zotero-API-Version": "3", "If-Modified-Since-Version": str(since)}
+    if zotero_client.api_key:
+        headers["Zotero-API-Key"] = zotero_client.api_key
+    retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+    http = session if session is not None else requests
+    try:
+        resp = retry_policy.send(
+            lambda: http.get(
+                url=f"{zotero_client.endpoint}/{zotero_client.library_type}/"
+                f"{zotero_client.library_id}/items",
+                params={"limit": 1, "format": "versions"},
+                headers=headers,
+                timeout=timeout,
+            )
+        )
+    except requests.RequestException as e:
+        print(f"Warning: Could not check the Zotero library version: {type(e).__name__}: {e}")
+        return True
+    return resp.status_code != 304
+
+
+def check_page_size(page_size: int) -> None:
+    """Reject page sizes the Zotero API would silently cap.
+
+    Args:
+        page_size: Requested number of items per page.
+
+    Raises:
+        ValueError: If `page_size` is not between 1 and `ZOTERO_MAX_PAGE_SIZE`.
+    """
+    if not 1 <= page_size <= ZOTERO_MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {ZOTERO_MAX_PAGE_SIZE}")
+
+
+class ZoteroPageFetcher:
+    """Concurrent, offset-based fetcher for Zotero item listings.
+
+    The first page is requested on the given client to learn the total number of
+    matching items from the `Total-Results` response header. The remaining
+    `start=`/`limit=` windows are then requested on a bounded thread pool and
+    yielded in their original order, with at most `2 * max_workers` pages in flight
+    or buffered at any time.
+
+    Attributes:
+        zot: Pyzotero client used for the first page.
+        page_size: Number of items per page (the Zotero API caps it at 100).
+        max_workers: Maximum number of concurrent page requests.
+        retry_policy: Retry policy applied to every page request.
+        sessions: Optional shared HTTP sessions used by the worker clients.
+
+    Example:
+        >>> fetcher = ZoteroPageFetcher(zotero_client, max_workers=8)
+        >>> for page in fetcher.iter_pages(itemType="annotation", since=0):
+        ...     process(page)
+    """
+
+    def __init__(
+        self,
+        zotero_client: Zotero,
+        page_size: int = 100,
+        max_workers: int = 4,
+        retry_policy: RetryPolicy | None = None,
+        sessions: HTTPSessions | None = None,
+    ):
+        """Initialize the fetcher.
+
+        Args:
+            zotero_client: Pyzotero client for the library to list.
+            page_size: Number of items per page, at most `ZOTERO_MAX_PAGE_SIZE`.
+            max_workers: Maximum number of concurrent page requests.
+            retry_policy: Retry policy for page requests. Defaults to a new `RetryPolicy`.
+            sessions: Optional shared HTTP sessions. If given, the worker threads'
+                clients reuse their Zotero connection pool.
+
+        Raises:
+            ValueError: If `page_size` is not between 1 and `ZOTERO_MAX_PAGE_SIZE`.
+        """
+        check_page_size(page_size)
+        self.zot = zotero_client
+        self.page_size = page_size
+        self.max_workers = max(1, max_workers)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.sessions = sessions
+        self._local = threading.local()
+
+    def _worker_client(self) -> Zotero:
+        """Return the calling worker thread's own Zotero client."""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = clone_zotero_client(self.zot, self.sessions)
+        return client
+
+    def _fetch_page(self, start: int, params: dict) -> list[dict]:
+        client = self._worker_client()
+        return self.retry_policy.call_zotero(
+            client, client.items, start=start, limit=self.page_size, **params
+        )
+
+    def iter_pages(self, start: int = 0, **params) -> Iterator[list[dict]]:
+        """Yield pages of items matching the given query parameters, in order.
+
+        Args:
+            start: Offset of the first item to list, e.g. to resume an interrupted listing.
+            **params: Zotero API query parameters, e.g. `itemType` and `since`.
+
+        Yields:
+            Lists of raw Zotero item dictionaries, one per non-empty page.
+        """
+        first_page = self.retry_policy.call_zotero(
+            self.zot, self.zot.items, start=start, limit=self.page_size, **params
+        )
+        total = int(self.zot.request.headers.get("Total-Results", start + len(first_page)))
+        if first_page:
+            yield first_page
+
+        starts = iter(range(start + self.page_size, total, self.page_size))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending: deque[Future] = deque(
+                pool.submit(self._fetch_page, start, params)
+                for start in islice(starts, 2 * self.max_workers)
+            )
+            while pending:
+                page = pending.popleft().result()
+                next_start = next(starts, None)
+                if next_start is not None:
+                    pending.append(pool.submit(self._fetch_page, next_start, params))
+                if page:
+                    yield page
+
+
 class ZoteroAnnotationsNotes:
     """Handler for retrieving and formatting Zotero annotations and notes.
 
     This class manages the formatting of raw Zotero API responses into
     standardized ZoteroItem objects, with support for filtering by color
-    and tags.
+    and tags or by a filter expression (see `zotero2readwise.filters`).
 
     Attributes:
         zot: Pyzotero client instance.
@@ -200,6 +483,9 @@ class ZoteroAnnotationsNotes:
         filter_colors: Hex color codes to filter annotations by.
         filter_tags: Tag names to filter annotations by.
         include_filter_tags: Whether to include filter tags in output.
+        filter_expression: Filter expression items must also match, if any.
+        metadata_cache: Optional persistent cache of document metadata.
+        retry_policy: Retry policy applied to metadata requests.
 
     Example:
         >>> zan = ZoteroAnnotationsNotes(
@@ -216,6 +502,9 @@ class ZoteroAnnotationsNotes:
         filter_colors: Sequence[str],
         filter_tags: Sequence[str],
         include_filter_tags: bool = False,
+        metadata_cache: MetadataCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        filter_expression: str | None = None,
     ):
         """Initialize the ZoteroAnnotationsNotes handler.
 
@@ -224,14 +513,37 @@ class ZoteroAnnotationsNotes:
             filter_colors: Sequence of hex color codes to filter by.
             filter_tags: Sequence of tag names to filter by.
             include_filter_tags: If True, include filter tags in the output items.
+            metadata_cache: Optional persistent cache of document metadata. It is
+                validated against the Zotero library before its first use.
+            retry_policy: Retry policy for metadata requests. Defaults to a new
+                `RetryPolicy`.
+            filter_expression: Optional filter expression, e.g.
+                "color:yellow and not tag:skip", that items must match in addition
+                to `filter_colors` and `filter_tags`.
+
+        Raises:
+            ValueError: If `filter_expression` is malformed.
         """
         self.zot = zotero_client
         self.failed_items: list[dict] = []
         self._cache: dict = {}
         self._parent_mapping: dict = {}
+        self._documents: dict[str, _DocumentFields] = {}
         self.filter_colors: Sequence[str] = filter_colors
         self.filter_tags: Sequence[str] = filter_tags
         self.include_filter_tags: bool = include_filter_tags
+        self.filter_expression = filter_expression
+        # All filters compiled once into one predicate (None if nothing is filtered)
+        self._matches = compile_filter(
+            filter_expression,
+            colors=filter_colors,
+            tags=filter_tags,
+            document_metadata=self.get_item_metadata,
+        )
+        self._excluded_tags = frozenset(filter_tags)
+        self.metadata_cache = metadata_cache
+        self._metadata_cache_ready = metadata_cache is None
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
 
     def get_item_metadata(self, annot: dict) -> dict:
         """Retrieve metadata for an annotation's parent document.
@@ -251,29 +563,90 @@ class ZoteroAnnotationsNotes:
             - creators: List of author names
             - attachment_url: Link to PDF attachment (if available)
         """
+        self._open_metadata_cache()
         data = annot["data"]
         # A Zotero annotation or note must have a parent with parentItem key.
         parent_item_key = data["parentItem"]
 
         if parent_item_key in self._parent_mapping:
             top_item_key = self._parent_mapping[parent_item_key]
-            if top_item_key in self._cache:
-                return self._cache[top_item_key]
+            metadata = self._cached_metadata(top_item_key)
+            if metadata is not None:
+                return metadata
         else:
-            parent_item = self.zot.item(parent_item_key)
+            parent_item = self.retry_policy.call_zotero(self.zot, self.zot.item, parent_item_key)
             top_item_key = parent_item["data"].get("parentItem", None)
-            self._parent_mapping[parent_item_key] = (
-                top_item_key if top_item_key else parent_item_key
+            self._set_parent_mapping(
+                [(parent_item_key, top_item_key if top_item_key else parent_item_key)]
             )
 
         if top_item_key:
-            top_item = self.zot.item(top_item_key)
-            data = top_item["data"]
+            top_item = self.retry_policy.call_zotero(self.zot, self.zot.item, top_item_key)
         else:
             top_item = parent_item
-            data = top_item["data"]
-            top_item_key = data["key"]
+            top_item_key = top_item["data"]["key"]
+
+        metadata = self._build_metadata(top_item)
+        self._store_metadata(top_item_key, top_item, metadata)
+        return metadata
 
+    def invalidate_metadata(self, versions: dict[str, int]) -> None:
+        """Forget cached metadata and parent mappings of items that changed in Zotero.
+
+        Used between incremental syncs by a long-running process, whose caches
+        would otherwise keep serving the old title, tags or creators of a document.
+
+        Args:
+            versions: Mapping of changed Zotero item key to its current version.
+        """
+        for key in versions:
+            self._cache.pop(key, None)
+            self._parent_mapping.pop(key, None)
+        self._documents.clear()
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(versions)
+
+    def _open_metadata_cache(self) -> None:
+        """Validate the persistent metadata cache and load its parent mapping once.
+
+        The cache is marked ready only once validation succeeded, so a failed
+        validation is retried on the next lookup instead of serving stale entries.
+        """
+        if self._metadata_cache_ready:
+            return
+        self.metadata_cache.validate(self.zot, self.retry_policy)
+        for parent_key, top_key in self.metadata_cache.get_parent_mapping().items():
+            self._parent_mapping.setdefault(parent_key, top_key)
+        self._metadata_cache_ready = True
+
+    def _cached_metadata(self, top_item_key: str) -> dict | None:
+        """Look up document metadata in the in-memory, then the persistent cache."""
+        if top_item_key in self._cache:
+            return self._cache[top_item_key]
+        if self.metadata_cache is not None:
+            metadata = self.metadata_cache.get(top_item_key)
+            if metadata is not None:
+                self._cache[top_item_key] = metadata
+                return metadata
+        return None
+
+    def _set_parent_mapping(self, pairs: list[tuple[str, str]]) -> None:
+        """Record (parent key, top-level item key) pairs in memory and on disk."""
+        self._parent_mapping.update(pairs)
+        if self.metadata_cache is not None:
+            self.metadata_cache.put_parent_mapping(pairs)
+
+    def _store_metadata(self, top_item_key: str, top_item: dict, metadata: dict) -> None:
+        """Cache document metadata in memory and, if enabled, on disk."""
+        self._cache[top_item_key] = metadata
+        if self.metadata_cache is not None:
+            version = top_item.get("version", top_item["data"].get("version", 0))
+            self.metadata_cache.put(top_item_key, version, metadata)
+
+    @staticmethod
+    def _build_metadata(top_item: dict) -> dict:
+        """Build the document metadata dictionary from a raw top-level Zotero item."""
+        data = top_item["data"]
         metadata = {
             "title": data["title"],
             # "date": data["date"],
@@ -299,13 +672,90 @@ class ZoteroAnnotationsNotes:
             and top_item["links"]["attachment"]["attachmentType"] == "application/pdf"
         ):
             metadata["attachment_url"] = top_item["links"]["attachment"]["href"]
-
-        self._cache[top_item_key] = metadata
         return metadata
 
+    def _get_items_by_key(self, item_keys: Sequence[str]) -> dict[str, dict]:
+        """Retrieve items with multi-key requests, up to 50 keys per request.
+
+        Batches that fail are skipped with a warning; `get_item_metadata` will
+        fall back to per-item requests for any key that is not resolved here.
+        """
+        items = {}
+        for i in range(0, len(item_keys), ZOTERO_MAX_ITEM_KEYS):
+            batch = item_keys[i : i + ZOTERO_MAX_ITEM_KEYS]
+            try:
+                retrieved = self.retry_policy.call_zotero(
+                    self.zot, self.zot.items, itemKey=",".join(batch), limit=ZOTERO_MAX_ITEM_KEYS
+                )
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"Warning: Failed to prefetch {len(batch)} items: {type(e).__name__}: {e}")
+                continue
+            items.update((item["key"], item) for item in retrieved)
+        return items
+
+    def prefetch_metadata(self, annots: Iterable[dict]) -> None:
+        """Resolve and cache the document metadata of many annotations/notes at once.
+
+        Collects the distinct parent keys of `annots` that are not yet known and
+        resolves them with multi-key requests, then does the same for the top-level
+        items they belong to, skipping documents found in the persistent metadata
+        cache. Afterwards `get_item_metadata` is served from `_parent_mapping` and
+        `_cache` without further API calls.
+
+        Args:
+            annots: Raw Zotero annotation/note dictionaries.
+        """
+        parent_keys = list(
+            dict.fromkeys(
+                annot["data"]["parentItem"]
+                for annot in annots
+                if "parentItem" in annot.get("data", {})
+            )
+        )
+        self._open_metadata_cache()
+        parents = self._get_items_by_key(
+            [key for key in parent_keys if key not in self._parent_mapping]
+        )
+
+        top_items = {}
+        new_mapping = []
+        for parent_key, parent_item in parents.items():
+            top_item_key = parent_item["data"].get("parentItem") or parent_key
+            new_mapping.append((parent_key, top_item_key))
+            if top_item_key == parent_key:
+                top_items[parent_key] = parent_item
+        self._set_parent_mapping(new_mapping)
+
+        missing_top_keys = list(
+            dict.fromkeys(
+                top_item_key
+                for top_item_key in (self._parent_mapping.get(key) for key in parent_keys)
+                if top_item_key
+                and top_item_key not in top_items
+                and self._cached_metadata(top_item_key) is None
+            )
+        )
+        top_items.update(self._get_items_by_key(missing_top_keys))
+
+        for top_item_key, top_item in top_items.items():
+            if self._cached_metadata(top_item_key) is not None:
+                continue
+            try:
+                self._store_metadata(top_item_key, top_item, self._build_metadata(top_item))
+            except KeyError:
+                # Leave malformed items to `get_item_metadata`, which reports the failure
+                # for each affected annotation.
+                continue
+
     def format_item(self, annot: dict) -> ZoteroItem:
         """Format a single Zotero annotation or note into a ZoteroItem.
 
+        Items of the same document share one instance of each document field
+        (title, tags, authors, URLs), and repeated strings such as colors and
+        tags are interned.
+
         Args:
             annot: Raw Zotero annotation/note dictionary from API.
 
@@ -352,95 +802,142 @@ class ZoteroAnnotationsNotes:
         if text == "":
             raise ValueError("No annotation or note data is found.")
 
-        exclude_tags_set = set(self.filter_tags)
-
-        if self.include_filter_tags:
+        if self.include_filter_tags or not self._excluded_tags:
             tags = data["tags"]
         else:
             tags = (
-                [t for t in data["tags"] if t["tag"] not in exclude_tags_set]
+                [t for t in data["tags"] if t["tag"] not in self._excluded_tags]
                 if data["tags"]
                 else data["tags"]
             )
 
-        return ZoteroItem(
+        document = self._document_fields(data["parentItem"], metadata)
+        item = ZoteroItem(
             key=data["key"],
             version=data["version"],
-            item_type=item_type,
+            item_type=_intern(item_type),
             text=text,
             annotated_at=data["dateModified"],
             annotation_url=annot["links"]["alternate"]["href"],
-            attachment_url=metadata["attachment_url"],
+            attachment_url=document.attachment_url,
             comment=comment,
-            title=metadata["title"],
+            title=document.title,
             tags=tags,
-            document_tags=metadata["tags"],
-            document_type=metadata["document_type"],
-            annotation_type=annotation_type,
-            creators=metadata.get("creators"),
-            source_url=metadata["source_url"],
+            document_type=document.document_type,
+            annotation_type=_intern(annotation_type),
+            source_url=document.source_url,
             page_label=data.get("annotationPageLabel"),
-            color=data.get("annotationColor"),
+            color=_intern(data.get("annotationColor")),
             relations=data["relations"],
             sort_index=data.get("annotationSortIndex"),
         )
-
-    def format_items(self, annots: list[dict]) -> list[ZoteroItem]:
+        # Already formatted once for the document, so not passed through __post_init__
+        item.document_tags = document.tags
+        item.creators = document.creators
+        return item
+
+    def _document_fields(self, parent_key: str, metadata: dict) -> _DocumentFields:
+        """Return the shared formatted fields of the document `metadata` describes."""
+        document = self._documents.get(parent_key)
+        if document is None or document.metadata is not metadata:
+            document = _DocumentFields.from_metadata(metadata)
+            self._documents[parent_key] = document
+        return document
+
+    def format_items(
+        self, annots: Iterable[dict], into: "AnnotationStore | None" = None
+    ) -> "list[ZoteroItem] | AnnotationStore":
         """Format multiple Zotero annotations/notes into ZoteroItems.
 
-        Processes each annotation, applying color and tag filters, and handles
-        errors gracefully by adding failed items to the failed_items list.
+        Processes each annotation, applying the color, tag and expression filters
+        (compiled once, see `zotero2readwise.filters`), and handles errors
+        gracefully by adding failed items to the failed_items list.
+        `annots` may be a lazy iterator (e.g. a page-by-page Zotero retrieval),
+        in which case raw items are consumed and released as they are formatted.
 
         Args:
-            annots: List of raw Zotero annotation/note dictionaries.
+            annots: Iterable of raw Zotero annotation/note dictionaries.
+            into: Optional `AnnotationStore` to store the formatted items in
+                instead of a list.
 
         Returns:
-            List of successfully formatted ZoteroItem instances, sorted by
-            title and then by sort_index (reading order within each document).
+            List (or `into`) of successfully formatted ZoteroItem instances,
+            sorted by title and then by sort_index (reading order within each
+            document).
         """
-        formatted_annots = []
+        n_annots = f"{len(annots)} " if isinstance(annots, Sized) else ""
         print(
-            f"ZOTERO: Start formatting {len(annots)} annotations/notes...\n"
+            f"ZOTERO: Start formatting {n_annots}annotations/notes...\n"
             f"It may take some time depending on the number of annotations...\n"
             f"A complete message will show up once it's done!\n"
         )
-        for annot in annots:
-            try:
-                color_condition = (
-                    len(self.filter_colors) == 0
-                    or annot["data"]["annotationColor"] in self.filter_colors
-                )
-                tag_condition = len(self.filter_tags) == 0 or any(
-                    tag["tag"] in self.filter_tags for tag in annot["data"]["tags"]
-                )
-                if color_condition and tag_condition:
-                    formatted_annots.append(self.format_item(annot))
-            except Exception as e:
-                # Store failed item with error details for better debugging
-                failed_item = {
-                    "item": annot,
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                }
-                self.failed_items.append(failed_item)
-                item_key = annot.get("data", {}).get("key", "unknown")
-                print(f"Warning: Failed to format item {item_key}: {type(e).__name__}: {e}")
-                continue
+        n_processed = 0
 
-        # Sort annotations by title (grouping by document) and then by sort_index
-        # (reading order within each document). This ensures highlights appear
-        # in chronological sequence within each document in Readwise.
-        formatted_annots.sort(key=lambda x: (x.title or "", x.sort_index or ""))
+        def count_processed() -> Iterator[dict]:
+            nonlocal n_processed
+            for annot in annots:
+                n_processed += 1
+                yield annot
+
+        formatted_annots = self.format_batch(count_processed(), into=into)
 
         finished_msg = "\nZOTERO: Formatting Zotero Items is completed!!\n\n"
         if self.failed_items:
             finished_msg += (
-                f"\nNOTE: {len(self.failed_items)} Zotero annotations/notes (out of {len(annots)}) failed to format.\n"
+                f"\nNOTE: {len(self.failed_items)} Zotero annotations/notes (out of {n_processed}) failed to format.\n"
                 f"You can run `save_failed_items_to_json()` class method to save those items."
             )
         print(finished_msg)
         return formatted_annots
 
+    def format_batch(
+        self, annots: Iterable[dict], into: "AnnotationStore | None" = None
+    ) -> "list[ZoteroItem] | AnnotationStore":
+        """Format a batch of Zotero annotations/notes without progress messages.
+
+        Used by `format_items` and by callers that format items page by page,
+        such as the pipelined sync in `Zotero2Readwise`.
+
+        Args:
+            annots: Iterable of raw Zotero annotation/note dictionaries.
+            into: Optional `AnnotationStore` to store the formatted items in
+                instead of a list; each item is stored as soon as it is formatted.
+
+        Returns:
+            List (or `into`) of successfully formatted ZoteroItem instances that
+            pass the filters, sorted by title and then by sort_index.
+        """
+        formatted_annots = into if into is not None else []
+        matches = self._matches
+        try:
+            for annot in annots:
+                try:
+                    if matches is None or matches(annot):
+                        formatted_annots.append(self.format_item(annot))
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    # Store failed item with error details for better debugging
+                    failed_item = {
+                        "item": annot,
+                        "error_type": type(e).__name__,
+                        "error_message": str(e),
+                    }
+                    self.failed_items.append(failed_item)
+                    item_key = annot.get("data", {}).get("key", "unknown")
+                    print(f"Warning: Failed to format item {item_key}: {type(e).__name__}: {e}")
+                    continue
+        finally:
+            # Keep the metadata fetched so far even if the run stops early
+            if self.metadata_cache is not None:
+                self.metadata_cache.flush()
+
+        # Sort annotations by title (grouping by document) and then by sort_index
+        # (reading order within each document). This ensures highlights appear
+        # in chronological sequence within each document in Readwise.
+        formatted_annots.sort(key=lambda x: (x.title or "", x.sort_index or ""))
+        return formatted_annots
+
     def save_failed_items_to_json(self, json_filepath_failed_items: str | None = None) -> None:
         """Save failed items to a JSON file for debugging.
 
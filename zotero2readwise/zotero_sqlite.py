@@ -0,0 +1,356 @@
+"""Read-only Zotero backend reading a local `zotero.sqlite` database.
+
+This module provides a drop-in replacement for the subset of the Pyzotero
+client used by Zotero2Readwise. It reads a snapshot copy of the Zotero desktop
+database with a handful of set-based queries and serves items shaped like
+Zotero Web API (v3) responses, so formatting, metadata prefetching and caching
+work unchanged, without rate limits or network round trips.
+
+Classes:
+    ZoteroSQLiteClient: Pyzotero-compatible client backed by a `zotero.sqlite` snapshot.
+"""
+
+import shutil
+import sqlite3
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from zotero2readwise.exception import Zotero2ReadwiseError
+
+# `itemAnnotations.type` values, see Zotero's `Zotero.Annotations.ANNOTATION_TYPE_*`
+ANNOTATION_TYPES = {
+    1: "highlight",
+    2: "note",
+    3: "image",
+    4: "ink",
+    5: "underline",
+    6: "text",
+}
+
+# All items of a library that are not in the trash, with their parent item and
+# the annotation, note and attachment columns of their respective tables.
+_ITEMS_QUERY = """
+SELECT
+    i.itemID, i.key, i.version, i.synced, it.typeName, i.dateAdded, i.dateModified,
+    parent.key AS parentKey,
+    ann.type, ann.text, ann.comment, ann.color, ann.pageLabel, ann.sortIndex,
+    note.note,
+    att.contentType
+FROM items i
+JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
+LEFT JOIN itemAnnotations ann ON ann.itemID = i.itemID
+LEFT JOIN itemNotes note ON note.itemID = i.itemID
+LEFT JOIN itemAttachments att ON att.itemID = i.itemID
+LEFT JOIN items parent
+    ON parent.itemID = COALESCE(ann.parentItemID, note.parentItemID, att.parentItemID)
+WHERE i.libraryID = ? AND i.itemID NOT IN (SELECT itemID FROM deletedItems)
+ORDER BY i.dateAdded, i.itemID
+"""
+
+_FIELDS_QUERY = """
+SELECT d.itemID, f.fieldName, v.value
+FROM itemData d
+JOIN items i ON i.itemID = d.itemID
+JOIN fields f ON f.fieldID = d.fieldID
+JOIN itemDataValues v ON v.valueID = d.valueID
+WHERE i.libraryID = ?
+"""
+
+_CREATORS_QUERY = """
+SELECT ic.itemID, ct.creatorType, c.firstName, c.lastName, c.fieldMode
+FROM itemCreators ic
+JOIN items i ON i.itemID = ic.itemID
+JOIN creators c ON c.creatorID = ic.creatorID
+JOIN creatorTypes ct ON ct.creatorTypeID = ic.creatorTypeID
+WHERE i.libraryID = ?
+ORDER BY ic.itemID, ic.orderIndex
+"""
+
+_TAGS_QUERY = """
+SELECT it.itemID, t.name, it.type
+FROM itemTags it
+JOIN items i ON i.itemID = it.itemID
+JOIN tags t ON t.tagID = it.tagID
+WHERE i.libraryID = ?
+ORDER BY it.itemID, t.name
+"""
+
+_RELATIONS_QUERY = """
+SELECT r.itemID, p.predicate, r.object
+FROM itemRelations r
+JOIN items i ON i.itemID = r.itemID
+JOIN relationPredicates p ON p.predicateID = r.predicateID
+WHERE i.libraryID = ?
+"""
+
+# Keys of items deleted locally whose deletion was not yet synced to zotero.org
+# (Zotero empties this log once the server acknowledged the deletions)
+_DELETED_QUERY = """
+SELECT d.key
+FROM syncDeleteLog d
+JOIN syncObjectTypes t ON t.syncObjectTypeID = d.syncObjectTypeID
+WHERE t.name = 'item' AND d.libraryID = ?
+"""
+
+
+@dataclass
+class _Response:
+    """Stand-in for the last HTTP response that Pyzotero exposes as `request`."""
+
+    status_code: int = 200
+    headers: dict = field(default_factory=dict)
+
+
+class ZoteroSQLiteClient:
+    """Pyzotero-compatible, read-only client backed by a `zotero.sqlite` snapshot.
+
+    Zotero desktop keeps its database locked while running, so the database file
+    is first copied to a temporary directory. The whole library is then loaded with
+    a few set-based queries and the snapshot is deleted. Only the calls used by
+    Zotero2Readwise are implemented: `items`, `item`, `everything`,
+    `last_modified_version`, `item_versions` and `deleted`.
+
+    Items modified locally but not yet synced are treated as newer than any
+    `since` version, since their synced `version` is stale.
+
+    Attributes:
+        path: Location of the original `zotero.sqlite` file.
+        library_id: Zotero user or group ID, used to build item URLs.
+        library_type: Pluralised library type ("users" or "groups"), as in Pyzotero.
+        endpoint: Base URL used for attachment links, as in Pyzotero.
+        request: Metadata of the last call (`Total-Results` and
+            `Last-Modified-Version` headers), as in Pyzotero.
+
+    Example:
+        >>> zot = ZoteroSQLiteClient("~/Zotero/zotero.sqlite", library_id="123456")
+        >>> annotations = zot.everything(zot.items(itemType="annotation"))
+    """
+
+    def __init__(self, path: str | Path, library_id: str, library_type: str = "user"):
+        """Snapshot the database and load the library.
+
+        Args:
+            path: Location of `zotero.sqlite` (usually in the Zotero data directory).
+            library_id: Zotero user ID (for "user") or group ID (for "group").
+            library_type: Either "user" or "group".
+
+        Raises:
+            ValueError: If `library_type` is neither "user" nor "group".
+            Zotero2ReadwiseError: If the database or the library cannot be read.
+        """
+        if library_type not in ["user", "group"]:
+            raise ValueError("library_type value can either be 'user' or 'group'.")
+        self.path = Path(path).expanduser()
+        self.library_id = str(library_id)
+        self.library_type = f"{library_type}s"
+        self.endpoint = "https://api.zotero.org"
+        self.request = _Response()
+        self._items: dict[str, dict] = {}
+        self._unsynced: set[str] = set()
+        self._deleted: list[str] = []
+        self._library_version = 0
+        with tempfile.TemporaryDirectory(prefix="zotero2readwise-") as snapshot_dir:
+            conn = sqlite3.connect(self._snapshot(Path(snapshot_dir)))
+            try:
+                self._load(conn)
+            except sqlite3.Error as e:
+                raise Zotero2ReadwiseError(
+                    f"Could not read the Zotero database {self.path}: {e}"
+                ) from e
+            finally:
+                conn.close()
+
+    def _snapshot(self, snapshot_dir: Path) -> Path:
+        """Copy the database (and its write-ahead log, if any) to `snapshot_dir`."""
+        if not self.path.is_file():
+            raise Zotero2ReadwiseError(f"Zotero database {self.path} does not exist.")
+        snapshot = snapshot_dir / self.path.name
+        shutil.copyfile(self.path, snapshot)
+        wal = self.path.with_name(self.path.name + "-wal")
+        if wal.is_file():
+            shutil.copyfile(wal, snapshot.with_name(wal.name))
+        return snapshot
+
+    def _library(self, conn: sqlite3.Connection) -> tuple[int, int]:
+        """Return the local `libraryID` and the library version of the configured library."""
+        if self.library_type == "users":
+            row = conn.execute(
+                "SELECT libraryID, version FROM libraries WHERE type = 'user'"
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT l.libraryID, l.version FROM groups g "
+                "JOIN libraries l ON l.libraryID = g.libraryID WHERE g.groupID = ?",
+                (int(self.library_id),),
+            ).fetchone()
+        if row is None:
+            raise Zotero2ReadwiseError(
+                f"No {self.library_type[:-1]} library {self.library_id} in {self.path}."
+            )
+        return row
+
+    def _load(self, conn: sqlite3.Connection) -> None:
+        """Build Web-API-shaped items for the whole library from set-based queries."""
+        library_id, self._library_version = self._library(conn)
+        self._deleted = [key for (key,) in conn.execute(_DELETED_QUERY, (library_id,))]
+
+        fields: defaultdict[int, dict] = defaultdict(dict)
+        for item_id, name, value in conn.execute(_FIELDS_QUERY, (library_id,)):
+            fields[item_id][name] = value
+        creators: defaultdict[int, list] = defaultdict(list)
+        for item_id, creator_type, first, last, field_mode in conn.execute(
+            _CREATORS_QUERY, (library_id,)
+        ):
+            creator = {"creatorType": creator_type}
+            if field_mode == 1:
+                creator["name"] = last
+            else:
+                creator.update(firstName=first, lastName=last)
+            creators[item_id].append(creator)
+        tags: defaultdict[int, list] = defaultdict(list)
+        for item_id, name, tag_type in conn.execute(_TAGS_QUERY, (library_id,)):
+            tags[item_id].append({"tag": name, "type": tag_type} if tag_type else {"tag": name})
+        relations: defaultdict[int, dict] = defaultdict(dict)
+        for item_id, predicate, obj in conn.execute(_RELATIONS_QUERY, (library_id,)):
+            relations[item_id].setdefault(predicate, []).append(obj)
+
+        pdf_attachments: dict[str, str] = {}
+        conn.row_factory = sqlite3.Row
+        for row in conn.execute(_ITEMS_QUERY, (library_id,)):
+            item_id, key, item_type = row["itemID"], row["key"], row["typeName"]
+            data = {
+                "key": key,
+                "version": row["version"],
+                "itemType": item_type,
+                **fields.get(item_id, {}),
+                "tags": tags.get(item_id, []),
+                "relations": {
+                    p: objs[0] if len(objs) == 1 else objs
+                    for p, objs in relations.get(item_id, {}).items()
+                },
+                "dateAdded": _iso_date(row["dateAdded"]),
+                "dateModified": _iso_date(row["dateModified"]),
+            }
+            parent_key = row["parentKey"]
+            if parent_key:
+                data["parentItem"] = parent_key
+            if item_type == "annotation":
+                data.update(
+                    annotationType=ANNOTATION_TYPES.get(row["type"], str(row["type"])),
+                    annotationText=row["text"] or "",
+                    annotationComment=row["comment"] or "",
+                    annotationColor=row["color"],
+                    annotationPageLabel=row["pageLabel"],
+                    annotationSortIndex=row["sortIndex"],
+                )
+            elif item_type == "note":
+                data["note"] = row["note"] or ""
+            elif item_type == "attachment":
+                data["contentType"] = row["contentType"]
+                if parent_key and row["contentType"] == "application/pdf":
+                    # Like the Web API, link a parent to its oldest PDF attachment
+                    pdf_attachments.setdefault(parent_key, key)
+            else:
+                data["creators"] = creators.get(item_id, [])
+            if not row["synced"]:
+                self._unsynced.add(key)
+            self._items[key] = {
+                "key": key,
+                "version": row["version"],
+                "links": {"alternate": {"href": self._web_url(key)}},
+                "data": data,
+            }
+
+        for parent_key, attachment_key in pdf_attachments.items():
+            if parent_key in self._items:
+                self._items[parent_key]["links"]["attachment"] = {
+                    "href": f"{self.endpoint}/{self.library_type}/{self.library_id}/items/"
+                    f"{attachment_key}",
+                    "type": "application/json",
+                    "attachmentType": "application/pdf",
+                }
+
+    def _web_url(self, key: str) -> str:
+        return f"https://www.zotero.org/{self.library_type}/{self.library_id}/items/{key}"
+
+    def _is_newer(self, key: str, since: int) -> bool:
+        return self._items[key]["version"] > since or key in self._unsynced
+
+    def _respond(
+        self, items: list[dict], total: int | None = None, status_code: int = 200
+    ) -> list[dict]:
+        self.request = _Response(
+            status_code=status_code,
+            headers={
+                "Total-Results": str(len(items) if total is None else total),
+                "Last-Modified-Version": str(self._library_version),
+            },
+        )
+        return items
+
+    def items(self, **params) -> list[dict]:
+        """List items like `GET /items` of the Web API.
+
+        Supported parameters: `itemType`, `since`, `itemKey` (comma-separated),
+        `tag` (alternatives separated by " || "), `start` and `limit`. Without
+        `limit`, all matching items are returned.
+        """
+        if "itemKey" in params:
+            keys = [key for key in params["itemKey"].split(",") if key in self._items]
+        else:
+            keys = list(self._items)
+        if "itemType" in params:
+            keys = [k for k in keys if self._items[k]["data"]["itemType"] == params["itemType"]]
+        if params.get("since"):
+            since = int(params["since"])
+            keys = [k for k in keys if self._is_newer(k, since)]
+        if "tag" in params:
+            wanted = set(params["tag"].split(" || "))
+            keys = [k for k in keys if wanted & {t["tag"] for t in self._items[k]["data"]["tags"]}]
+        start = int(params.get("start", 0))
+        limit = params.get("limit")
+        end = None if limit is None else start + int(limit)
+        return self._respond([self._items[k] for k in keys[start:end]], total=len(keys))
+
+    def item(self, key: str) -> dict:
+        """Return a single item like `GET /items/<key>` of the Web API.
+
+        Raises:
+            KeyError: If the library has no (non-deleted) item with this key.
+        """
+        if key not in self._items:
+            self._respond([], total=0, status_code=404)
+            raise KeyError(f"Item {key} is not in the local Zotero library.")
+        return self._respond([self._items[key]])[0]
+
+    def everything(self, query: list[dict]) -> list[dict]:
+        """Return `query` unchanged; `items` without `limit` already returns all items."""
+        return query
+
+    def last_modified_version(self) -> int:
+        """Return the library version of the last sync with zotero.org."""
+        return self._library_version
+
+    def item_versions(self, since: int = 0) -> dict[str, int]:
+        """Return a mapping of item key to version for items newer than `since`."""
+        return {
+            key: item["version"]
+            for key, item in self._items.items()
+            if not since or self._is_newer(key, since)
+        }
+
+    def deleted(self, since: int = 0) -> dict[str, list[str]]:
+        """Return deleted item keys like `GET /deleted` of the Web API.
+
+        The local database only knows deletions not yet synced to zotero.org, so
+        these are returned for any `since`; deletions that were already synced are
+        only visible through the Web API.
+        """
+        return {"items": list(self._deleted)}
+
+
+def _iso_date(value: str | None) -> str | None:
+    """Convert a Zotero database timestamp ("YYYY-MM-DD HH:MM:SS", UTC) to ISO 8601."""
+    return f"{value.replace(' ', 'T')}Z" if value else value
@@ -13,13 +13,37 @@ Example:
     >>> zt_rw.run()
 """
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain
 
+from pyzotero.zotero import Zotero
+
+from zotero2readwise.cache import MetadataCache
+from zotero2readwise.checkpoint import UPLOADING, SyncCheckpoint, sync_signature
+from zotero2readwise.columnar import AnnotationStore
+from zotero2readwise.deadline import Deadline
+from zotero2readwise.exception import DeadlineExceeded, Zotero2ReadwiseError
+from zotero2readwise.ledger import UploadLedger
+from zotero2readwise.pipeline import Pipeline, StageOutput
 from zotero2readwise.readwise import Readwise
+from zotero2readwise.retry import RetryPolicy
+from zotero2readwise.session import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    HTTPSessions,
+)
 from zotero2readwise.zotero import (
+    LOCAL_FETCH_WORKERS,
     ZoteroAnnotationsNotes,
+    ZoteroItem,
+    ZoteroPageFetcher,
+    check_page_size,
+    clone_zotero_client,
     get_zotero_client,
 )
+from zotero2readwise.zotero_sqlite import ZoteroSQLiteClient
 
 
 class Zotero2Readwise:
@@ -32,12 +56,33 @@ class Zotero2Readwise:
 
     Attributes:
         readwise: Readwise client instance for uploading highlights.
-        zotero_client: Pyzotero client instance for Zotero API access.
+        zotero_client: Pyzotero client instance for Zotero Web or local API access
+            (or a `ZoteroSQLiteClient` reading a local database).
         zotero: ZoteroAnnotationsNotes instance for formatting Zotero items.
         include_annots: Whether to include annotations in sync.
         include_notes: Whether to include notes in sync.
-        since: Unix timestamp to filter items modified after this time.
+        filter_tags: Tags pushed down to the Zotero query; see `ZoteroAnnotationsNotes`.
+        since: Zotero library version to retrieve items modified after, either one
+            for all item types or a mapping of item type to version.
         write_failures: Whether to save failed items to JSON files.
+        failed_items_path: File name the Zotero items that failed to format are
+            saved to (in `FAILED_ITEMS_DIR`).
+        stream: Whether to retrieve Zotero items lazily, page by page.
+        columnar: Whether formatted items are held in an `AnnotationStore`.
+        page_size: Number of items requested per Zotero API page when streaming.
+        fetch_workers: Number of Zotero API pages fetched concurrently.
+        retry_policy: Retry policy shared by all Readwise and Zotero requests.
+        sessions: Pooled HTTP sessions shared by all Readwise and Zotero requests.
+        pipeline: Whether fetching, formatting and uploading run as overlapping stages.
+        pipeline_queue_size: Number of pages buffered between two pipeline stages.
+        deleted_keys: Keys of Zotero items deleted since `since`, found by the last
+            retrieval of an incremental sync.
+        checkpoint: Optional record of the progress of `run`, from which an
+            interrupted sync is resumed.
+        library_version: Zotero library version captured when the last run started
+            fetching (for a resumed checkpoint, when the interrupted run did), i.e.
+            the version the next incremental sync should start from. None until a
+            run fetched items from Zotero.
 
     Example:
         >>> zt_rw = Zotero2Readwise(
@@ -61,9 +106,32 @@ class Zotero2Readwise:
         filter_colors: Sequence[str] = (),
         filter_tags: Sequence[str] = (),
         include_filter_tags: bool = False,
-        since: int = 0,
+        since: int | Mapping[str, int] = 0,
         write_failures: bool = True,
         custom_tag: str | None = None,
+        stream: bool = False,
+        page_size: int = 100,
+        fetch_workers: int | None = None,
+        metadata_cache_path: str | None = None,
+        metadata_cache_size: int = 10_000,
+        readwise_batch_size: int = 500,
+        readwise_max_batch_bytes: int = 2_000_000,
+        readwise_upload_workers: int = 1,
+        max_retries: int = 5,
+        upload_ledger_path: str | None = None,
+        pipeline: bool = False,
+        pipeline_queue_size: int = 4,
+        zotero_sqlite_path: str | None = None,
+        zotero_local_api_url: str | None = None,
+        http_pool_size: int | None = None,
+        http_keepalive: float = DEFAULT_KEEPALIVE_EXPIRY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        checkpoint_path: str | None = None,
+        retry_policy: RetryPolicy | None = None,
+        sessions: HTTPSessions | None = None,
+        columnar: bool = False,
+        filter_expression: str | None = None,
     ):
         """Initialize the Zotero2Readwise synchronizer.
 
@@ -77,23 +145,155 @@ class Zotero2Readwise:
             filter_colors: Only include annotations with these highlight colors (hex codes).
             filter_tags: Only include annotations with these tags.
             include_filter_tags: If True, include filter tags in the synced items.
-            since: Unix timestamp; only sync items modified after this time.
+            since: Zotero library version; only sync items modified after it. A mapping
+                of item type ("annotation", "note") to version gives each item type
+                its own version (0 for missing item types).
             write_failures: If True, save failed items to JSON files for debugging.
             custom_tag: Optional custom tag to add to all Readwise highlights.
+            stream: If True, Zotero items are retrieved page by page and formatted as
+                they arrive instead of being collected into one list first.
+            page_size: Number of items per Zotero API page (the API caps it at 100).
+            fetch_workers: If greater than 1, Zotero item listings are fetched with up to
+                this many concurrent page requests instead of following `next` links.
+                Defaults to 1 for the Web API and `LOCAL_FETCH_WORKERS` for the local API.
+            metadata_cache_path: Optional path of a SQLite file used to persist document
+                metadata across runs. Entries are invalidated by Zotero item version.
+            metadata_cache_size: Maximum number of documents kept in the metadata cache.
+            readwise_batch_size: Maximum number of highlights per Readwise upload request.
+            readwise_max_batch_bytes: Maximum serialized size of one Readwise upload request.
+            readwise_upload_workers: Maximum number of concurrent Readwise upload requests.
+            max_retries: Maximum number of retries of a rate-limited or transiently
+                failing Readwise or Zotero request.
+            upload_ledger_path: Optional path of a SQLite file recording which
+                highlights were uploaded, so unchanged highlights are not re-posted.
+            pipeline: If True, `run` fetches Zotero pages, formats them and uploads
+                Readwise chunks on concurrent stages connected by bounded queues.
+            pipeline_queue_size: Maximum number of pages (fetched or formatted)
+                buffered between two pipeline stages.
+            zotero_sqlite_path: Optional path of a local `zotero.sqlite` database. If
+                given, Zotero items are read from a snapshot of it instead of the Web
+                API, and `zotero_key` is not used.
+            zotero_local_api_url: Optional base URL of the Zotero 7 local API (see
+                `ZOTERO_LOCAL_API_URL`). If given, Zotero items are requested from the
+                running Zotero desktop app instead of the Web API, and `zotero_key` is
+                not used.
+            http_pool_size: Maximum number of connections kept open per host. Defaults
+                to `DEFAULT_POOL_SIZE`, or more if more fetch or upload workers run.
+            http_keepalive: Seconds an idle Zotero connection is kept open.
+            connect_timeout: Seconds every Readwise and Zotero request waits for a
+                connection to be established.
+            read_timeout: Seconds every Readwise and Zotero request waits for data.
+            checkpoint_path: Optional path of a SQLite file recording the progress of
+                `run` (fetched pages, then formatted items not yet uploaded), so that
+                an interrupted sync resumes where it stopped. Not supported together
+                with `stream` or `pipeline`.
+            retry_policy: Optional retry policy for all Readwise and Zotero requests,
+                e.g. one scheduled fairly with other libraries' (see `FairScheduler`).
+                If given, `max_retries` is not used.
+            sessions: Optional HTTP sessions to share with other synchronizers. If
+                given, `http_pool_size`, `http_keepalive`, `connect_timeout` and
+                `read_timeout` are not used.
+            columnar: If True, `run` retrieves Zotero items page by page and keeps the
+                formatted items in a compact `AnnotationStore` instead of a list of
+                `ZoteroItem`s until they are uploaded. Not supported with `pipeline`,
+                which does not hold all items at once anyway.
+            filter_expression: Optional filter expression items must match in
+                addition to `filter_colors` and `filter_tags`, e.g.
+                "(color:yellow or tag:important) and not doctype:book" (see
+                `zotero2readwise.filters`).
+
+        Raises:
+            ValueError: If `checkpoint_path` is combined with `stream` or `pipeline`,
+                `columnar` with `pipeline`, if `page_size` exceeds the API's maximum
+                of `ZOTERO_MAX_PAGE_SIZE`, or if `filter_expression` is malformed.
         """
-        self.readwise = Readwise(readwise_token, custom_tag=custom_tag)
-        self.zotero_client = get_zotero_client(
-            library_id=zotero_library_id,
-            library_type=zotero_library_type,
-            api_key=zotero_key,
+        if checkpoint_path and (stream or pipeline):
+            raise ValueError("checkpoint_path cannot be combined with stream or pipeline")
+        if columnar and pipeline:
+            raise ValueError("columnar cannot be combined with pipeline")
+        check_page_size(page_size)
+        if fetch_workers is None:
+            fetch_workers = LOCAL_FETCH_WORKERS if zotero_local_api_url else 1
+        if sessions is None:
+            if http_pool_size is None:
+                http_pool_size = max(DEFAULT_POOL_SIZE, fetch_workers, readwise_upload_workers)
+            sessions = HTTPSessions(
+                pool_size=http_pool_size,
+                keepalive_expiry=http_keepalive,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+            )
+        self.sessions = sessions
+        self.retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy(max_retries=max_retries)
+        )
+        self.checkpoint = SyncCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.readwise = Readwise(
+            readwise_token,
+            custom_tag=custom_tag,
+            batch_size=readwise_batch_size,
+            max_batch_bytes=readwise_max_batch_bytes,
+            upload_workers=readwise_upload_workers,
+            retry_policy=self.retry_policy,
+            ledger=UploadLedger(upload_ledger_path) if upload_ledger_path else None,
+            session=self.sessions.session,
+            timeout=self.sessions.timeout,
+            checkpoint=self.checkpoint,
+        )
+        if zotero_sqlite_path:
+            self.zotero_client = ZoteroSQLiteClient(
+                zotero_sqlite_path, library_id=zotero_library_id, library_type=zotero_library_type
+            )
+        elif zotero_local_api_url:
+            self.zotero_client = get_zotero_client(
+                library_id=zotero_library_id,
+                library_type=zotero_library_type,
+                local_api_url=zotero_local_api_url,
+            )
+        else:
+            self.zotero_client = get_zotero_client(
+                library_id=zotero_library_id,
+                library_type=zotero_library_type,
+                api_key=zotero_key,
+            )
+        self.sessions.attach_zotero_client(self.zotero_client)
+        metadata_cache = (
+            MetadataCache(metadata_cache_path, max_entries=metadata_cache_size)
+            if metadata_cache_path
+            else None
         )
         self.zotero = ZoteroAnnotationsNotes(
-            self.zotero_client, filter_colors, filter_tags, include_filter_tags
+            self.zotero_client,
+            filter_colors,
+            filter_tags,
+            include_filter_tags,
+            metadata_cache=metadata_cache,
+            retry_policy=self.retry_policy,
+            filter_expression=filter_expression,
         )
+        self.filter_tags = tuple(filter_tags)
         self.include_annots = include_annotations
         self.include_notes = include_notes
         self.since = since
         self.write_failures = write_failures
+        self.failed_items_path = "failed_zotero_items.json"
+        self.stream = stream
+        self.columnar = columnar
+        self.page_size = page_size
+        self.fetch_workers = fetch_workers
+        self.pipeline = pipeline
+        self.pipeline_queue_size = pipeline_queue_size
+        self.deleted_keys: list[str] = []
+        self.library_version: int | None = None
+        self._checkpoint_settings = {
+            "library": [zotero_library_type, str(zotero_library_id)],
+            "annotations": include_annotations,
+            "notes": include_notes,
+            "filter_colors": list(filter_colors),
+            "filter_tags": list(filter_tags),
+            "include_filter_tags": include_filter_tags,
+            "filter_expression": filter_expression,
+        }
 
     def get_all_zotero_items(self) -> list[dict]:
         """
@@ -101,40 +301,260 @@ class Zotero2Readwise:
 
         Returns:
         A list of dictionaries representing the retrieved Zotero items.
+        For an incremental sync, the keys of items deleted since then are stored
+        in `deleted_keys`.
         """
+        self.deleted_keys = self.get_deleted_zotero_keys()
         items = []
         if self.include_annots:
-            items.extend(self.retrieve_all("annotation", self.since))
+            items.extend(self.retrieve_all("annotation", self.since_for("annotation")))
 
         if self.include_notes:
-            items.extend(self.retrieve_all("note", self.since))
+            items.extend(self.retrieve_all("note", self.since_for("note")))
 
         print(f"{len(items)} Zotero items are retrieved.")
 
         return items
 
-    def run(self, zot_annots_notes: list[dict] | None = None) -> None:
+    def iter_all_zotero_items(self) -> Iterator[dict]:
+        """Lazily yield Zotero items of the specified types (notes and/or annotations).
+
+        Unlike `get_all_zotero_items`, only one API page is held in memory at a
+        time, so downstream formatting can start as soon as the first page arrives.
+        The parent document metadata of each page is prefetched before it is yielded.
+
+        Yields:
+            Dictionaries representing the retrieved Zotero items.
+        """
+        for page in self._iter_item_pages():
+            self.zotero.prefetch_metadata(page)
+            yield from page
+
+    def _iter_item_pages(self, zotero_client: Zotero | None = None) -> Iterator[list[dict]]:
+        """Yield pages of Zotero items of the specified types (notes and/or annotations)."""
+        self.deleted_keys = self.get_deleted_zotero_keys(zotero_client)
+        n_items = 0
+        item_types = [
+            item_type
+            for item_type, included in (
+                ("annotation", self.include_annots),
+                ("note", self.include_notes),
+            )
+            if included
+        ]
+        for item_type in item_types:
+            for page in self.iter_pages(
+                item_type, self.since_for(item_type), zotero_client=zotero_client
+            ):
+                n_items += len(page)
+                yield page
+
+        print(f"{n_items} Zotero items are retrieved.")
+
+    def since_for(self, item_type: str) -> int:
+        """Return the library version items of `item_type` are retrieved since."""
+        if isinstance(self.since, Mapping):
+            return self.since.get(item_type, 0)
+        return self.since
+
+    def get_deleted_zotero_keys(self, zotero_client: Zotero | None = None) -> list[str]:
+        """Retrieve the keys of Zotero items deleted since `since`.
+
+        With a version per item type, deletions since the oldest version of the
+        synced item types are retrieved.
+
+        Args:
+            zotero_client: Client to query. Defaults to `zotero_client`.
+
+        Returns:
+            The deleted item keys; empty for a full sync (`since` is 0) or if the
+            query fails, in which case a warning is printed.
+        """
+        included = [("annotation", self.include_annots), ("note", self.include_notes)]
+        since = min((self.since_for(item_type) for item_type, on in included if on), default=0)
+        if not since:
+            return []
+        zot = zotero_client if zotero_client is not None else self.zotero_client
+        try:
+            deleted = self.retry_policy.call_zotero(zot, zot.deleted, since=since)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Warning: Could not retrieve deleted Zotero items: {type(e).__name__}: {e}")
+            return []
+        return list(deleted.get("items", []))
+
+    def run(
+        self, zot_annots_notes: Iterable[dict] | None = None, deadline: Deadline | None = None
+    ) -> None:
         """Execute the synchronization process.
 
         This method orchestrates the full sync workflow:
         1. Retrieves Zotero items (if not provided)
-        2. Formats items into ZoteroItem objects
-        3. Saves any failed items to JSON (if write_failures is True)
-        4. Uploads formatted items to Readwise
+        2. Prefetches the parent document metadata of all items in batches
+        3. Formats items into ZoteroItem objects
+        4. Saves any failed items to JSON (if write_failures is True)
+        5. Uploads formatted items to Readwise
+        6. Deletes the Readwise highlights of Zotero items deleted since `since`
+
+        With a `checkpoint`, steps 1 to 3 record their progress, and a run that
+        finds the checkpoint of an interrupted run of the same sync continues from
+        it: fetched pages are not requested again, and once formatting completed,
+        only the formatted items not yet acknowledged by Readwise are uploaded. The
+        checkpoint is cleared when the upload completes. If chunks failed, their
+        items stay in the checkpoint for one more attempt by the next run.
 
         Args:
-            zot_annots_notes: Optional list of raw Zotero annotation/note dictionaries.
+            zot_annots_notes: Optional iterable of raw Zotero annotation/note dictionaries.
                 If not provided, items will be retrieved from Zotero API.
+            deadline: Optional deadline of the run, checked before every Readwise and
+                Zotero request (see `RetryPolicy`).
+
+        Raises:
+            DeadlineExceeded: If the deadline passed before the sync finished. Upload
+                chunks acknowledged until then are recorded in the upload ledger (and
+                the checkpoint) and failed items are saved as usual, so a later run
+                can pick up from there.
         """
-        if zot_annots_notes is None:
-            zot_annots_notes = self.get_all_zotero_items()
+        if zot_annots_notes is None and self.pipeline:
+            self.run_pipeline(deadline)
+            return
+
+        self.retry_policy.deadline = deadline
+
+        resumed_upload = False
+        if zot_annots_notes is None and self.checkpoint is not None:
+            formatted_items, resumed_upload = self._checkpointed_items()
+        else:
+            if zot_annots_notes is None:
+                self.library_version = self._last_modified_version()
+                # Raw items are not kept either when formatted items are columnar
+                zot_annots_notes = (
+                    self.iter_all_zotero_items()
+                    if self.stream or self.columnar
+                    else self.get_all_zotero_items()
+                )
 
-        formatted_items = self.zotero.format_items(zot_annots_notes)
+            if isinstance(zot_annots_notes, Sequence):
+                self.zotero.prefetch_metadata(zot_annots_notes)
+
+            formatted_items = self._format_items(zot_annots_notes)
 
         if self.write_failures and self.zotero.failed_items:
-            self.zotero.save_failed_items_to_json("failed_zotero_items.json")
+            self.zotero.save_failed_items_to_json(self.failed_items_path)
+
+        try:
+            self.readwise.post_zotero_annotations_to_readwise(formatted_items)
+        except DeadlineExceeded:
+            raise
+        except Zotero2ReadwiseError:
+            # Items of failed chunks stay pending for one retry by the next run
+            if resumed_upload:
+                self.checkpoint.clear()
+            raise
+        else:
+            if self.checkpoint is not None:
+                self.checkpoint.clear()
+        finally:
+            self._delete_removed_highlights()
+            self._report_retries()
+
+    def _format_items(self, items: Iterable[dict]) -> Sequence[ZoteroItem]:
+        """Format raw Zotero items into a list, or an `AnnotationStore` if `columnar`."""
+        if self.columnar:
+            return self.zotero.format_items(items, into=AnnotationStore())
+        return self.zotero.format_items(items)
+
+    def _checkpointed_items(self) -> tuple[Sequence[ZoteroItem], bool]:
+        """Fetch and format Zotero items, resuming from and recording to `checkpoint`.
+
+        Returns:
+            The formatted items to upload, and whether they are the pending items
+            of an interrupted upload.
+        """
+        signature = sync_signature(since=self.since, **self._checkpoint_settings)
+        resumed = self.checkpoint.begin(signature, self._last_modified_version())
+        self.library_version = self.checkpoint.library_version
+        if self.checkpoint.stage == UPLOADING:
+            items = self.checkpoint.pending_items()
+            print(f"Resuming the upload of {len(items)} Zotero items from the checkpoint.")
+            self.deleted_keys = self.get_deleted_zotero_keys()
+            return items, True
+        if resumed:
+            print("Resuming the retrieval of Zotero items from the checkpoint.")
 
-        self.readwise.post_zotero_annotations_to_readwise(formatted_items)
+        items = self.get_all_zotero_items()
+        self.zotero.prefetch_metadata(items)
+        formatted_items = self._format_items(items)
+        self.checkpoint.save_formatted(formatted_items)
+        return formatted_items, False
+
+    def run_pipeline(self, deadline: Deadline | None = None) -> None:
+        """Execute the synchronization process as a pipeline of overlapping stages.
+
+        Zotero pages are fetched on one thread (with its own Zotero client), the
+        metadata of each page is prefetched and the page formatted on a second
+        thread, and the formatted items are converted and uploaded in chunks on the
+        calling thread, all at the same time. At most `pipeline_queue_size` pages
+        are buffered between two stages.
+
+        Args:
+            deadline: Optional deadline of the run; see `run`.
+        """
+        self.retry_policy.deadline = deadline
+        self.library_version = self._last_modified_version()
+        fetch_client = clone_zotero_client(self.zotero_client, self.sessions)
+        try:
+            with Pipeline(queue_size=self.pipeline_queue_size) as pipeline:
+                pages = pipeline.stage(self._iter_item_pages(fetch_client), name="zotero-fetch")
+                formatted = pipeline.stage(self._format_pages(pages), name="zotero-format")
+                self.readwise.post_zotero_annotations_to_readwise(chain.from_iterable(formatted))
+        finally:
+            if self.write_failures and self.zotero.failed_items:
+                self.zotero.save_failed_items_to_json(self.failed_items_path)
+            self._delete_removed_highlights()
+            self._report_retries()
+
+    def _last_modified_version(self) -> int:
+        """Return the current Zotero library version, captured before items are fetched.
+
+        Items modified while a run is fetching get a later version, so an
+        incremental sync starting from this version retrieves them again.
+        """
+        zot = self.zotero_client
+        return self.retry_policy.call_zotero(zot, zot.last_modified_version)
+
+    def _format_pages(self, pages: StageOutput[list[dict]]) -> Iterator[list[ZoteroItem]]:
+        """Prefetch the document metadata of pages, then format them page by page.
+
+        Pages that are already waiting in the queue when a page arrives are
+        prefetched together, so a backlog costs fewer metadata requests.
+        """
+        for page in pages:
+            batch = [page, *pages.ready()]
+            self.zotero.prefetch_metadata([annot for page in batch for annot in page])
+            for page in batch:
+                yield self.zotero.format_batch(page)
+
+    def _delete_removed_highlights(self) -> None:
+        """Delete the Readwise highlights of the items in `deleted_keys`, if possible."""
+        if not self.deleted_keys:
+            return
+        if self.readwise.ledger is None:
+            print(
+                f"{len(self.deleted_keys)} Zotero items were deleted since the last sync. "
+                f"Use an upload ledger to delete their highlights from Readwise as well."
+            )
+            return
+        self.readwise.delete_highlights(self.deleted_keys)
+
+    def _report_retries(self) -> None:
+        """Print how many requests were retried, if any."""
+        if self.retry_policy.retries:
+            print(
+                f"{self.retry_policy.retries} requests were retried "
+                f"({self.retry_policy.sleep_seconds:.1f}s spent waiting)."
+            )
 
     def retrieve_all(self, item_type: str, since: int = 0):
         """
@@ -144,9 +564,105 @@ class Zotero2Readwise:
             item_type (str): Either "annotation" or "note".
             since (int): Timestamp in seconds since the Unix epoch. Defaults to 0.
 
+        With a `checkpoint`, every page is recorded as it arrives, and items of
+        the type recorded by an interrupted run are not requested again.
+
         Returns:
             List[Dict]: List of dictionaries containing the retrieved items.
         """
+        if self.checkpoint is not None:
+            return self._retrieve_checkpointed(item_type, since)
+        zot = self.zotero_client
+        if isinstance(zot, ZoteroSQLiteClient):
+            # A local database has no rate limits; read it at once rather than scan it per page
+            self._announce_retrieval(item_type, since)
+            return zot.everything(zot.items(**self._item_query(item_type, since)))
+        # Pages are retried one at a time, so a rate limit late in a long listing
+        # does not restart it from the first page
+        return [item for page in self.iter_pages(item_type, since) for item in page]
+
+    def _retrieve_checkpointed(self, item_type: str, since: int) -> list[dict]:
+        """Retrieve all items of a type page by page, recording each page in `checkpoint`."""
+        items, start = self.checkpoint.fetch_progress(item_type)
+        if start is None:
+            print(f"{len(items)} {item_type}s were already retrieved.")
+            return items
+        for page in self.iter_pages(item_type, since, start=start):
+            self.checkpoint.save_page(item_type, start, page)
+            items.extend(page)
+            start += len(page)
+        self.checkpoint.finish_fetch(item_type)
+        return items
+
+    def iter_pages(
+        self,
+        item_type: str,
+        since: int = 0,
+        zotero_client: Zotero | None = None,
+        start: int = 0,
+    ) -> Iterator[list[dict]]:
+        """
+        Lazily retrieves items of a given type from Zotero Database, one API page at a time.
+
+        Pages are requested by offset (`start`/`limit`) rather than by following the
+        client's `next` link, so other calls on the same client (e.g. metadata lookups
+        while formatting) can be interleaved between pages.
+
+        Args:
+            item_type (str): Either "annotation" or "note".
+            since (int): Timestamp in seconds since the Unix epoch. Defaults to 0.
+            zotero_client (Zotero): Client to fetch with. Defaults to `zotero_client`;
+                a separate client lets pages be fetched on another thread.
+            start (int): Offset of the first item to retrieve. Defaults to 0.
+
+        Yields:
+            List[Dict]: One page of retrieved items.
+        """
+        self._announce_retrieval(item_type, since)
+        query = self._item_query(item_type, since)
+        zot = zotero_client if zotero_client is not None else self.zotero_client
+        if self.fetch_workers > 1:
+            yield from self._page_fetcher(zot).iter_pages(start=start, **query)
+            return
+
+        while True:
+            page = self.retry_policy.call_zotero(
+                zot, zot.items, **query, start=start, limit=self.page_size
+            )
+            if page:
+                yield page
+            if len(page) < self.page_size:
+                return
+            start += len(page)
+
+    def _item_query(self, item_type: str, since: int) -> dict:
+        """Build the Zotero query parameters for listing items of a given type.
+
+        Tag filters are pushed down to Zotero (`tag=a || b` selects items with any
+        of the tags), so items that would be filtered out are never downloaded.
+        `ZoteroAnnotationsNotes` still checks the tags of every item. Tags that the
+        Zotero query syntax would misread (a leading "-" negates a tag) are only
+        filtered client-side.
+        """
+        query = {"itemType": item_type, "since": since}
+        tags = self.filter_tags
+        if tags and not any(tag.startswith("-") or "||" in tag for tag in tags):
+            query["tag"] = " || ".join(tags)
+        return query
+
+    def _page_fetcher(self, zotero_client: Zotero | None = None) -> ZoteroPageFetcher:
+        """Create a concurrent page fetcher for the (given or main) Zotero client."""
+        return ZoteroPageFetcher(
+            zotero_client if zotero_client is not None else self.zotero_client,
+            page_size=self.page_size,
+            max_workers=self.fetch_workers,
+            retry_policy=self.retry_policy,
+            sessions=self.sessions,
+        )
+
+    @staticmethod
+    def _announce_retrieval(item_type: str, since: int) -> None:
+        """Validate `item_type` and print what is about to be retrieved."""
         if item_type not in ["annotation", "note"]:
             raise ValueError("item_type must be either 'annotation' or 'note'")
 
@@ -156,5 +672,3 @@ class Zotero2Readwise:
             print(f"Retrieving {item_type}s since last run from Zotero Database")
 
         print("It may take some time...")
-        query = self.zotero_client.items(itemType=item_type, since=since)
-        return self.zotero_client.everything(query)